@@ -1,77 +1,229 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import json
+from typing import AsyncIterator, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
-from app.models.habit import Habit, HabitLog
+from app.core.config import settings
+from app.models.habit import Habit, HabitLog, HabitStats
 from app.models.user import User
 from app.engine.gemini import gemini_client
+from app.engine.local_assistant import local_briefing, local_plan
+from app.engine.prompt_context import activity_since, build_habit_context
+from app.engine.response_cache import gemini_response_cache
 from datetime import datetime, timedelta
 
 router = APIRouter()
 
-@router.get("/daily-briefing")
-async def get_daily_briefing(
-    db: Session = Depends(deps.get_db),
-    # current_user: User = Depends(deps.get_current_user) # Disabled for MVP
-):
+WELCOME_BRIEFING = "Welcome to HabitOS! Create your first habit to get started."
+NO_HABITS_PLAN = "Add some habits first!"
+TIER_HEADER = "X-Assistant-Tier"
+
+Tier = Literal["auto", "local", "gemini"]
+
+async def _habit_rows(db: AsyncSession, user_id: int):
+    return (await db.execute(
+        select(Habit, HabitStats)
+        .outerjoin(HabitStats, HabitStats.habit_id == Habit.id)
+        .where(Habit.user_id == user_id)
+        .order_by(Habit.id)
+    )).all()
+
+
+async def _recent_completions(db: AsyncSession, user_id: int, now: datetime):
+    # (habit_id, completed_at) of the user's logs in the prompt's activity window
+    return (await db.execute(
+        select(HabitLog.habit_id, HabitLog.completed_at)
+        .where(HabitLog.user_id == user_id, HabitLog.completed_at >= activity_since(now.date()))
+    )).all()
+
+
+async def _briefing_context(db: AsyncSession, user_id: int, tier: str):
+    """
+    The finished local briefing, or the prompt arguments for Gemini, depending
+    on the tier. None when the user has no habits yet.
+    """
     # 1. Gather Context
-    habits = db.query(Habit).all() # Should be filtered by user in real app
-    user = db.query(User).first() # Mock: get first user
+    rows = await _habit_rows(db, user_id)
+    if not rows:
+        return None
+    user = await db.get(User, user_id)
 
-    if not habits:
-        return {"briefing": "Welcome to HabitOS! Create your first habit to get started."}
+    now = datetime.utcnow()
+    completions = await _recent_completions(db, user_id, now)
+    user_name = user.full_name if user else "Champion"
+    goals = user.goals if user and user.goals else "Be productive and consistent."
+    # Release the pooled connection before the (possibly multi-second) generation
+    await db.close()
 
-    habits_summary = "\n".join([f"- {h.title} ({h.frequency}, Streak: {h.current_streak})" for h in habits])
-    
-    three_days_ago = datetime.utcnow() - timedelta(days=3)
-    recent_logs = db.query(HabitLog).filter(HabitLog.completed_at >= three_days_ago).all()
-    logs_summary = f"Total completions in last 3 days: {len(recent_logs)}"
+    if tier == "local":
+        three_days_ago = now - timedelta(days=3)
+        return local_briefing(user_name, rows, sum(completed_at >= three_days_ago for _, completed_at in completions))
+    return dict(
+        user_name=user_name,
+        goals=goals,
+        **build_habit_context(rows, completions, now.date(), settings.ASSISTANT_PROMPT_TOKEN_BUDGET),
+    )
 
-    user_goals = user.goals if user and user.goals else "Be productive and consistent."
 
-    # 2. Call Gemini
-    briefing = await gemini_client.generate_daily_briefing(
-        user_name=user.full_name if user else "Champion",
-        habits_summary=habits_summary,
-        recent_logs=logs_summary,
-        goals=user_goals
+def _sse(request: Request, chunks: AsyncIterator[str], tier: str) -> StreamingResponse:
+    """
+    Forward text chunks as Server-Sent Events: `data: {"text": ...}` per chunk,
+    then `event: done`. Stops pulling from the model once the client is gone.
+    """
+    async def events():
+        try:
+            async for text in chunks:
+                if await request.is_disconnected():
+                    break
+                yield f"data: {json.dumps({'text': text})}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        finally:
+            await chunks.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", TIER_HEADER: tier},
     )
-    
+
+
+async def _single_chunk(text: str) -> AsyncIterator[str]:
+    yield text
+
+
+@router.get("/daily-briefing")
+async def get_daily_briefing(
+    response: Response,
+    tier: Tier = "auto",
+    user_id: int = Depends(deps.get_current_user_id),
+    db: AsyncSession = Depends(deps.get_async_db),
+):
+    """
+    Daily briefing from Gemini or the local engine; ?tier=local asks for the
+    fast local one. The X-Assistant-Tier header says which tier answered.
+    """
+    tier = await gemini_client.choose_tier(tier)
+    context = await _briefing_context(db, user_id, tier)
+    if context is None:
+        return {"briefing": WELCOME_BRIEFING}
+
+    response.headers[TIER_HEADER] = tier
+    if tier == "local":
+        return {"briefing": context}
+    # 2. Call Gemini
+    briefing = await gemini_client.generate_daily_briefing(**context)
     return {"briefing": briefing}
 
+
+@router.get("/daily-briefing/stream")
+async def stream_daily_briefing(
+    request: Request,
+    tier: Tier = "auto",
+    user_id: int = Depends(deps.get_current_user_id),
+    db: AsyncSession = Depends(deps.get_async_db),
+):
+    """
+    The daily briefing as Server-Sent Events, forwarded as the model generates it.
+    """
+    tier = await gemini_client.choose_tier(tier)
+    context = await _briefing_context(db, user_id, tier)
+    if context is None:
+        return _sse(request, _single_chunk(WELCOME_BRIEFING), "local")
+    if tier == "local":
+        return _sse(request, _single_chunk(context), tier)
+    return _sse(request, gemini_client.stream_daily_briefing(**context), tier)
+
+
 @router.post("/onboarding")
 async def onboard_user(
     goals: str,
-    db: Session = Depends(deps.get_db)
+    user_id: int = Depends(deps.get_current_user_id),
+    db: AsyncSession = Depends(deps.get_async_write_db)
 ):
-    user = db.query(User).first()
+    user = await db.get(User, user_id)
     if not user:
         # Create a dummy user if none exists for MVP
-        user = User(email="test@example.com", full_name="User", hashed_password="pw")
+        user = User(id=user_id, email=f"user{user_id}@example.com", full_name="User", hashed_password="pw")
         db.add(user)
     
     user.goals = goals
-    db.commit()
+    await db.commit()
     return {"message": "Goals updated successfully"}
 
+async def _plan_context(db: AsyncSession, user_id: int, tier: str):
+    # 1. Gather Context
+    rows = await _habit_rows(db, user_id)
+    if not rows:
+        return None
+    if tier == "local":
+        await db.close()
+        return local_plan(rows)
+    user = await db.get(User, user_id)
+
+    now = datetime.utcnow()
+    completions = await _recent_completions(db, user_id, now)
+    await db.close()
+    habit_context = build_habit_context(rows, completions, now.date(), settings.ASSISTANT_PROMPT_TOKEN_BUDGET)
+    return dict(
+        user_name=user.full_name if user else "User",
+        habits_summary=habit_context["habits_summary"],
+        goals=user.goals if user and user.goals else "Productivity and Health",
+    )
+
+
 @router.get("/plan")
 async def get_day_plan(
-    db: Session = Depends(deps.get_db)
+    response: Response,
+    tier: Tier = "auto",
+    user_id: int = Depends(deps.get_current_user_id),
+    db: AsyncSession = Depends(deps.get_async_db)
 ):
-    # 1. Gather Context
-    habits = db.query(Habit).all()
-    user = db.query(User).first()
-    
-    if not habits:
-        return {"plan": "Add some habits first!"}
-
-    habits_summary = "\n".join([f"- {h.title} ({h.frequency}, Difficulty: {h.difficulty}/5)" for h in habits])
-    user_goals = user.goals if user and user.goals else "Productivity and Health"
+    tier = await gemini_client.choose_tier(tier)
+    context = await _plan_context(db, user_id, tier)
+    if context is None:
+        return {"plan": NO_HABITS_PLAN}
 
+    response.headers[TIER_HEADER] = tier
+    if tier == "local":
+        return {"plan": context}
     # 2. Call Gemini
-    plan = await gemini_client.generate_action_plan(
-        user_name=user.full_name if user else "User",
-        habits_summary=habits_summary,
-        goals=user_goals
-    )
-    
+    plan = await gemini_client.generate_action_plan(**context)
     return {"plan": plan}
+
+
+@router.get("/plan/stream")
+async def stream_day_plan(
+    request: Request,
+    tier: Tier = "auto",
+    user_id: int = Depends(deps.get_current_user_id),
+    db: AsyncSession = Depends(deps.get_async_db),
+):
+    """
+    The day plan as Server-Sent Events, forwarded as the model generates it.
+    """
+    tier = await gemini_client.choose_tier(tier)
+    context = await _plan_context(db, user_id, tier)
+    if context is None:
+        return _sse(request, _single_chunk(NO_HABITS_PLAN), "local")
+    if tier == "local":
+        return _sse(request, _single_chunk(context), tier)
+    return _sse(request, gemini_client.stream_action_plan(**context), tier)
+
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    """
+    Hit rate of the Gemini response cache (this worker's view).
+    """
+    return gemini_response_cache.stats()
+
+
+@router.get("/upstream/stats")
+def get_upstream_stats():
+    """
+    Circuit breaker state, retries, timeouts and in-flight generations (this worker's view).
+    """
+    return gemini_client.stats()
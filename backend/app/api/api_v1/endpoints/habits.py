@@ -1,183 +1,620 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+import base64
+import hashlib
+from collections import defaultdict
+from typing import List, Any, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import and_, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime, timedelta, timezone
 
 from app.api import deps
-from app.models.habit import Habit, HabitLog, PredictionLog
+from app.core.cache import score_cache
+from app.core.config import settings
+from app.core.serialization import fast_json
+from app.models.habit import Habit, HabitLog, HabitScoreSnapshot, HabitStats
 from app.schemas import schemas
-from app.engine.intelligence import calculate_success_probability, assess_failure_risk
+from app.crud.habit import (
+    get_completion_days,
+    get_completion_history,
+    get_completion_page,
+    get_habit_stats,
+    get_habit_stats_map,
+    id_batches,
+    new_habit_stats,
+    record_log,
+    record_logs_bulk,
+    streaks_from_stats,
+)
+from app.crud.data_version import bump_data_versions, get_data_version
+from app.crud.prediction import prediction_writer
+from app.crud.scoring import invalidate_snapshots, snapshot_day, snapshot_scores
+from app.engine.batch_scoring import score_batch
+from app.engine.history import encode_bitmap, encode_runs
+from app.engine.intelligence import (
+    RECOMMENDATIONS,
+    calculate_success_probability_from_stats,
+    assess_failure_risk_from_stats,
+)
 
 router = APIRouter()
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# --- Conditional GET ---
+
+async def _etag(db: AsyncSession, request: Request, user_id: int, weak: bool = False) -> str:
+    """
+    ETag of a GET from the user's data version and the request path and query.
+    Read the version before the data: a write racing the request can then only
+    make the tag older than the body, never newer. Weak tags also change daily,
+    since scores are only stable within a UTC day.
+    """
+    version = await db.run_sync(get_data_version, user_id)
+    digest = hashlib.blake2b(str(request.url.include_query_params()).encode(), digest_size=8).hexdigest()
+    if weak:
+        return f'W/"{user_id}.{version}.{snapshot_day():%Y%m%d}.{digest}"'
+    return f'"{user_id}.{version}.{digest}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses weak comparison: W/ prefixes are ignored
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    A 304 when the client already has this version, else None after adding the
+    validators to the response. Clients may store it but must revalidate.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
 @router.post("/", response_model=schemas.Habit)
-def create_habit(
+async def create_habit(
     habit_in: schemas.HabitCreate,
-    db: Session = Depends(deps.get_db)
-    # current_user... (skip auth for MVP speed, assume user_id=1)
+    user_id: int = Depends(deps.get_current_user_id),
+    db: AsyncSession = Depends(deps.get_async_write_db)
 ) -> Any:
     """
     Create a new habit.
     """
-    user_id = 1 # Hardcoded for MVP
     habit = Habit(
         **habit_in.model_dump(),
         user_id=user_id,
         current_streak=0,
         success_probability=0.5 # Initial guess
     )
+    habit.stats = new_habit_stats()
     db.add(habit)
-    db.commit()
-    db.refresh(habit)
+    await db.run_sync(bump_data_versions, [user_id])
+    await db.commit()
+    await db.refresh(habit)
+    await score_cache.invalidate_async(habit.id)
     return habit
 
 @router.get("/", response_model=List[schemas.Habit])
-def read_habits(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(deps.get_db)
+async def read_habits(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1),
+    skip: int = Query(0, ge=0, deprecated=True),
+    user_id: int = Depends(deps.get_current_user_id),
+    db: AsyncSession = Depends(deps.get_async_db)
 ) -> Any:
     """
-    Retrieve habits.
+    The current user's habits, oldest first, in pages of `limit`. When another
+    page follows, the X-Next-Cursor header holds the `cursor` to fetch it; each
+    page is one index range read however deep it is. `skip` (offset paging)
+    is kept for older clients. Answers If-None-Match with 304 until the
+    user's habits change.
     """
-    habits = db.query(Habit).offset(skip).limit(limit).all()
-    return habits
+    if cursor and skip:
+        raise HTTPException(status_code=422, detail="Use either cursor or skip")
+    etag = await _etag(db, request, user_id)
+    not_modified = _not_modified(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+
+    # One extra row tells whether another page follows
+    query = select(Habit).where(Habit.user_id == user_id).order_by(Habit.id).limit(limit + 1)
+    if cursor:
+        query = query.where(Habit.id > _decode_habit_cursor(cursor))
+    else:
+        query = query.offset(skip)
+    habits = (await db.execute(query)).scalars().all()
+    if len(habits) > limit:
+        response.headers[NEXT_CURSOR_HEADER] = _encode_habit_cursor(habits[limit - 1].id)
+    return fast_json([_habit_dict(habit) for habit in habits[:limit]], response)
+
+
+def _habit_dict(habit: Habit) -> dict:
+    # Field order and types of schemas.Habit
+    return {
+        "title": habit.title,
+        "description": habit.description,
+        "frequency": habit.frequency,
+        "difficulty": habit.difficulty,
+        "id": habit.id,
+        "user_id": habit.user_id,
+        "current_streak": habit.current_streak,
+        "success_probability": float(habit.success_probability),
+        "longest_streak": habit.longest_streak,
+        "created_at": habit.created_at,
+    }
+
+
+def _encode_habit_cursor(habit_id: int) -> str:
+    return base64.urlsafe_b64encode(f"habit|{habit_id}".encode()).decode()
+
+
+def _decode_habit_cursor(cursor: str) -> int:
+    try:
+        kind, habit_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        if kind != "habit":
+            raise ValueError(kind)
+        return int(habit_id)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+
+
+async def _get_user_habit(db: AsyncSession, habit_id: int, user_id: int) -> Habit:
+    # Other users' habits are indistinguishable from missing ones
+    habit = await db.get(Habit, habit_id)
+    if habit is None or habit.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Habit not found")
+    return habit
+
+
+def _today_snapshot():
+    # Join condition for a habit's nightly snapshot of the current UTC day
+    return and_(HabitScoreSnapshot.habit_id == Habit.id, HabitScoreSnapshot.day == snapshot_day())
+
+
+def _score_insight(habit: Habit, stats: HabitStats) -> dict:
+    """
+    Score a habit live. The caller caches the result for the rest of the UTC day.
+    """
+    success_prob = calculate_success_probability_from_stats(habit, stats.total_completions)
+    risk = assess_failure_risk_from_stats(habit, stats.total_completions, stats.last_completed_at)
+    scores = {"success_probability": success_prob, "risk": risk}
+
+    # Latest probability and prediction are persisted write-behind
+    prediction_writer.add(habit.id, risk, success_prob, previous_probability=habit.success_probability)
+    return scores
+
+
+def _insight_response(habit_id: int, scores: dict, history: List[datetime]) -> dict:
+    # Field order and types of schemas.HabitInsight
+    risk = scores["risk"]
+    return {
+        "habit_id": habit_id,
+        "success_probability": float(scores["success_probability"]),
+        "risk_score": float(risk["risk_score"]),
+        "risk_level": risk["risk_level"],
+        "factors": [
+            {"factor": f["factor"], "impact": float(f["impact"]), "note": f.get("note")} for f in risk["factors"]
+        ],
+        "recommendation": risk["recommendation"],
+        "model_version": "heuristic-v1",
+        "as_of": datetime.utcnow(),
+        "history": history,
+    }
+
+
+@router.get("/insights", response_model=List[schemas.HabitInsight])
+async def habits_insights(
+    request: Request,
+    response: Response,
+    ids: Optional[List[int]] = Query(None),
+    include_history: bool = False,
+    history_limit: Optional[int] = Query(None, ge=0),
+    user_id: int = Depends(deps.get_current_user_id),
+    db: AsyncSession = Depends(deps.get_async_db)
+) -> Any:
+    """
+    Insights for many of the user's habits at once (all when `ids` is omitted), in a
+    constant number of queries. History is only embedded with include_history;
+    `history_limit` then keeps each habit's most recent completions. Prefer
+    /habits/history for windows. Unknown ids are skipped. Answers
+    If-None-Match with 304 until the user's data or the UTC day changes.
+    """
+    not_modified = _not_modified(request, response, await _etag(db, request, user_id, weak=True))
+    if not_modified is not None:
+        return not_modified
+
+    query = (
+        select(Habit, HabitStats, HabitScoreSnapshot)
+        .outerjoin(HabitStats, HabitStats.habit_id == Habit.id)
+        .outerjoin(HabitScoreSnapshot, _today_snapshot())
+        .where(Habit.user_id == user_id)
+        .order_by(Habit.id)
+    )
+    if ids is not None:
+        query = query.where(Habit.id.in_(ids))
+    rows = (await db.execute(query)).all()
+    if not rows:
+        return fast_json([], response)
+
+    habit_ids = [habit.id for habit, *_ in rows]
+    cached = await score_cache.get_many_async("insight", habit_ids)
+    # Then today's nightly snapshots; only what neither covers is scored live
+    for habit, _, snapshot in rows:
+        if snapshot is not None and habit.id not in cached:
+            cached[habit.id] = snapshot_scores(snapshot)
+    # Startup backfills stats for older habits; a row missing anyway scores as no completions
+    scored = {
+        habit.id: _score_insight(habit, stats or new_habit_stats(habit.id))
+        for habit, stats, _ in rows if habit.id not in cached
+    }
+    await score_cache.set_many_async("insight", scored)
+    cached.update(scored)
+    history = {}
+    if include_history:
+        history = await db.run_sync(get_completion_history, habit_ids, history_limit)
+
+    return fast_json([
+        _insight_response(habit_id, cached[habit_id], history.get(habit_id, [])) for habit_id in habit_ids
+    ], response)
 
 
 @router.get("/{habit_id}/insights", response_model=schemas.HabitInsight)
-def habit_insights(
+async def habit_insights(
+    request: Request,
+    response: Response,
     habit_id: int,
-    db: Session = Depends(deps.get_db)
+    include_history: bool = False,
+    history_limit: Optional[int] = Query(None, ge=0),
+    user_id: int = Depends(deps.get_current_user_id),
+    db: AsyncSession = Depends(deps.get_async_db)
 ) -> Any:
-    habit = db.query(Habit).filter(Habit.id == habit_id).first()
-    if not habit:
-        raise HTTPException(status_code=404, detail="Habit not found")
+    habit = await _get_user_habit(db, habit_id, user_id)
+    not_modified = _not_modified(request, response, await _etag(db, request, user_id, weak=True))
+    if not_modified is not None:
+        return not_modified
 
-    logs = db.query(HabitLog).filter(HabitLog.habit_id == habit_id).all()
+    scores = await score_cache.get_async("insight", habit_id)
+    if scores is None:
+        snapshot = await db.get(HabitScoreSnapshot, (habit_id, snapshot_day()))
+        if snapshot is not None:
+            scores = snapshot_scores(snapshot)
+    if scores is None:
+        stats = await db.get(HabitStats, habit_id) or new_habit_stats(habit_id)
+        scores = _score_insight(habit, stats)
+        await score_cache.set_many_async("insight", {habit_id: scores})
+    history = []
+    if include_history:
+        history = (await db.run_sync(get_completion_history, [habit_id], history_limit))[habit_id]
+    return fast_json(_insight_response(habit_id, scores, history), response)
 
-    success_prob = calculate_success_probability(habit, logs)
-    risk = assess_failure_risk(habit, logs)
 
-    # Persist latest probability and log prediction event
-    habit.success_probability = success_prob
+# --- Completion history ---
+
+def _history_window(start: Optional[date], end: Optional[date]) -> tuple:
+    """
+    Resolve a from/to window for day encodings: defaults to the last 30 days.
+    """
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=422, detail="'from' must not be after 'to'")
+    if (end - start).days >= settings.HISTORY_MAX_WINDOW_DAYS:
+        raise HTTPException(status_code=422, detail=f"Window is limited to {settings.HISTORY_MAX_WINDOW_DAYS} days")
+    return start, end
+
+
+def _encode_days(habit_id: int, days: List[date], start: date, end: date, encoding: str) -> schemas.HabitHistory:
+    history = schemas.HabitHistory(habit_id=habit_id, encoding=encoding, start_date=start, end_date=end)
+    if encoding == "bitmap":
+        history.bitmap = encode_bitmap(days, start, end)
+    else:
+        history.runs = [schemas.HistoryRun(start=first, days=length) for first, length in encode_runs(days)]
+    return history
+
+
+def _encode_cursor(completed_at: datetime, log_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{completed_at.isoformat()}|{log_id}".encode()).decode()
 
-    prediction = PredictionLog(
-        habit_id=habit_id,
-        predicted_for=datetime.utcnow() + timedelta(days=1),
-        score=risk["risk_score"],
-        risk_level=risk["risk_level"],
-        explanation=risk["recommendation"],
-    )
-    db.add(prediction)
-    db.add(habit)
-    db.commit()
 
-    return schemas.HabitInsight(
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        completed_at, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(completed_at), int(log_id)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+
+
+@router.get("/history", response_model=List[schemas.HabitHistory])
+async def habits_history(
+    ids: Optional[List[int]] = Query(None),
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    encoding: Literal["bitmap", "rle"] = "rle",
+    user_id: int = Depends(deps.get_current_user_id),
+    db: AsyncSession = Depends(deps.get_async_db)
+) -> Any:
+    """
+    Completed days of many of the user's habits (all when `ids` is omitted) in
+    one from/to window, in two queries. Unknown ids are skipped.
+    """
+    start, end = _history_window(start, end)
+    query = select(Habit.id).where(Habit.user_id == user_id).order_by(Habit.id)
+    if ids is not None:
+        query = query.where(Habit.id.in_(ids))
+    habit_ids = (await db.execute(query)).scalars().all()
+    if not habit_ids:
+        return []
+
+    days = await db.run_sync(get_completion_days, habit_ids, start, end)
+    return [_encode_days(habit_id, days[habit_id], start, end, encoding) for habit_id in habit_ids]
+
+
+@router.get("/{habit_id}/history", response_model=schemas.HabitHistory)
+async def habit_history(
+    habit_id: int,
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    encoding: Literal["timestamps", "bitmap", "rle"] = "timestamps",
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    user_id: int = Depends(deps.get_current_user_id),
+    db: AsyncSession = Depends(deps.get_async_db)
+) -> Any:
+    """
+    Completion history of one habit. `timestamps` returns completions oldest
+    first in pages of `limit`; pass `next_cursor` back as `cursor` for the next
+    page. `bitmap` and `rle` return every completed day of the from/to window.
+    """
+    await _get_user_habit(db, habit_id, user_id)
+
+    if encoding != "timestamps":
+        start, end = _history_window(start, end)
+        days = await db.run_sync(get_completion_days, [habit_id], start, end)
+        return _encode_days(habit_id, days[habit_id], start, end, encoding)
+
+    after = _decode_cursor(cursor) if cursor else None
+    # One extra row tells whether another page follows
+    rows = await db.run_sync(get_completion_page, habit_id, start, end, after, limit + 1)
+    page = rows[:limit]
+    return schemas.HabitHistory(
         habit_id=habit_id,
-        success_probability=success_prob,
-        risk_score=risk["risk_score"],
-        risk_level=risk["risk_level"],
-        factors=[schemas.RiskFactor(**f) for f in risk["factors"]],
-        recommendation=risk["recommendation"],
-        as_of=datetime.utcnow(),
-        history=[log.completed_at for log in logs]
+        encoding=encoding,
+        start_date=start,
+        end_date=end,
+        completions=[completed_at for _, completed_at in page],
+        next_cursor=_encode_cursor(page[-1][1], page[-1][0]) if len(rows) > limit else None,
     )
 
 
 @router.get("/dashboard/summary", response_model=schemas.DashboardSummary)
-def dashboard_summary(db: Session = Depends(deps.get_db)) -> Any:
-    habits = db.query(Habit).all()
+async def dashboard_summary(
+    request: Request,
+    response: Response,
+    user_id: int = Depends(deps.get_current_user_id),
+    db: AsyncSession = Depends(deps.get_async_db)
+) -> Any:
+    """
+    Totals and the most at-risk habits of the user. Answers If-None-Match
+    with 304 until the user's data or the UTC day changes.
+    """
+    not_modified = _not_modified(request, response, await _etag(db, request, user_id, weak=True))
+    if not_modified is not None:
+        return not_modified
+
+    rows = (await db.execute(
+        select(Habit, HabitStats, HabitScoreSnapshot.success_probability, HabitScoreSnapshot.risk_level)
+        .outerjoin(HabitStats, HabitStats.habit_id == Habit.id)
+        .outerjoin(HabitScoreSnapshot, _today_snapshot())
+        .where(Habit.user_id == user_id)
+    )).all()
+    habits = [habit for habit, *_ in rows]
+
+    cached = await score_cache.get_many_async("score", [habit.id for habit in habits])
+    # Then today's nightly snapshots, as for insights; only what neither covers is scored live
+    for habit, _, success_prob, risk_level in rows:
+        if success_prob is not None and habit.id not in cached:
+            cached[habit.id] = {"success_probability": success_prob, "risk_level": risk_level}
+    # No backfill on reads (that's the startup migration's job): missing stats count as zero
+    rows = [(habit, stats or new_habit_stats(habit.id)) for habit, stats, *_ in rows if habit.id not in cached]
+
+    # Only habits without a cached score or snapshot for today are scored, in one vectorized batch
+    if rows:
+        scores = score_batch(
+            difficulty=[h.difficulty for h, _ in rows],
+            current_streak=[h.current_streak for h, _ in rows],
+            created_at=[h.created_at for h, _ in rows],
+            total_logs=[a.total_completions for _, a in rows],
+            last_completed_at=[a.last_completed_at for _, a in rows],
+        )
+        scored = {
+            habit.id: {"success_probability": success_prob, "risk_level": risk_level}
+            for (habit, _), success_prob, risk_level in zip(
+                rows, scores["success_probability"].tolist(), scores["risk_level"].tolist()
+            )
+        }
+        await score_cache.set_many_async("score", scored)
+        cached.update(scored)
+    probabilities = [cached[habit.id]["success_probability"] for habit in habits]
+    risk_levels = [cached[habit.id]["risk_level"] for habit in habits]
+
     at_risk = []
     total_prob = 0.0
 
-    for habit in habits:
-        logs = db.query(HabitLog).filter(HabitLog.habit_id == habit.id).all()
-        success_prob = calculate_success_probability(habit, logs)
-        risk = assess_failure_risk(habit, logs)
-
+    for habit, success_prob, risk_level in zip(habits, probabilities, risk_levels):
         total_prob += success_prob
 
-        if risk["risk_level"] != "low":
-            at_risk.append(
-                schemas.HabitHealth(
-                    id=habit.id,
-                    title=habit.title,
-                    success_probability=success_prob,
-                    risk_level=risk["risk_level"],
-                    recommendation=risk["recommendation"],
-                )
-            )
+        if risk_level != "low":
+            # Field order and types of schemas.HabitHealth
+            at_risk.append({
+                "id": habit.id,
+                "title": habit.title,
+                "success_probability": float(success_prob),
+                "risk_level": risk_level,
+                "recommendation": RECOMMENDATIONS[risk_level],
+            })
 
     avg_prob = total_prob / len(habits) if habits else 0.0
 
-    return schemas.DashboardSummary(
-        total_habits=len(habits),
-        avg_success_probability=avg_prob,
-        active_streaks=sum(1 for h in habits if h.current_streak > 0),
-        at_risk=sorted(at_risk, key=lambda h: h.success_probability)[:5],
-    )
+    return fast_json({
+        "total_habits": len(habits),
+        "avg_success_probability": float(avg_prob),
+        "active_streaks": sum(1 for h in habits if h.current_streak > 0),
+        "at_risk": sorted(at_risk, key=lambda h: h["success_probability"])[:5],
+    }, response)
 
 @router.post("/{habit_id}/log", response_model=schemas.HabitLog)
-def log_habit(
+async def log_habit(
     habit_id: int,
     log_in: schemas.HabitLogCreate,
-    db: Session = Depends(deps.get_db)
+    user_id: int = Depends(deps.get_current_user_id),
+    db: AsyncSession = Depends(deps.get_async_write_db)
 ) -> Any:
     """
     Log a habit completion. Updates streak and probability.
     """
-    habit = db.query(Habit).filter(Habit.id == habit_id).first()
-    if not habit:
-        raise HTTPException(status_code=404, detail="Habit not found")
-        
+    habit = await _get_user_habit(db, habit_id, user_id)
+
     # Check if already logged today
     today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    existing_log = db.query(HabitLog).filter(
-        HabitLog.habit_id == habit_id,
-        HabitLog.completed_at >= today_start
-    ).first()
+    existing_log = (await db.execute(
+        select(HabitLog).where(
+            HabitLog.habit_id == habit_id,
+            HabitLog.completed_at >= today_start
+        ).limit(1)
+    )).scalars().first()
     
     if existing_log:
         # Idempotent: If already logged, just return the existing log
         return existing_log
         
+    # Load stats before the new log joins the session so a first-time backfill doesn't count it
+    stats = await db.run_sync(get_habit_stats, habit_id)
+
     # Create Log
     log = HabitLog(
         **log_in.model_dump(exclude={'habit_id'}),
         habit_id=habit_id,
+        user_id=user_id,
         completed_at=datetime.utcnow()
     )
     db.add(log)
     
-    # Update Streak Logic
-    # Get last log
-    last_log = db.query(HabitLog).filter(
-        HabitLog.habit_id == habit_id,
-        HabitLog.completed_at < today_start
-    ).order_by(HabitLog.completed_at.desc()).first()
-    
-    if last_log:
-        last_log_date = last_log.completed_at.date()
-        yesterday = datetime.utcnow().date() - timedelta(days=1)
-        if last_log_date == yesterday:
-            habit.current_streak += 1
-        elif last_log_date < yesterday:
-            habit.current_streak = 1 # Reset
-        else:
-            # Should be covered by "existing_log" check but safety first
-            pass
-    else:
-        habit.current_streak = 1 # First log
-        
-    if habit.current_streak > habit.longest_streak:
-        habit.longest_streak = habit.current_streak
-
-    # Recalculate Probability
-    all_logs = db.query(HabitLog).filter(HabitLog.habit_id == habit_id).all()
-    all_logs.append(log) # Include current
-    habit.success_probability = calculate_success_probability(habit, all_logs)
+    # Streaks and probability come from the incrementally maintained stats;
+    # the day bitmap makes streaks exact even after backfilled logs
+    await db.run_sync(record_log, stats, log)
+    habit.current_streak, habit.longest_streak = streaks_from_stats(stats)
+    habit.success_probability = calculate_success_probability_from_stats(habit, stats.total_completions)
     
     db.add(habit)
-    db.commit()
-    db.refresh(log)
+    await db.run_sync(invalidate_snapshots, [habit_id])
+    await db.run_sync(bump_data_versions, [user_id])
+    await db.commit()
+    await score_cache.invalidate_async(habit_id)
+    await db.refresh(log)
     return log
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Stored timestamps are naive UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+@router.post("/logs/bulk", response_model=schemas.HabitLogBulkResult)
+async def bulk_log_habits(
+    bulk_in: schemas.HabitLogBulkCreate,
+    user_id: int = Depends(deps.get_current_user_id),
+    db: AsyncSession = Depends(deps.get_async_write_db)
+) -> Any:
+    """
+    Log many completions at once (history imports, offline sync), including backdated ones.
+    Records are deduplicated per habit per UTC day, against each other and against
+    existing logs, inserted in a single executemany, and streaks and probability are
+    recomputed once per affected habit.
+    """
+    if len(bulk_in.logs) > settings.BULK_LOG_MAX_RECORDS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BULK_LOG_MAX_RECORDS} records per request")
+
+    now = datetime.utcnow()
+
+    # Earliest record per habit per day wins
+    incoming = {}
+    for item in sorted(bulk_in.logs, key=lambda i: _as_utc(i.completed_at)):
+        completed_at = _as_utc(item.completed_at)
+        if completed_at > now:
+            raise HTTPException(status_code=422, detail="completed_at cannot be in the future")
+        incoming.setdefault((item.habit_id, completed_at.date()), {
+            "habit_id": item.habit_id,
+            "user_id": user_id,
+            "completed_at": completed_at,
+            "mood_score": item.mood_score,
+            "difficulty_rating": item.difficulty_rating,
+        })
+
+    habit_ids = sorted({habit_id for habit_id, _ in incoming})
+    habits = {}
+    for batch in id_batches(habit_ids):
+        habits.update((h.id, h) for h in (await db.execute(
+            select(Habit).where(Habit.user_id == user_id, Habit.id.in_(batch))
+        )).scalars())
+    missing = [habit_id for habit_id in habit_ids if habit_id not in habits]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Habits not found: {missing}")
+
+    # Load stats before inserting so a first-time backfill doesn't count the new rows
+    stats_map = await db.run_sync(get_habit_stats_map, habit_ids)
+
+    completion_dates = defaultdict(list)
+    for batch in id_batches(habit_ids):
+        for habit_id, completed_at in await db.execute(
+            select(HabitLog.habit_id, HabitLog.completed_at).where(HabitLog.habit_id.in_(batch))
+        ):
+            completion_dates[habit_id].append(completed_at.date())
+    logged_days = {(habit_id, day) for habit_id, days in completion_dates.items() for day in days}
+
+    new_logs = defaultdict(list)
+    for key, row in incoming.items():
+        if key not in logged_days:
+            new_logs[row["habit_id"]].append(row)
+    rows = [row for habit_rows in new_logs.values() for row in habit_rows]
+
+    if rows:
+        await db.execute(insert(HabitLog), rows)
+
+    # One streak/probability recompute per habit, not per record
+    for habit_id, habit_rows in new_logs.items():
+        habit = habits[habit_id]
+        dates = completion_dates[habit_id] + [row["completed_at"].date() for row in habit_rows]
+        stats = record_logs_bulk(stats_map[habit_id], habit_rows, dates)
+        habit.current_streak, habit.longest_streak = streaks_from_stats(stats)
+        habit.success_probability = calculate_success_probability_from_stats(habit, stats.total_completions)
+
+    await db.run_sync(invalidate_snapshots, new_logs)
+    if rows:
+        await db.run_sync(bump_data_versions, [user_id])
+    await db.commit()
+    await score_cache.invalidate_async(*new_logs)
+    return schemas.HabitLogBulkResult(
+        inserted=len(rows),
+        duplicates=len(bulk_in.logs) - len(rows),
+        habits=[schemas.Habit.model_validate(habits[habit_id]) for habit_id in habit_ids],
+    )
+
+
+@router.get("/cache/stats")
+def score_cache_stats() -> Any:
+    """
+    Hit/miss/eviction counters of the scored insights cache (this worker's view).
+    """
+    return score_cache.stats()
@@ -1,9 +1,17 @@
-from typing import Generator
-from app.db.session import SessionLocal
+from typing import AsyncGenerator
+from fastapi import Header
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import AsyncSessionLocal, AsyncWriteSessionLocal
 
-def get_db() -> Generator:
-    try:
-        db = SessionLocal()
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+async def get_async_write_db() -> AsyncGenerator[AsyncSession, None]:
+    # Same as get_async_db unless the SQLite profile serializes writers
+    async with AsyncWriteSessionLocal() as db:
+        yield db
+
+def get_current_user_id(x_user_id: int = Header(1, ge=1)) -> int:
+    # No auth in the MVP: the caller names its user, defaulting to the single local user
+    return x_user_id
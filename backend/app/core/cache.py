@@ -0,0 +1,192 @@
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+
+class MemoryBackend:
+    """
+    Per-process LRU cache with a per-entry TTL. Least recently used entries are
+    evicted once max_entries is reached; expired entries are dropped on read.
+    """
+    # In-process: calls never wait on I/O
+    blocking = False
+
+    def __init__(self, max_entries: int, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (value, self.clock() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, *keys: str):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisBackend:
+    """
+    Shared cache for several uvicorn workers on any Redis-compatible server.
+    Values are stored as JSON with a server-side TTL; bounding memory and LRU
+    eviction are left to the server (maxmemory-policy allkeys-lru).
+    """
+    evictions = 0
+    expirations = 0
+    # Every call is a network round trip on the synchronous redis-py client
+    blocking = True
+
+    def __init__(self, client, prefix: str = "habitos:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("INSIGHT_CACHE_REDIS_URL is set but the `redis` package is not installed") from e
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: float):
+        self.client.set(self.prefix + key, json.dumps(value), ex=max(int(ttl), 1))
+
+    def delete(self, *keys: str):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=self.prefix + "*"))
+
+
+class ScoreCache:
+    """
+    Scored results per (kind, habit, UTC day). Scores only change when a log
+    is written, a habit is created or the day rolls over: write endpoints call
+    invalidate(), and the day in the key retires yesterday's entries. Within a
+    day the TTL bounds staleness of the time-dependent inactivity factor.
+    Async handlers use the *_async methods, which run calls to a blocking
+    backend in the threadpool instead of on the event loop.
+    """
+    KINDS = ("insight", "score")
+
+    def __init__(self, backend, ttl: float, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(kind: str, habit_id: int, day: Optional[str] = None) -> str:
+        return f"{kind}:{habit_id}:{day or datetime.utcnow().date().isoformat()}"
+
+    def get(self, kind: str, habit_id: int) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        value = self.backend.get(self._key(kind, habit_id))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def get_many(self, kind: str, habit_ids: Iterable[int]) -> Dict[int, Any]:
+        found = {}
+        for habit_id in habit_ids:
+            value = self.get(kind, habit_id)
+            if value is not None:
+                found[habit_id] = value
+        return found
+
+    def set(self, kind: str, habit_id: int, value: Any):
+        if self.enabled:
+            self.backend.set(self._key(kind, habit_id), value, self.ttl)
+
+    def invalidate(self, *habit_ids: int):
+        day = datetime.utcnow().date().isoformat()
+        self.backend.delete(*(self._key(kind, habit_id, day) for habit_id in habit_ids for kind in self.KINDS))
+
+    def clear(self):
+        self.backend.clear()
+
+    async def _off_loop(self, fn: Callable, *args):
+        if self.backend.blocking:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    async def get_async(self, kind: str, habit_id: int) -> Optional[Any]:
+        return await self._off_loop(self.get, kind, habit_id)
+
+    async def get_many_async(self, kind: str, habit_ids: Iterable[int]) -> Dict[int, Any]:
+        return await self._off_loop(self.get_many, kind, list(habit_ids))
+
+    def set_many(self, kind: str, values: Dict[int, Any]):
+        for habit_id, value in values.items():
+            self.set(kind, habit_id, value)
+
+    async def set_many_async(self, kind: str, values: Dict[int, Any]):
+        if values:
+            await self._off_loop(self.set_many, kind, values)
+
+    async def invalidate_async(self, *habit_ids: int):
+        await self._off_loop(self.invalidate, *habit_ids)
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions,
+            "expirations": self.backend.expirations,
+        }
+
+
+def _build_score_cache() -> ScoreCache:
+    if settings.INSIGHT_CACHE_REDIS_URL:
+        backend = RedisBackend.from_url(settings.INSIGHT_CACHE_REDIS_URL)
+    else:
+        backend = MemoryBackend(settings.INSIGHT_CACHE_MAX_ENTRIES)
+    return ScoreCache(backend, settings.INSIGHT_CACHE_TTL_SECONDS, enabled=settings.INSIGHT_CACHE_ENABLED)
+
+
+score_cache = _build_score_cache()
@@ -4,11 +4,76 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "HabitOS"
     API_V1_STR: str = "/api/v1"
     DATABASE_URL: str = "sqlite:///./habitos.db"
+    # Async driver URL for the API; derived from DATABASE_URL when unset
+    ASYNC_DATABASE_URL: str | None = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    # Opt-in SQLite tuning: WAL, relaxed fsync, mmap, larger cache and one serialized writer
+    SQLITE_PRODUCTION_PROFILE: bool = False
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
     SECRET_KEY: str = "CHANGE_THIS_TO_A_GOOD_SECRET_KEY"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     GEMINI_API_KEY: str | None = None
+    # Model selection: candidates are probed concurrently, the winner is cached on disk
+    GEMINI_PROBE_TIMEOUT_SECONDS: float = 10.0
+    GEMINI_PROBE_CANDIDATES: int = 6
+    GEMINI_MODEL_CACHE_PATH: str = ".gemini_model.json"
+    GEMINI_MODEL_CACHE_TTL_SECONDS: int = 24 * 3600
+    # Briefings and plans are cached per exact prompt until the end of the UTC day
+    GEMINI_CACHE_ENABLED: bool = True
+    # Resilience: concurrent generations, overall deadline per call (queueing and
+    # retries included), jittered retries, and a breaker that fails fast when unhealthy
+    GEMINI_MAX_CONCURRENCY: int = 4
+    GEMINI_DEADLINE_SECONDS: float = 20.0
+    GEMINI_MAX_RETRIES: int = 2
+    GEMINI_RETRY_BASE_SECONDS: float = 0.5
+    GEMINI_BREAKER_FAILURE_THRESHOLD: int = 5
+    GEMINI_BREAKER_RESET_SECONDS: float = 30.0
+    # Assistant tier: "auto" picks the local template engine or Gemini per request;
+    # "local" never calls Gemini, "gemini" uses it whenever a model is available
+    ASSISTANT_TIER: str = "auto"
+    ASSISTANT_LATENCY_BUDGET_SECONDS: float = 5.0
+    # Estimated tokens of habit context in a Gemini prompt; lower-risk habits beyond it are tallied
+    ASSISTANT_PROMPT_TOKEN_BUDGET: int = 600
+    # Write-behind prediction persistence
+    PREDICTION_FLUSH_INTERVAL_SECONDS: float = 5.0
+    PREDICTION_FLUSH_BATCH_SIZE: int = 500
+    PREDICTION_RETENTION_DAYS: int = 30
+    BULK_LOG_MAX_RECORDS: int = 100_000
+    # Scored insights cache; set INSIGHT_CACHE_REDIS_URL to share it between workers
+    INSIGHT_CACHE_ENABLED: bool = True
+    INSIGHT_CACHE_MAX_ENTRIES: int = 10_000
+    INSIGHT_CACHE_TTL_SECONDS: float = 3600
+    INSIGHT_CACHE_REDIS_URL: str | None = None
+    # Nightly scoring job: rescores every habit after each UTC midnight into daily snapshots
+    SCORING_SCHEDULER_ENABLED: bool = True
+    SCORING_CHUNK_SIZE: int = 10_000
+    # Worker processes for the job; each scores id-range shards over its own connection
+    SCORING_WORKERS: int = 1
+    SCORING_SNAPSHOT_RETENTION_DAYS: int = 7
+    # Prometheus metrics at /metrics; Server-Timing adds a per-request app/db/llm breakdown header
+    METRICS_ENABLED: bool = True
+    METRICS_SERVER_TIMING: bool = False
+    # orjson for the habit listing, insights and dashboard responses, without response_model re-validation
+    FAST_JSON_ENABLED: bool = True
+    # Widest from/to window of the day-encoded history endpoints
+    HISTORY_MAX_WINDOW_DAYS: int = 3660
 
     model_config = SettingsConfigDict(env_file=".env")
 
+    @property
+    def async_database_url(self) -> str:
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        url = self.DATABASE_URL
+        if url.startswith("sqlite://"):
+            return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+        if url.startswith(("postgresql://", "postgres://")):
+            return "postgresql+asyncpg://" + url.split("://", 1)[1]
+        return url
+
 settings = Settings()
@@ -0,0 +1,245 @@
+"""
+In-process request metrics in the Prometheus text format: per-route latency,
+queries and ORM rows per request, DB time and upstream LLM latency. Recorded
+by MetricsMiddleware plus SQLAlchemy event hooks; served at /metrics.
+"""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Mapper
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 500, 1000, 10000)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 60.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, rendered like prometheus_client's."""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...], labels: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.labels = labels
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values: str):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def clear(self):
+        self._series.clear()
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        for label_values, (counts, total, count) in sorted(self._series.items()):
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            sep = "," if labels else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                yield f'{self.name}_bucket{{{labels}{sep}le="{le}"}} {cumulative}'
+            yield f"{self.name}_sum{{{labels}}} {total}"
+            yield f"{self.name}_count{{{labels}}} {count}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RequestTimings:
+    """What one request spent, filled in by the hooks while it runs."""
+    __slots__ = ("started", "queries", "rows", "db_seconds", "llm_calls", "llm_seconds", "token")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.rows = 0
+        self.db_seconds = 0.0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+
+    def server_timing(self, total: float) -> str:
+        return (
+            f'app;dur={total * 1000:.1f}, '
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries, {self.rows} rows", '
+            f'llm;dur={self.llm_seconds * 1000:.1f};desc="{self.llm_calls} calls"'
+        )
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = True
+        self.request_latency = Histogram(
+            "habitos_http_request_duration_seconds", "Request latency by route.",
+            LATENCY_BUCKETS, ("method", "route", "status"),
+        )
+        self.request_queries = Histogram(
+            "habitos_db_queries_per_request", "SQL statements executed per request.", COUNT_BUCKETS, ("route",),
+        )
+        self.request_rows = Histogram(
+            "habitos_db_orm_rows_per_request", "ORM rows loaded per request.", COUNT_BUCKETS, ("route",),
+        )
+        self.request_db_seconds = Histogram(
+            "habitos_db_seconds_per_request", "Time spent executing SQL per request.", LATENCY_BUCKETS, ("route",),
+        )
+        self.llm_latency = Histogram(
+            "habitos_llm_request_duration_seconds", "Upstream Gemini call latency by outcome.",
+            LLM_BUCKETS, ("outcome",),
+        )
+
+    def histograms(self):
+        return (self.request_latency, self.request_queries, self.request_rows, self.request_db_seconds, self.llm_latency)
+
+    def begin_request(self) -> Optional[RequestTimings]:
+        if not self.enabled:
+            return None
+        timings = RequestTimings()
+        timings.token = _current.set(timings)
+        return timings
+
+    def end_request(self, timings: RequestTimings, method: str, route: str, status: int) -> float:
+        total = time.perf_counter() - timings.started
+        _current.reset(timings.token)
+        self.request_latency.observe(total, method, route, str(status))
+        self.request_queries.observe(timings.queries, route)
+        self.request_rows.observe(timings.rows, route)
+        self.request_db_seconds.observe(timings.db_seconds, route)
+        return total
+
+    def observe_llm(self, seconds: float, outcome: str):
+        if not self.enabled:
+            return
+        self.llm_latency.observe(seconds, outcome)
+        timings = _current.get()
+        if timings is not None:
+            timings.llm_calls += 1
+            timings.llm_seconds += seconds
+
+    def clear(self):
+        for histogram in self.histograms():
+            histogram.clear()
+
+    def render(self, stats: Optional[Dict[str, dict]] = None) -> str:
+        """
+        All histograms, plus one gauge per numeric value of each stats dict
+        (habitos_<prefix>_<key>); string values become info-style series.
+        """
+        lines = []
+        for histogram in self.histograms():
+            lines.extend(histogram.render())
+        for prefix, values in (stats or {}).items():
+            for key, value in values.items():
+                name = f"habitos_{prefix}_{key}"
+                if isinstance(value, bool):
+                    value = int(value)
+                if isinstance(value, (int, float)):
+                    lines += [f"# TYPE {name} gauge", f"{name} {value}"]
+                elif isinstance(value, str):
+                    lines += [f"# TYPE {name} gauge", f'{name}{{value="{_escape(value)}"}} 1']
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current.get()
+    if timings is not None:
+        started = conn.info.get("query_started")
+        if started:
+            timings.db_seconds += time.perf_counter() - started.pop()
+        timings.queries += 1
+
+
+def _on_load(target, context):
+    timings = _current.get()
+    if timings is not None:
+        timings.rows += 1
+
+
+def instrument_engine(engine: Engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# Every mapped class: counts ORM instances materialized from query results
+event.listen(Mapper, "load", _on_load)
+
+
+def route_template(scope) -> str:
+    """
+    Path template of the matched route, e.g. /api/v1/habits/{habit_id}/insights.
+    Routes of included routers only carry their own suffix, so the prefix is
+    recovered from the request path.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    try:
+        suffix = route.path_format.format(**scope.get("path_params", {}))
+    except (AttributeError, KeyError, IndexError, ValueError):
+        return template
+    path = scope["path"]
+    if suffix and path.endswith(suffix):
+        return path[: len(path) - len(suffix)] + template
+    return template
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (streaming responses pass through untouched).
+    Routes are labelled by their path template, so /habits/1 and /habits/2
+    share one series. With server_timing, responses carry a Server-Timing
+    header with the request's app/db/llm breakdown so far.
+    """
+
+    def __init__(self, app, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        timings = metrics.begin_request()
+        if timings is None:
+            return await self.app(scope, receive, send)
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    total = time.perf_counter() - timings.started
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"server-timing", timings.server_timing(total).encode())
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.end_request(timings, scope["method"], route_template(scope), status)
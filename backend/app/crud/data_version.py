@@ -0,0 +1,35 @@
+"""
+Per-user data versions for conditional GETs. Writers bump the version inside
+their own transaction, so a committed change and its new version become
+visible together; readers compare one primary-key lookup with If-None-Match.
+"""
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.crud.habit import id_batches
+from app.crud.prediction import dialect_insert
+from app.models.habit import Habit
+from app.models.user import UserDataVersion
+
+
+def get_data_version(db: Session, user_id: int) -> int:
+    return db.scalar(select(UserDataVersion.version).where(UserDataVersion.user_id == user_id)) or 0
+
+
+def bump_data_versions(db: Session, user_ids: Iterable[int]):
+    """Increment the version of each user; the caller commits."""
+    rows = [{"user_id": user_id, "version": 1} for user_id in sorted(set(user_ids)) if user_id is not None]
+    if rows:
+        table = UserDataVersion.__table__
+        stmt = dialect_insert(db, table)
+        db.execute(stmt.on_conflict_do_update(index_elements=["user_id"], set_={"version": table.c.version + 1}), rows)
+
+
+def bump_habit_owners(db: Session, habit_ids: Iterable[int]):
+    """Increment the version of every user owning one of the habits."""
+    user_ids = set()
+    for batch in id_batches(habit_ids):
+        user_ids.update(db.scalars(select(Habit.user_id).where(Habit.id.in_(batch)).distinct()))
+    bump_data_versions(db, user_ids)
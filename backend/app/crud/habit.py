@@ -0,0 +1,313 @@
+from datetime import date, datetime, time, timedelta
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.engine.day_bitmap import DayBitmap
+from app.models.habit import Habit, HabitLog, HabitStats
+
+# Ids per IN (...) list, well below SQLite's bound parameter limit
+ID_BATCH = 10_000
+
+
+def id_batches(ids: Iterable[int]) -> Iterator[List[int]]:
+    ids = list(ids)
+    for i in range(0, len(ids), ID_BATCH):
+        yield ids[i:i + ID_BATCH]
+
+
+def get_completion_history(
+    db: Session, habit_ids: List[int], limit: Optional[int] = None
+) -> Dict[int, List[datetime]]:
+    """
+    Completion timestamps of many habits in one IN query, oldest first.
+    With `limit`, only each habit's most recent `limit` completions are returned.
+    """
+    query = db.query(HabitLog.habit_id, HabitLog.completed_at).filter(HabitLog.habit_id.in_(habit_ids))
+    if limit is not None:
+        rank = func.row_number().over(
+            partition_by=HabitLog.habit_id, order_by=HabitLog.completed_at.desc()
+        ).label("rank")
+        recent = query.add_columns(rank).subquery()
+        query = db.query(recent.c.habit_id, recent.c.completed_at).filter(recent.c.rank <= limit)
+        columns = recent.c
+    else:
+        columns = HabitLog
+
+    history = {habit_id: [] for habit_id in habit_ids}
+    for habit_id, completed_at in query.order_by(columns.habit_id, columns.completed_at):
+        history[habit_id].append(completed_at)
+    return history
+
+
+def _day_bounds(start: date, end: date) -> Tuple[datetime, datetime]:
+    return datetime.combine(start, time.min), datetime.combine(end + timedelta(days=1), time.min)
+
+
+def get_completion_days(db: Session, habit_ids: List[int], start: date, end: date) -> Dict[int, List[date]]:
+    """
+    Distinct completed days of many habits within [start, end], sorted, in one IN query.
+    """
+    lower, upper = _day_bounds(start, end)
+    rows = db.query(HabitLog.habit_id, HabitLog.completed_at).filter(
+        HabitLog.habit_id.in_(habit_ids),
+        HabitLog.completed_at >= lower,
+        HabitLog.completed_at < upper,
+    ).order_by(HabitLog.habit_id, HabitLog.completed_at)
+
+    days = {habit_id: [] for habit_id in habit_ids}
+    for habit_id, completed_at in rows:
+        habit_days = days[habit_id]
+        if not habit_days or habit_days[-1] != completed_at.date():
+            habit_days.append(completed_at.date())
+    return days
+
+
+def get_completion_page(
+    db: Session,
+    habit_id: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: int = 100,
+) -> List[Tuple[int, datetime]]:
+    """
+    One page of (log id, completed_at), oldest first, resuming after the
+    (completed_at, id) keyset of the previous page's last row.
+    """
+    query = db.query(HabitLog.id, HabitLog.completed_at).filter(HabitLog.habit_id == habit_id)
+    if start is not None:
+        query = query.filter(HabitLog.completed_at >= _day_bounds(start, start)[0])
+    if end is not None:
+        query = query.filter(HabitLog.completed_at < _day_bounds(end, end)[1])
+    if after is not None:
+        query = query.filter(tuple_(HabitLog.completed_at, HabitLog.id) > tuple_(*after))
+    return query.order_by(HabitLog.completed_at, HabitLog.id).limit(limit).all()
+
+
+# --- Materialized HabitStats ---
+
+def _reset_stats(stats: HabitStats) -> HabitStats:
+    stats.total_completions = 0
+    stats.first_completed_at = None
+    stats.last_completed_at = None
+    stats.window_date = None
+    stats.completions_7d = 0
+    stats.completions_30d = 0
+    stats.mood_score_sum = 0
+    stats.mood_score_count = 0
+    stats.difficulty_rating_sum = 0
+    stats.difficulty_rating_count = 0
+    stats.bitmap_start = None
+    stats.completion_bitmap = None
+    return stats
+
+
+def get_day_bitmap(stats: HabitStats) -> DayBitmap:
+    return DayBitmap.from_bytes(stats.bitmap_start, stats.completion_bitmap)
+
+
+def _store_bitmap(stats: HabitStats, bitmap: DayBitmap):
+    stats.bitmap_start = bitmap.start
+    stats.completion_bitmap = bitmap.to_bytes()
+
+
+def streaks_from_stats(stats: HabitStats) -> Tuple[int, int]:
+    """
+    (current_streak, longest_streak) from the stored day bitmap.
+    """
+    bitmap = get_day_bitmap(stats)
+    return bitmap.current_streak(), bitmap.longest_streak()
+
+
+def _accumulate(stats: HabitStats, completed_at: datetime, mood_score, difficulty_rating):
+    stats.total_completions += 1
+    if stats.first_completed_at is None or completed_at < stats.first_completed_at:
+        stats.first_completed_at = completed_at
+    if stats.last_completed_at is None or completed_at > stats.last_completed_at:
+        stats.last_completed_at = completed_at
+    if mood_score is not None:
+        stats.mood_score_sum += mood_score
+        stats.mood_score_count += 1
+    if difficulty_rating is not None:
+        stats.difficulty_rating_sum += difficulty_rating
+        stats.difficulty_rating_count += 1
+
+
+def _set_windows(stats: HabitStats, window_date: date, completion_dates: Iterable[date]):
+    ages = [(window_date - d).days for d in completion_dates]
+    stats.window_date = window_date
+    stats.completions_7d = sum(1 for age in ages if 0 <= age < 7)
+    stats.completions_30d = sum(1 for age in ages if 0 <= age < 30)
+
+
+def new_habit_stats(habit_id: Optional[int] = None) -> HabitStats:
+    return _reset_stats(HabitStats(habit_id=habit_id))
+
+
+def get_habit_stats(db: Session, habit_id: int) -> HabitStats:
+    """
+    Stats row for a habit, backfilled from its logs the first time it is needed.
+    Call before adding a new (unflushed) log so it is not counted twice.
+    """
+    stats = db.get(HabitStats, habit_id)
+    if stats is None:
+        stats = rebuild_habit_stats(db, [habit_id])[habit_id]
+    return stats
+
+
+def get_habit_stats_map(db: Session, habit_ids: List[int]) -> Dict[int, HabitStats]:
+    """
+    Stats rows for many habits in one query, backfilling any that are missing.
+    """
+    result = {
+        s.habit_id: s for batch in id_batches(habit_ids)
+        for s in db.query(HabitStats).filter(HabitStats.habit_id.in_(batch))
+    }
+    missing = [habit_id for habit_id in habit_ids if habit_id not in result]
+    if missing:
+        result.update(rebuild_habit_stats(db, missing))
+    return result
+
+
+def record_log(db: Session, stats: HabitStats, log: HabitLog) -> HabitStats:
+    """
+    Fold one new completion into the stats row, in the caller's transaction.
+    Costs O(1) unless the rolling window moves to a new day, in which case
+    only the last 30 days of logs are recounted.
+    """
+    day = log.completed_at.date()
+
+    if stats.window_date is None or day > stats.window_date:
+        window_start = datetime.combine(day - timedelta(days=29), time.min)
+        recent = db.query(HabitLog.completed_at).filter(
+            HabitLog.habit_id == stats.habit_id,
+            HabitLog.completed_at >= window_start,
+            HabitLog.completed_at < datetime.combine(day, time.min),
+        )
+        _set_windows(stats, day, [completed_at.date() for (completed_at,) in recent])
+
+    age = (stats.window_date - day).days
+    if age < 7:
+        stats.completions_7d += 1
+    if age < 30:
+        stats.completions_30d += 1
+
+    _accumulate(stats, log.completed_at, log.mood_score, log.difficulty_rating)
+    bitmap = get_day_bitmap(stats)
+    bitmap.add(day)
+    _store_bitmap(stats, bitmap)
+    db.add(stats)
+    return stats
+
+
+def record_logs_bulk(stats: HabitStats, new_logs: Iterable[dict], completion_dates: List[date]) -> HabitStats:
+    """
+    Fold a batch of inserted logs (dicts of HabitLog columns) into a stats row.
+    completion_dates must hold the date of every log of the habit, old and new,
+    so the rolling windows can be re-anchored in one pass.
+    """
+    for log in new_logs:
+        _accumulate(stats, log["completed_at"], log.get("mood_score"), log.get("difficulty_rating"))
+    if completion_dates:
+        _set_windows(stats, max(completion_dates), completion_dates)
+        _store_bitmap(stats, DayBitmap.from_days(completion_dates))
+    return stats
+
+
+def rebuild_habit_stats(db: Session, habit_ids: List[int]) -> Dict[int, HabitStats]:
+    """
+    Recompute stats rows for the given habits from their full log history.
+    Rows are added to the session; the caller commits.
+    """
+    existing = {
+        s.habit_id: _reset_stats(s) for batch in id_batches(habit_ids)
+        for s in db.query(HabitStats).filter(HabitStats.habit_id.in_(batch))
+    }
+    result = {habit_id: existing.get(habit_id) or new_habit_stats(habit_id) for habit_id in habit_ids}
+
+    for batch in id_batches(habit_ids):
+        rows = db.query(
+            HabitLog.habit_id,
+            HabitLog.completed_at,
+            HabitLog.mood_score,
+            HabitLog.difficulty_rating,
+        ).filter(HabitLog.habit_id.in_(batch)).order_by(HabitLog.habit_id, HabitLog.completed_at)
+
+        for habit_id, habit_rows in groupby(rows, key=lambda r: r.habit_id):
+            stats = result[habit_id]
+            dates = []
+            for _, completed_at, mood_score, difficulty_rating in habit_rows:
+                _accumulate(stats, completed_at, mood_score, difficulty_rating)
+                dates.append(completed_at.date())
+            _set_windows(stats, dates[-1], dates)
+            _store_bitmap(stats, DayBitmap.from_days(dates))
+
+    db.add_all(result.values())
+    return result
+
+
+def rebuild_all_habit_stats(db: Session, chunk_size: int = 1000) -> int:
+    """
+    Backfill stats for every habit, committing one chunk of habits at a time.
+    Returns the number of habits processed.
+    """
+    processed = 0
+    last_id = 0
+    while True:
+        habit_ids = [
+            habit_id for (habit_id,) in db.query(Habit.id)
+            .filter(Habit.id > last_id)
+            .order_by(Habit.id)
+            .limit(chunk_size)
+        ]
+        if not habit_ids:
+            return processed
+        rebuild_habit_stats(db, habit_ids)
+        db.commit()
+        db.expunge_all()
+        processed += len(habit_ids)
+        last_id = habit_ids[-1]
+
+
+def recompute_all_streaks(db: Session, chunk_size: int = 5000) -> int:
+    """
+    Reset current/longest streak of every habit from its stored day bitmap,
+    reading only habit_stats, one chunk of habits per transaction. Corrected
+    habits get new data versions and lose today's snapshots and cached
+    scores, like any other write. Returns the number of habits whose streaks
+    changed.
+    """
+    from app.core.cache import score_cache
+    from app.crud.data_version import bump_habit_owners
+    from app.crud.scoring import invalidate_snapshots
+
+    changed = 0
+    last_id = 0
+    while True:
+        rows = db.query(
+            Habit.id, Habit.current_streak, Habit.longest_streak,
+            HabitStats.bitmap_start, HabitStats.completion_bitmap,
+        ).join(HabitStats, HabitStats.habit_id == Habit.id).filter(
+            Habit.id > last_id
+        ).order_by(Habit.id).limit(chunk_size).all()
+        if not rows:
+            return changed
+
+        updates = []
+        for habit_id, current, longest, bitmap_start, completion_bitmap in rows:
+            bitmap = DayBitmap.from_bytes(bitmap_start, completion_bitmap)
+            streaks = (bitmap.current_streak(), bitmap.longest_streak())
+            if streaks != (current, longest):
+                updates.append({"id": habit_id, "current_streak": streaks[0], "longest_streak": streaks[1]})
+        fixed = [row["id"] for row in updates]
+        if updates:
+            db.execute(update(Habit), updates)
+            bump_habit_owners(db, fixed)
+            invalidate_snapshots(db, fixed)
+        db.commit()
+        score_cache.invalidate(*fixed)
+        changed += len(updates)
+        last_id = rows[-1][0]
@@ -0,0 +1,71 @@
+"""
+Multi-process driver for the scoring job. Scoring is pure CPU work per habit,
+so one process is GIL-bound; here habits are sharded by id range and each
+worker process loads and scores its shards over its own database connection.
+The parent only writes results, in shard order, so progress stays resumable.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from multiprocessing import get_context
+from typing import Iterator, Optional
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.crud.scoring import load_scoring_inputs, score_inputs
+from app.models.habit import Habit
+
+# Shards scored ahead of the writer, per worker
+PREFETCH_PER_WORKER = 2
+
+_worker_engine: Optional[Engine] = None
+
+
+def _score_shard(database_url: str, day: date, now: datetime, after_id: int, upto_id: int) -> tuple:
+    # Runs in a worker process: one engine per process, reused across shards
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = create_engine(database_url)
+    with Session(_worker_engine) as db:
+        _, inputs = load_scoring_inputs(db, now, after_id, upto_id=upto_id)
+    return (upto_id, *score_inputs(inputs, day, now))
+
+
+def shard_bounds(after_id: int, max_id: int, chunk_size: int) -> list:
+    """(after_id, upto_id] ranges of chunk_size ids covering (after_id, max_id]."""
+    return [(lo, min(lo + chunk_size, max_id)) for lo in range(after_id, max_id, chunk_size)]
+
+
+def parallel_chunks(
+    db: Session, day: date, now: datetime, after_id: int, chunk_size: int, workers: int
+) -> Iterator[tuple]:
+    """
+    Yield (last_id, snapshots, changed) per id-range shard, in id order, like
+    the serial path. A bounded number of shards is in flight at once; closing
+    the iterator cancels the ones not started yet.
+    """
+    max_id = db.scalar(select(func.max(Habit.id))) or 0
+    shards = iter(shard_bounds(after_id, max_id, chunk_size))
+    database_url = db.get_bind().url.render_as_string(hide_password=False)
+
+    # spawn: never fork a process that may hold open connections or running threads
+    with ProcessPoolExecutor(workers, mp_context=get_context("spawn")) as pool:
+        pending = deque()
+
+        def submit():
+            shard = next(shards, None)
+            if shard is not None:
+                pending.append(pool.submit(_score_shard, database_url, day, now, *shard))
+
+        for _ in range(workers * PREFETCH_PER_WORKER):
+            submit()
+        try:
+            while pending:
+                result = pending.popleft().result()
+                submit()
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,218 @@
+import asyncio
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.habit import Habit, PredictionDailyAggregate, PredictionLog
+
+
+def prediction_day(moment: datetime) -> datetime:
+    """predicted_for is stored truncated to midnight UTC, one row per habit per day."""
+    return datetime.combine(moment.date(), time.min)
+
+
+def sql_prediction_day(dialect: str, column):
+    """prediction_day() in SQL: `column` truncated to midnight, in the form the DateTime type stores."""
+    if dialect == "sqlite":
+        return func.strftime("%Y-%m-%d 00:00:00.000000", column)
+    if dialect == "postgresql":
+        return func.date_trunc("day", column)
+    raise NotImplementedError(f"Day truncation is not implemented for {dialect}")
+
+
+def dialect_insert(db: Session, table):
+    """INSERT supporting on_conflict_do_update on the session's database."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    raise NotImplementedError(f"Upsert is not implemented for {dialect}")
+
+
+def _upsert(db: Session, table, rows: List[dict], key: Tuple[str, ...], update_columns: Tuple[str, ...]):
+    stmt = dialect_insert(db, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(key),
+        set_={column: stmt.excluded[column] for column in update_columns},
+    )
+    db.execute(stmt, rows)
+
+
+def upsert_predictions(db: Session, rows: List[dict]):
+    """Insert or replace the prediction for each (habit_id, predicted_for)."""
+    if rows:
+        _upsert(
+            db, PredictionLog.__table__, rows,
+            key=("habit_id", "predicted_for"),
+            update_columns=("score", "risk_level", "explanation", "model_version", "created_at"),
+        )
+
+
+def compact_predictions(db: Session, retain_days: Optional[int] = None, now: Optional[datetime] = None) -> int:
+    """
+    Roll predictions created more than retain_days ago into per-habit daily
+    aggregates and delete them, in two statements however many there are.
+    Returns the number of rows compacted.
+    """
+    retain_days = settings.PREDICTION_RETENTION_DAYS if retain_days is None else retain_days
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retain_days)
+
+    logs = PredictionLog.__table__
+    day = func.date(logs.c.predicted_for)
+    # Risk level of the day's most recent prediction
+    later = logs.alias("later")
+    last_risk_level = (
+        select(later.c.risk_level)
+        .where(later.c.habit_id == logs.c.habit_id, func.date(later.c.predicted_for) == day,
+               later.c.created_at < cutoff)
+        .order_by(later.c.created_at.desc(), later.c.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    rollup = (
+        select(logs.c.habit_id, day, func.count(), func.avg(logs.c.score), func.min(logs.c.score),
+               func.max(logs.c.score), last_risk_level)
+        .where(logs.c.created_at < cutoff)
+        .group_by(logs.c.habit_id, day)
+    )
+
+    # Merge with aggregates from earlier compactions of the same days
+    aggregates = PredictionDailyAggregate.__table__
+    stmt = dialect_insert(db, aggregates).from_select(
+        ["habit_id", "day", "predictions", "avg_score", "min_score", "max_score", "last_risk_level"], rollup
+    )
+    new = stmt.excluded
+    count = aggregates.c.predictions + new.predictions
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["habit_id", "day"],
+        set_={
+            "predictions": count,
+            "avg_score": (aggregates.c.avg_score * aggregates.c.predictions + new.avg_score * new.predictions) / count,
+            "min_score": case((new.min_score < aggregates.c.min_score, new.min_score), else_=aggregates.c.min_score),
+            "max_score": case((new.max_score > aggregates.c.max_score, new.max_score), else_=aggregates.c.max_score),
+            "last_risk_level": new.last_risk_level,
+        },
+    ))
+    return db.execute(delete(PredictionLog).where(PredictionLog.created_at < cutoff)).rowcount
+
+
+class PredictionWriter:
+    """
+    Write-behind buffer for insights results. Reads enqueue the latest prediction
+    per habit per day (and the refreshed success probability); a background task
+    flushes them in batches, skipping values identical to what was last written.
+    """
+
+    def __init__(self):
+        self._predictions: Dict[Tuple[int, datetime], dict] = {}
+        self._probabilities: Dict[int, float] = {}
+        self._written: Dict[Tuple[int, datetime], tuple] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_compaction: Optional[date] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._predictions) + len(self._probabilities)
+
+    def add(self, habit_id: int, risk: dict, success_probability: float, previous_probability: float = None):
+        predicted_for = prediction_day(datetime.utcnow() + timedelta(days=1))
+        key = (habit_id, predicted_for)
+        if self._written.get(key) != (risk["risk_score"], risk["risk_level"]):
+            self._predictions[key] = {
+                "habit_id": habit_id,
+                "predicted_for": predicted_for,
+                "score": risk["risk_score"],
+                "risk_level": risk["risk_level"],
+                "explanation": risk["recommendation"],
+                "model_version": "heuristic-v1",
+                "created_at": datetime.utcnow(),
+            }
+        if success_probability != previous_probability:
+            self._probabilities[habit_id] = success_probability
+
+        if self._wakeup is not None and self.pending >= settings.PREDICTION_FLUSH_BATCH_SIZE:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Write everything buffered so far in one transaction. Returns rows written."""
+        from app.crud.data_version import bump_habit_owners
+        from app.db.session import AsyncWriteSessionLocal
+
+        predictions, self._predictions = self._predictions, {}
+        probabilities, self._probabilities = self._probabilities, {}
+        if not predictions and not probabilities:
+            return 0
+
+        try:
+            async with AsyncWriteSessionLocal() as db:
+                await db.run_sync(upsert_predictions, list(predictions.values()))
+                if probabilities:
+                    await db.execute(
+                        update(Habit),
+                        [{"id": habit_id, "success_probability": p} for habit_id, p in probabilities.items()],
+                    )
+                    # Habit listings show the probability
+                    await db.run_sync(bump_habit_owners, list(probabilities))
+                await db.commit()
+        except Exception:
+            # Keep the batch for the next attempt unless newer values arrived meanwhile
+            for key, row in predictions.items():
+                self._predictions.setdefault(key, row)
+            for habit_id, p in probabilities.items():
+                self._probabilities.setdefault(habit_id, p)
+            raise
+
+        today = prediction_day(datetime.utcnow())
+        self._written = {key: value for key, value in self._written.items() if key[1] > today}
+        self._written.update({key: (row["score"], row["risk_level"]) for key, row in predictions.items()})
+        return len(predictions) + len(probabilities)
+
+    async def compact(self) -> int:
+        from app.db.session import AsyncWriteSessionLocal
+
+        # Once a day even when it fails, rather than again on every flush
+        self._last_compaction = datetime.utcnow().date()
+        async with AsyncWriteSessionLocal() as db:
+            compacted = await db.run_sync(compact_predictions)
+            await db.commit()
+        return compacted
+
+    async def _run(self, interval: float):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+                if self._last_compaction != datetime.utcnow().date():
+                    await self.compact()
+            except Exception as e:
+                print(f"Prediction flush failed: {e}")
+
+    def start(self, interval: Optional[float] = None):
+        if self._task is None:
+            self._written.clear()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(interval or settings.PREDICTION_FLUSH_INTERVAL_SECONDS))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        await self.flush()
+
+
+prediction_writer = PredictionWriter()
@@ -0,0 +1,339 @@
+import asyncio
+import threading
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, delete, exists, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.data_version import bump_habit_owners
+from app.crud.habit import id_batches
+from app.engine.batch_scoring import score_batch
+from app.engine.intelligence import RECOMMENDATIONS
+from app.models.habit import Habit, HabitScoreSnapshot, HabitStats, ScoringRun
+
+
+def snapshot_day(now: Optional[datetime] = None) -> date:
+    return (now or datetime.utcnow()).date()
+
+
+def get_snapshots(db: Session, habit_ids: Iterable[int], day: Optional[date] = None) -> Dict[int, HabitScoreSnapshot]:
+    day = day or snapshot_day()
+    return {
+        s.habit_id: s for s in db.scalars(
+            select(HabitScoreSnapshot).where(
+                HabitScoreSnapshot.day == day, HabitScoreSnapshot.habit_id.in_(list(habit_ids))
+            )
+        )
+    }
+
+
+def invalidate_snapshots(db: Session, habit_ids: Iterable[int], day: Optional[date] = None):
+    """Drop today's snapshots of habits that were just written to (flushed with the caller's commit)."""
+    for batch in id_batches(habit_ids):
+        db.execute(delete(HabitScoreSnapshot).where(
+            HabitScoreSnapshot.day == (day or snapshot_day()), HabitScoreSnapshot.habit_id.in_(batch)
+        ))
+
+
+def snapshot_scores(snapshot: HabitScoreSnapshot) -> dict:
+    """A snapshot in the shape of a live-scored insight: success_probability and the risk dict."""
+    return {
+        "success_probability": snapshot.success_probability,
+        "risk": {
+            "risk_score": snapshot.risk_score,
+            "risk_level": snapshot.risk_level,
+            "factors": [
+                {"factor": "difficulty", "impact": snapshot.difficulty_impact,
+                 "note": f"difficulty {snapshot.difficulty}/5"},
+                {"factor": "inactivity", "impact": snapshot.inactivity_impact,
+                 "note": f"{snapshot.days_since_last} days since last completion"},
+                {"factor": "consistency", "impact": snapshot.consistency_impact,
+                 "note": f"{snapshot.total_completions} logs / {snapshot.days_since_creation} days"},
+                {"factor": "streak", "impact": snapshot.streak_impact,
+                 "note": f"streak {snapshot.current_streak}"},
+            ],
+            "recommendation": RECOMMENDATIONS[snapshot.risk_level],
+        },
+    }
+
+
+class ScoringInput(NamedTuple):
+    id: int
+    difficulty: int
+    current_streak: int
+    created_at: datetime
+    success_probability: float
+    total_completions: int
+    last_completed_at: Optional[datetime]
+
+
+def load_scoring_inputs(
+    db: Session, now: datetime, after_id: int, limit: Optional[int] = None, upto_id: Optional[int] = None
+) -> Tuple[int, List[ScoringInput]]:
+    """
+    Habits with id > after_id, the next `limit` of them or those up to upto_id,
+    with their aggregates. Habits created after `now` are left to live
+    scoring. Returns (last id covered, inputs).
+    """
+    query = (
+        select(
+            Habit.id, Habit.difficulty, Habit.current_streak, Habit.created_at, Habit.success_probability,
+            HabitStats.total_completions, HabitStats.last_completed_at,
+        )
+        .outerjoin(HabitStats, HabitStats.habit_id == Habit.id)
+        .where(Habit.id > after_id)
+        .order_by(Habit.id)
+    )
+    if upto_id is not None:
+        query = query.where(Habit.id <= upto_id)
+    if limit is not None:
+        query = query.limit(limit)
+    rows = db.execute(query).all()
+    last_id = upto_id if upto_id is not None else (rows[-1].id if rows else after_id)
+    return last_id, [ScoringInput(*row) for row in rows if row.created_at <= now]
+
+
+def score_inputs(inputs: List[ScoringInput], day: date, now: datetime) -> Tuple[List[dict], List[dict]]:
+    """
+    Score habits in one vectorized batch. Returns the snapshot rows and the
+    success_probability updates for habits whose value changed.
+    """
+    if not inputs:
+        return [], []
+    scores = score_batch(
+        difficulty=[r.difficulty for r in inputs],
+        current_streak=[r.current_streak for r in inputs],
+        created_at=[r.created_at for r in inputs],
+        total_logs=[r.total_completions or 0 for r in inputs],
+        last_completed_at=[r.last_completed_at for r in inputs],
+        now=now,
+    )
+    probabilities = scores["success_probability"].tolist()
+    snapshots = [
+        {
+            "habit_id": r.id,
+            "day": day,
+            "success_probability": p,
+            "risk_score": risk_score,
+            "risk_level": risk_level,
+            "difficulty_impact": f[0],
+            "inactivity_impact": f[1],
+            "consistency_impact": f[2],
+            "streak_impact": f[3],
+            "difficulty": r.difficulty,
+            "current_streak": r.current_streak,
+            "total_completions": r.total_completions or 0,
+            "days_since_last": days_since_last,
+            "days_since_creation": days_since_creation,
+            "scored_at": now,
+        }
+        for r, p, risk_score, risk_level, f, days_since_last, days_since_creation in zip(
+            inputs, probabilities, scores["risk_score"].tolist(), scores["risk_level"].tolist(),
+            scores["factors"].tolist(), scores["days_since_last"].tolist(), scores["days_since_creation"].tolist(),
+        )
+    ]
+    changed = [
+        {"b_id": r.id, "b_p": p, "b_difficulty": r.difficulty, "b_streak": r.current_streak,
+         "b_total": r.total_completions or 0}
+        for r, p in zip(inputs, probabilities) if r.success_probability != p
+    ]
+    return snapshots, changed
+
+
+def _scored_inputs_current(habit_id, difficulty, current_streak, total_completions):
+    """
+    Whether the habit still has the inputs it was scored from. A log or streak
+    repair committed since the inputs were loaded changes one of them.
+    """
+    stats_total = select(HabitStats.total_completions).where(HabitStats.habit_id == habit_id).scalar_subquery()
+    return and_(
+        Habit.difficulty == difficulty,
+        Habit.current_streak == current_streak,
+        func.coalesce(stats_total, 0) == total_completions,
+    )
+
+
+def write_scores(db: Session, snapshots: List[dict], changed: List[dict]):
+    """
+    Insert the snapshots and update success_probability, skipping habits
+    written to after their inputs were loaded: those writes dropped the
+    day's snapshot and set a fresh probability, which stale scores must not
+    overwrite.
+    """
+    # Core executemany: ORM bulk persistence costs more than the scoring itself at this volume
+    conn = db.connection()
+    if snapshots:
+        table = HabitScoreSnapshot.__table__
+        columns = list(snapshots[0])
+        fresh = exists().where(Habit.id == bindparam("habit_id"), _scored_inputs_current(
+            bindparam("habit_id"), bindparam("difficulty"), bindparam("current_streak"),
+            bindparam("total_completions"),
+        ))
+        conn.execute(
+            table.insert().from_select(
+                columns, select(*(bindparam(c, type_=table.c[c].type) for c in columns)).where(fresh)
+            ),
+            snapshots,
+        )
+    if changed:
+        habits = Habit.__table__
+        conn.execute(
+            habits.update()
+            .where(habits.c.id == bindparam("b_id"), _scored_inputs_current(
+                habits.c.id, bindparam("b_difficulty"), bindparam("b_streak"), bindparam("b_total"),
+            ))
+            .values(success_probability=bindparam("b_p")),
+            changed,
+        )
+        bump_habit_owners(db, [row["b_id"] for row in changed])
+
+
+def _serial_chunks(db: Session, day: date, now: datetime, after_id: int, chunk_size: int) -> Iterator[tuple]:
+    while True:
+        last_id, inputs = load_scoring_inputs(db, now, after_id, limit=chunk_size)
+        if last_id == after_id:
+            return
+        yield (last_id, *score_inputs(inputs, day, now))
+        after_id = last_id
+
+
+def run_scoring_job(
+    db: Session,
+    day: Optional[date] = None,
+    chunk_size: Optional[int] = None,
+    force: bool = False,
+    report: Callable[[str], None] = print,
+    should_stop: Callable[[], bool] = lambda: False,
+    workers: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> dict:
+    """
+    Score every habit into the day's snapshots, one committed chunk at a time.
+    Progress is recorded in scoring_runs with each chunk, so a job that was
+    interrupted (or stopped via should_stop) resumes where it left off; a
+    finished day is skipped unless `force` rescores it from scratch.
+    With workers > 1 (default SCORING_WORKERS) shards are scored in worker
+    processes, see parallel_scoring. Scores are as of `now`, by default the
+    moment the day's run first started. Returns throughput figures.
+    """
+    day = day or snapshot_day()
+    chunk_size = chunk_size or settings.SCORING_CHUNK_SIZE
+
+    run = db.get(ScoringRun, day)
+    if run is not None and force:
+        db.execute(delete(HabitScoreSnapshot).where(HabitScoreSnapshot.day == day))
+        db.delete(run)
+        db.flush()
+        run = None
+    if run is None:
+        # Scores are as of the moment the day's first attempt started, so resumed chunks agree
+        run = ScoringRun(day=day, started_at=now or datetime.utcnow(), last_habit_id=0, habits_scored=0)
+        db.add(run)
+        db.commit()
+    elif run.finished_at is not None:
+        return {"day": day, "habits": run.habits_scored, "seconds": 0.0, "habits_per_second": 0.0,
+                "skipped": True, "finished": True}
+    elif run.last_habit_id:
+        report(f"Resuming scoring for {day} after habit {run.last_habit_id} ({run.habits_scored} done)")
+
+    workers = workers or settings.SCORING_WORKERS
+    if workers > 1 and db.get_bind().url.database in (None, "", ":memory:"):
+        workers = 1  # worker processes can't see an in-memory database
+    if workers > 1:
+        from app.crud.parallel_scoring import parallel_chunks
+        chunks = parallel_chunks(db, day, run.started_at, run.last_habit_id, chunk_size, workers)
+    else:
+        chunks = _serial_chunks(db, day, run.started_at, run.last_habit_id, chunk_size)
+
+    start = perf_counter()
+    scored = 0
+    try:
+        for last_id, snapshots, changed in chunks:
+            if should_stop():
+                # The next run picks up after run.last_habit_id
+                return {"day": day, "habits": scored, "seconds": perf_counter() - start,
+                        "habits_per_second": 0.0, "skipped": False, "finished": False}
+            write_scores(db, snapshots, changed)
+            run.last_habit_id = last_id
+            run.habits_scored += len(snapshots)
+            db.commit()
+            scored += len(snapshots)
+            elapsed = perf_counter() - start
+            report(f"Scored {run.habits_scored} habits ({scored / elapsed:,.0f} habits/s)")
+    finally:
+        chunks.close()
+
+    run.finished_at = datetime.utcnow()
+    db.execute(delete(HabitScoreSnapshot).where(
+        HabitScoreSnapshot.day < day - timedelta(days=settings.SCORING_SNAPSHOT_RETENTION_DAYS)
+    ))
+    db.commit()
+    elapsed = perf_counter() - start
+    return {
+        "day": day,
+        "habits": scored,
+        "seconds": elapsed,
+        "habits_per_second": scored / elapsed if elapsed else 0.0,
+        "skipped": False,
+        "finished": True,
+    }
+
+
+class ScoringScheduler:
+    """
+    Runs the scoring job in a worker thread right after each UTC midnight,
+    and once on startup when today's run hasn't finished yet.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = threading.Event()
+        self.last_result: Optional[dict] = None
+
+    @staticmethod
+    def _seconds_until_midnight(now: Optional[datetime] = None) -> float:
+        now = now or datetime.utcnow()
+        midnight = datetime.combine(now.date() + timedelta(days=1), time.min)
+        return (midnight - now).total_seconds()
+
+    def _run_job(self) -> dict:
+        from app.db.session import SessionLocal
+
+        db = SessionLocal()
+        try:
+            return run_scoring_job(db, report=lambda message: None, should_stop=self._stopping.is_set)
+        finally:
+            db.close()
+
+    async def _run(self):
+        while True:
+            try:
+                self.last_result = await asyncio.to_thread(self._run_job)
+                if self.last_result["finished"] and not self.last_result["skipped"]:
+                    print(f"Nightly scoring: {self.last_result['habits']} habits "
+                          f"at {self.last_result['habits_per_second']:,.0f} habits/s")
+            except Exception as e:
+                print(f"Nightly scoring failed: {e}")
+            await asyncio.sleep(self._seconds_until_midnight() + 1)
+
+    def start(self):
+        if self._task is None and settings.SCORING_SCHEDULER_ENABLED:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            # A chunk in progress finishes in its thread; the rest waits for the next run
+            self._stopping.set()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+scoring_scheduler = ScoringScheduler()
@@ -1,5 +1,8 @@
 # Import all the models, so that Base has them before being
 # imported by Alembic or used to create tables
 from app.models.base import Base  # noqa
-from app.models.user import User  # noqa
-from app.models.habit import Habit, HabitLog, PredictionLog  # noqa
+from app.models.user import User, UserDataVersion  # noqa
+from app.models.habit import (  # noqa
+    Habit, HabitLog, HabitStats, HabitScoreSnapshot, PredictionLog, PredictionDailyAggregate, ScoringRun,
+)
+from app.models.assistant import GeminiResponse  # noqa
@@ -0,0 +1,138 @@
+from sqlalchemy import delete, func, inspect, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.crud.habit import rebuild_habit_stats
+from app.crud.prediction import sql_prediction_day
+from app.db.base import Base
+from app.models.habit import Habit, HabitLog, HabitStats, PredictionLog
+
+
+def _add_missing_columns(engine: Engine) -> list:
+    """
+    ALTER TABLE ... ADD COLUMN for model columns the database doesn't have yet.
+    Columns are added as nullable; defaults are applied by the ORM on new rows.
+    """
+    added = []
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def _create_missing_indexes(engine: Engine) -> list:
+    """
+    create_all() only creates indexes together with new tables, so indexes
+    declared later on existing tables are created here.
+    """
+    created = []
+    inspector = inspect(engine)
+
+    for table in Base.metadata.sorted_tables:
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine, checkfirst=True)
+                created.append(index.name)
+    return created
+
+
+def _dedupe_prediction_logs(engine: Engine) -> int:
+    """
+    Prepare prediction_logs for its unique (habit_id, predicted_for) index:
+    truncate predicted_for to the day and keep only the newest row per day.
+    Returns the number of duplicate rows removed.
+    """
+    inspector = inspect(engine)
+    if "prediction_logs" not in inspector.get_table_names():
+        return 0
+    indexes = {ix["name"] for ix in inspector.get_indexes("prediction_logs")}
+    if "uq_prediction_logs_habit_id_predicted_for" in indexes:
+        return 0
+
+    # All in SQL: the table can hold far more rows than fit in one IN (...) list
+    day = sql_prediction_day(engine.dialect.name, PredictionLog.predicted_for)
+    with engine.begin() as conn:
+        if "ix_prediction_logs_habit_id_predicted_for" in indexes:
+            conn.execute(text("DROP INDEX ix_prediction_logs_habit_id_predicted_for"))
+        latest = select(func.max(PredictionLog.id)).group_by(PredictionLog.habit_id, day)
+        removed = conn.execute(delete(PredictionLog).where(PredictionLog.id.not_in(latest))).rowcount
+        conn.execute(update(PredictionLog).where(PredictionLog.predicted_for != day).values(predicted_for=day))
+    return removed
+
+
+def _backfill_habit_stats(engine: Engine, chunk_size: int = 1000) -> int:
+    """
+    Create habit_stats rows for habits that predate the table, so request
+    handlers never race each other to backfill the same habit. Rows from
+    before the day bitmap existed are rebuilt as well.
+    """
+    backfilled = 0
+    with Session(engine) as db:
+        missing = db.scalars(
+            select(Habit.id).outerjoin(HabitStats, HabitStats.habit_id == Habit.id)
+            .where(
+                HabitStats.habit_id.is_(None)
+                | ((HabitStats.total_completions > 0) & HabitStats.completion_bitmap.is_(None))
+            )
+        ).all()
+        for i in range(0, len(missing), chunk_size):
+            rebuild_habit_stats(db, missing[i:i + chunk_size])
+            db.commit()
+            backfilled += len(missing[i:i + chunk_size])
+    return backfilled
+
+
+def _backfill_log_user_ids(engine: Engine, chunk_size: int = 100_000) -> int:
+    """
+    Copy habits.user_id onto habit_logs rows written before the column existed,
+    one id range per transaction. Finding them uses the (user_id, completed_at)
+    index, so this is cheap once done.
+    """
+    backfilled = 0
+    with engine.connect() as conn:
+        first = conn.scalar(select(func.min(HabitLog.id)).where(HabitLog.user_id.is_(None)))
+        if first is None:
+            return 0
+        last = conn.scalar(select(func.max(HabitLog.id)))
+    owner = select(Habit.user_id).where(Habit.id == HabitLog.habit_id).scalar_subquery()
+    for lo in range(first - 1, last, chunk_size):
+        with engine.begin() as conn:
+            backfilled += conn.execute(
+                update(HabitLog)
+                .where(HabitLog.id > lo, HabitLog.id <= lo + chunk_size, HabitLog.user_id.is_(None))
+                .values(user_id=owner)
+            ).rowcount
+    return backfilled
+
+
+def run_migrations(engine: Engine) -> list:
+    """
+    Bring an existing database up to the current models. Repeatable: every
+    step checks what is already there, so running it twice is a no-op.
+    Returns a description of each change made.
+    """
+    Base.metadata.create_all(bind=engine)
+    changes = [f"column {name}" for name in _add_missing_columns(engine)]
+    deduped = _dedupe_prediction_logs(engine)
+    if deduped:
+        changes.append(f"prediction_logs dedupe ({deduped} duplicate rows removed)")
+    changes += [f"index {name}" for name in _create_missing_indexes(engine)]
+    backfilled = _backfill_log_user_ids(engine)
+    if backfilled:
+        changes.append(f"habit_logs.user_id for {backfilled} logs")
+    backfilled = _backfill_habit_stats(engine)
+    if backfilled:
+        changes.append(f"habit_stats rows for {backfilled} habits")
+    return changes
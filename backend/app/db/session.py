@@ -1,6 +1,66 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.metrics import instrument_engine
 
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return _is_sqlite(url) and (":memory:" in url or url.rstrip("/").endswith(":"))
+
+
+def _apply_sqlite_profile(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def _use_sqlite_profile(url: str) -> bool:
+    return settings.SQLITE_PRODUCTION_PROFILE and _is_sqlite(url) and not _is_memory_sqlite(url)
+
+
+def _async_engine_options(url: str, writer: bool = False) -> dict:
+    # In-memory SQLite uses a single static connection, so pool sizing doesn't apply
+    if _is_memory_sqlite(url):
+        return {}
+    if writer:
+        # One connection: concurrent write sessions queue for it instead of fighting over the file lock
+        return {"pool_size": 1, "max_overflow": 0, "pool_timeout": settings.DB_POOL_TIMEOUT}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": True,
+    }
+
+
+# Sync engine: migrations, scripts and batch jobs
 engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine: API request handlers
+async_engine = create_async_engine(settings.async_database_url, **_async_engine_options(settings.async_database_url))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Write sessions share the read engine unless the SQLite profile routes them through a single writer
+async_write_engine = async_engine
+if _use_sqlite_profile(settings.async_database_url):
+    async_write_engine = create_async_engine(
+        settings.async_database_url, **_async_engine_options(settings.async_database_url, writer=True)
+    )
+    for _engine in (engine, async_engine.sync_engine, async_write_engine.sync_engine):
+        event.listen(_engine, "connect", _apply_sqlite_profile)
+AsyncWriteSessionLocal = async_sessionmaker(async_write_engine, autoflush=False, expire_on_commit=False)
+
+# Queries and DB time per request, for /metrics and Server-Timing
+for _engine in {engine, async_engine.sync_engine, async_write_engine.sync_engine}:
+    instrument_engine(_engine)
@@ -0,0 +1,79 @@
+from datetime import datetime
+
+import numpy as np
+
+# Column order of the `factors` matrix, matching the factor list of assess_failure_risk
+FACTOR_NAMES = ("difficulty", "inactivity", "consistency", "streak")
+RISK_LEVELS = np.array(["low", "medium", "high"])
+
+_ONE_DAY = np.timedelta64(1, "D")
+
+
+def _as_datetime64(values) -> np.ndarray:
+    # None / NaT mark habits without any completion
+    return np.asarray(values, dtype="datetime64[us]")
+
+
+def score_batch(difficulty, current_streak, created_at, total_logs, last_completed_at, now: datetime = None) -> dict:
+    """
+    Vectorized equivalent of calculate_success_probability_from_stats and
+    assess_failure_risk_from_stats for many habits at once.
+
+    Takes columnar inputs of equal length (created_at / last_completed_at as
+    datetimes or datetime64, None for "never completed") and returns a dict of
+    NumPy arrays:
+    - success_probability: float64
+    - risk_score: float64
+    - risk_level: "low" | "medium" | "high"
+    - factors: float64 matrix (n, 4), columns in FACTOR_NAMES order
+    - days_since_last, days_since_creation: int64, as quoted in the factor notes
+
+    Every operation mirrors the scalar arithmetic step by step, so results are
+    bit-for-bit identical. Like the scalar version, created_at must not be in
+    the future relative to `now`.
+    """
+    now = np.datetime64(now or datetime.utcnow(), "us")
+    difficulty = np.asarray(difficulty, dtype=np.int64)
+    current_streak = np.asarray(current_streak, dtype=np.int64)
+    total_logs = np.asarray(total_logs, dtype=np.int64)
+    created_at = _as_datetime64(created_at)
+    last_completed_at = _as_datetime64(last_completed_at)
+
+    # timedelta.days floors, and so does floor division of timedelta64
+    days_created = (now - created_at) // _ONE_DAY
+
+    # --- Success probability ---
+    prob_days = days_created + 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prob_consistency = total_logs / prob_days
+    prob = 0.5 + np.minimum(current_streak * 0.05, 0.3)
+    prob = prob + np.maximum(-0.1, np.minimum((prob_consistency - 0.5) * 0.4, 0.2))
+    prob = prob - (difficulty - 1) * 0.05
+    success_probability = np.maximum(0.1, np.minimum(0.95, prob))
+
+    # --- Failure risk ---
+    days_since_creation = np.maximum(days_created + 1, 1)
+    has_last = ~np.isnat(last_completed_at)
+    days_last = (now - np.where(has_last, last_completed_at, now)) // _ONE_DAY
+    days_since_last = np.where(has_last, np.maximum(days_last, 0), days_since_creation)
+    consistency = total_logs / days_since_creation
+
+    factors = np.empty((len(difficulty), len(FACTOR_NAMES)), dtype=np.float64)
+    factors[:, 0] = (difficulty - 1) * 0.06
+    factors[:, 1] = np.minimum(days_since_last * 0.08, 0.32)
+    factors[:, 2] = -np.minimum(consistency * 0.25, 0.3)
+    factors[:, 3] = -np.minimum(current_streak * 0.05, 0.35)
+
+    # Same summation order as sum() over the factor list
+    impact = ((factors[:, 0] + factors[:, 1]) + factors[:, 2]) + factors[:, 3]
+    risk_score = np.maximum(0.05, np.minimum(0.95, 0.45 + impact))
+    risk_level = RISK_LEVELS[(risk_score >= 0.5).astype(np.int8) + (risk_score >= 0.7)]
+
+    return {
+        "success_probability": success_probability,
+        "risk_score": risk_score,
+        "risk_level": risk_level,
+        "factors": factors,
+        "days_since_last": days_since_last,
+        "days_since_creation": days_since_creation,
+    }
@@ -0,0 +1,115 @@
+from datetime import date, timedelta
+from typing import Iterable, Iterator, List, Optional
+
+
+def _every_seventh_bit(length: int) -> int:
+    # Bits 0, 7, 14, ... below `length`, built by doubling instead of one bit at a time
+    mask, span = 1, 7
+    while span < length:
+        mask |= mask << span
+        span *= 2
+    return mask & ((1 << length) - 1)
+
+
+class DayBitmap:
+    """
+    Completed days of one habit as the bits of an int: bit i is set when
+    start + i days has a completion. A year of history takes 46 bytes.
+    Serialized little-endian, so byte i // 8 holds day i at bit i % 8.
+    """
+    __slots__ = ("start", "bits")
+
+    def __init__(self, start: Optional[date] = None, bits: int = 0):
+        self.start = start
+        self.bits = bits
+
+    @classmethod
+    def from_days(cls, days: Iterable[date], start: Optional[date] = None) -> "DayBitmap":
+        days = list(days)
+        bitmap = cls(start or (min(days) if days else None))
+        for day in days:
+            bitmap.add(day)
+        return bitmap
+
+    @classmethod
+    def from_bytes(cls, start: Optional[date], data: Optional[bytes]) -> "DayBitmap":
+        return cls(start, int.from_bytes(data or b"", "little"))
+
+    def to_bytes(self) -> bytes:
+        return self.bits.to_bytes((self.bits.bit_length() + 7) // 8, "little")
+
+    def add(self, day: date):
+        if self.start is None:
+            self.start = day
+        elif day < self.start:
+            # Re-base on the earlier day
+            self.bits <<= (self.start - day).days
+            self.start = day
+        self.bits |= 1 << (day - self.start).days
+
+    def discard(self, day: date):
+        if self.start is not None and day >= self.start:
+            self.bits &= ~(1 << (day - self.start).days)
+
+    def __contains__(self, day: date) -> bool:
+        return self.start is not None and day >= self.start and bool(self.bits >> (day - self.start).days & 1)
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __iter__(self) -> Iterator[date]:
+        bits, i = self.bits, 0
+        while bits:
+            if bits & 1:
+                yield self.start + timedelta(days=i)
+            bits >>= 1
+            i += 1
+
+    @property
+    def last_day(self) -> Optional[date]:
+        if not self.bits:
+            return None
+        return self.start + timedelta(days=self.bits.bit_length() - 1)
+
+    def current_streak(self, today: Optional[date] = None) -> int:
+        """
+        Consecutive days ending at the most recent completion.
+        With `today`, a streak whose last day is before yesterday counts as broken.
+        """
+        if not self.bits:
+            return 0
+        if today is not None and (today - self.last_day).days > 1:
+            return 0
+        # bin() puts the most recent day first
+        digits = bin(self.bits)[2:]
+        return len(digits) - len(digits.lstrip("1"))
+
+    def longest_streak(self) -> int:
+        if not self.bits:
+            return 0
+        return max(len(run) for run in bin(self.bits)[2:].split("0"))
+
+    def window_count(self, end: date, days: int) -> int:
+        """
+        Completed days in the `days`-day window ending at `end` (inclusive).
+        """
+        if not self.bits:
+            return 0
+        hi = (end - self.start).days + 1
+        lo = max(hi - days, 0)
+        if hi <= 0:
+            return 0
+        return (self.bits >> lo & ((1 << (hi - lo)) - 1)).bit_count()
+
+    def weekday_histogram(self) -> List[int]:
+        """
+        Completed days per weekday, Monday first.
+        """
+        histogram = [0] * 7
+        if not self.bits:
+            return histogram
+        mask = _every_seventh_bit(self.bits.bit_length())
+        first_weekday = self.start.weekday()
+        for offset in range(7):
+            histogram[(first_weekday + offset) % 7] = (self.bits >> offset & mask).bit_count()
+        return histogram
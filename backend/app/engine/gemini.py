@@ -1,73 +1,30 @@
+import asyncio
+import json
+import random
+import time
+from typing import AsyncIterator, Awaitable, Callable
+
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.engine.response_cache import gemini_response_cache
 
-class GeminiClient:
-    def __init__(self):
-        if not settings.GEMINI_API_KEY:
-            print("WARNING: GEMINI_API_KEY not found in settings.")
-            return
-            
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = None
-        self._init_model()
-
-    def _init_model(self):
-        try:
-            available_models = list(genai.list_models())
-            capable_models = [m for m in available_models if 'generateContent' in m.supported_generation_methods]
-            
-            # Sort to try 'flash' and 'pro' models first as they are usually most stable
-            def model_priority(m):
-                name = m.name.lower()
-                if 'flash' in name: return 0
-                if '1.5-pro' in name: return 1
-                if 'gemini-pro' in name: return 2
-                return 10
-            
-            capable_models.sort(key=model_priority)
-            
-            print(f"Found {len(capable_models)} capable models. Testing for availability...")
-            
-            working_model = None
-            for m in capable_models:
-                print(f"Testing model: {m.name}...")
-                try:
-                    # Active probe to check if model actually works (quota/permissions)
-                    temp_model = genai.GenerativeModel(m.name)
-                    # Use a very short timeout for the probe
-                    response = temp_model.generate_content("Hi", generation_config={'max_output_tokens': 1})
-                    if response and response.text:
-                        print(f"SUCCESS: Model {m.name} is working.")
-                        working_model = temp_model
-                        self.model_name = m.name
-                        break
-                except Exception as e:
-                    print(f"FAILED: Model {m.name} - {e}")
-                    continue
-            
-            if working_model:
-                self.model = working_model
-            else:
-                print("CRITICAL: No working Gemini model found. AI features will be disabled.")
-                self.model = None
+UNAVAILABLE_TEXT = "AI unavailable (No working model found)."
+BRIEFING_FALLBACK = "Focus on your goals today! (AI temporarily unavailable)"
+PLAN_FALLBACK = "Could not generate plan."
 
-        except Exception as e:
-            print(f"Failed to list/test models: {e}")
-            self.model = None
 
-    async def generate_daily_briefing(self, user_name: str, habits_summary: str, recent_logs: str, goals: str) -> str:
-        if not self.model:
-            return "AI unavailable (No working model found)."
-            
-        prompt = f"""
+def briefing_prompt(user_name: str, habits_summary: str, recent_logs: str, goals: str) -> str:
+    return f"""
         You are a highly motivating and concise habit coaching AI named HabitOS.
         User: {user_name}
         User Goals: {goals}
         
-        Current Habits Context:
+        Current Habits Context (riskiest first; 7d is the last 7 days, oldest first, x = completed):
         {habits_summary}
 
-        Recent Activity (Last 3 days):
+        Recent Activity:
         {recent_logs}
 
         Task:
@@ -77,25 +34,14 @@ class GeminiClient:
         
         Keep the tone energetic, professional, yet warm. total output should be under 100 words.
         """
-        try:
-            # We explicitly try/except here to catch model 404s and fallback if needed
-            response = await self.model.generate_content_async(prompt)
-            return response.text
-        except Exception as e:
-            print(f"Gemini Error: {e}")
-            # simple fallback if 1.5 flush fails, try gemini-pro on the fly? 
-            # For now return error message gracefully
-            return "Focus on your goals today! (AI temporarily unavailable)"
 
-    async def generate_action_plan(self, user_name: str, habits_summary: str, goals: str) -> str:
-        if not self.model:
-            return "AI unavailable (No working model found)."
 
-        prompt = f"""
+def plan_prompt(user_name: str, habits_summary: str, goals: str) -> str:
+    return f"""
         Act as an expert Day Planner.
         User: {user_name}
         Goals: {goals}
-        Habits to schedule:
+        Habits to schedule (riskiest first):
         {habits_summary}
 
         Task:
@@ -109,11 +55,410 @@ class GeminiClient:
         
         Keep it concise and practical.
         """
+
+
+def _model_priority(name: str) -> int:
+    # Try 'flash' and 'pro' models first as they are usually most stable
+    name = name.lower()
+    if 'flash' in name: return 0
+    if '1.5-pro' in name: return 1
+    if 'gemini-pro' in name: return 2
+    return 10
+
+
+def _read_model_cache() -> str | None:
+    """
+    Model name selected by an earlier process, if the cache file is fresh.
+    """
+    try:
+        with open(settings.GEMINI_MODEL_CACHE_PATH) as f:
+            cached = json.load(f)
+        if time.time() - cached["selected_at"] < settings.GEMINI_MODEL_CACHE_TTL_SECONDS:
+            return cached["model_name"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _write_model_cache(model_name: str):
+    try:
+        with open(settings.GEMINI_MODEL_CACHE_PATH, "w") as f:
+            json.dump({"model_name": model_name, "selected_at": time.time()}, f)
+    except OSError as e:
+        print(f"Could not write Gemini model cache: {e}")
+
+
+# Upstream errors worth retrying (and counted by the circuit breaker): overload, quota, timeouts, 5xx
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    ConnectionError,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    google_exceptions.BadGateway,
+    google_exceptions.GatewayTimeout,
+)
+
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of calling Gemini while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive upstream failures and rejects calls for
+    `reset_seconds`. After that a single trial call is let through (half-open):
+    success closes the breaker, failure keeps it open for another window.
+    """
+
+    def __init__(self, threshold: int, reset_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open":
+            # Re-arm the window so only this call goes through as the trial
+            self.opened_at = self.clock()
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = self.clock()
+
+
+class GeminiClient:
+    """
+    Gemini access with lazy model selection: nothing touches the network at
+    import time. The first caller of ensure_model() (or the startup warm-up)
+    picks a model from the cache file or by probing candidates concurrently.
+    """
+    # After a failed selection, wait this long before probing again
+    RETRY_AFTER_SECONDS = 300
+
+    def __init__(self):
+        self.model = None
+        self.model_name = None
+        self._init_task = None
+        self._failed_at = None
+        self.breaker = CircuitBreaker(
+            settings.GEMINI_BREAKER_FAILURE_THRESHOLD, settings.GEMINI_BREAKER_RESET_SECONDS
+        )
+        self._limiter = None
+        self.in_flight = 0
+        self.retries = 0
+        self.timeouts = 0
+        # Smoothed latency of successful upstream calls, for the tiering policy
+        self.latency_ewma = None
+
+    async def ensure_model(self):
+        """
+        The working model, selecting it on first use. Concurrent callers share
+        one selection. Returns None when AI features are unavailable.
+        """
+        if self.model is not None:
+            return self.model
+        if not settings.GEMINI_API_KEY:
+            return None
+        if self._failed_at is not None and time.monotonic() - self._failed_at < self.RETRY_AFTER_SECONDS:
+            return None
+
+        if self._init_task is None or self._init_task.done():
+            self._init_task = asyncio.ensure_future(self._init_model())
+        await asyncio.shield(self._init_task)
+        return self.model
+
+    def warm_up(self):
+        """
+        Start model selection in the background (call from a running event loop).
+        """
+        if settings.GEMINI_API_KEY and self.model is None and self._init_task is None:
+            self._init_task = asyncio.ensure_future(self._init_model())
+
+    async def _probe(self, name: str):
+        # Active probe to check if model actually works (quota/permissions)
+        model = genai.GenerativeModel(name)
+        response = await asyncio.wait_for(
+            model.generate_content_async("Hi", generation_config={'max_output_tokens': 1}),
+            timeout=settings.GEMINI_PROBE_TIMEOUT_SECONDS,
+        )
+        if not (response and response.text):
+            raise ValueError("empty response")
+        return model
+
+    async def _init_model(self):
+        try:
+            genai.configure(api_key=settings.GEMINI_API_KEY)
+
+            cached_name = _read_model_cache()
+            if cached_name:
+                print(f"Using cached Gemini model: {cached_name}")
+                self.model, self.model_name = genai.GenerativeModel(cached_name), cached_name
+                return
+
+            available_models = await asyncio.to_thread(lambda: list(genai.list_models()))
+            candidates = sorted(
+                (m.name for m in available_models if 'generateContent' in m.supported_generation_methods),
+                key=_model_priority,
+            )[:settings.GEMINI_PROBE_CANDIDATES]
+
+            print(f"Probing {len(candidates)} capable models concurrently...")
+            results = await asyncio.gather(*(self._probe(name) for name in candidates), return_exceptions=True)
+
+            # Highest priority working model wins
+            for name, result in zip(candidates, results):
+                if isinstance(result, BaseException):
+                    print(f"FAILED: Model {name} - {result!r}")
+                    continue
+                print(f"SUCCESS: Model {name} is working.")
+                self.model, self.model_name = result, name
+                _write_model_cache(name)
+                return
+
+            print("CRITICAL: No working Gemini model found. AI features will be disabled.")
+        except Exception as e:
+            print(f"Failed to list/test models: {e}")
+        self._failed_at = time.monotonic()
+
+    def _deadline(self) -> float:
+        return asyncio.get_running_loop().time() + settings.GEMINI_DEADLINE_SECONDS
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        return max(deadline - asyncio.get_running_loop().time(), 0)
+
+    async def _acquire(self, deadline: float) -> asyncio.BoundedSemaphore:
+        """
+        Take one of the GEMINI_MAX_CONCURRENCY generation slots, waiting at most
+        until the deadline. The caller releases the returned semaphore.
+        """
+        loop = asyncio.get_running_loop()
+        if self._limiter is None or self._limiter[0] is not loop:
+            self._limiter = (loop, asyncio.BoundedSemaphore(settings.GEMINI_MAX_CONCURRENCY))
+        limiter = self._limiter[1]
+        await asyncio.wait_for(limiter.acquire(), timeout=self._remaining(deadline))
+        return limiter
+
+    def _fail_fast(self):
+        """
+        Raise UpstreamUnavailable while the breaker is open, before the caller
+        queues for a generation slot. Half-open lets callers through to _call,
+        where one of them takes the trial.
+        """
+        if self.breaker.state == "open":
+            self.breaker.rejected += 1
+            metrics.observe_llm(0.0, "rejected")
+            raise UpstreamUnavailable("Gemini circuit breaker is open")
+
+    async def _call(self, request: Callable[[], Awaitable], deadline: float):
+        """
+        Run an upstream request within the deadline, retrying retryable errors
+        with full-jitter exponential backoff. Raises UpstreamUnavailable without
+        calling out while the circuit breaker is open.
+        """
+        for attempt in range(settings.GEMINI_MAX_RETRIES + 1):
+            if not self.breaker.allow():
+                metrics.observe_llm(0.0, "rejected")
+                raise UpstreamUnavailable("Gemini circuit breaker is open")
+            started = time.monotonic()
+            try:
+                result = await asyncio.wait_for(request(), timeout=self._remaining(deadline))
+            except RETRYABLE_ERRORS as e:
+                self.breaker.record_failure()
+                timed_out = isinstance(e, asyncio.TimeoutError)
+                metrics.observe_llm(time.monotonic() - started, "timeout" if timed_out else "error")
+                if timed_out:
+                    self.timeouts += 1
+                delay = random.uniform(0, settings.GEMINI_RETRY_BASE_SECONDS * 2 ** attempt)
+                if attempt == settings.GEMINI_MAX_RETRIES or delay >= self._remaining(deadline):
+                    raise
+                print(f"Gemini call failed ({e!r}), retrying in {delay:.2f}s")
+                self.retries += 1
+                await asyncio.sleep(delay)
+            except Exception:
+                # The upstream answered; it's the request that was rejected
+                self.breaker.record_success()
+                metrics.observe_llm(time.monotonic() - started, "invalid")
+                raise
+            else:
+                self.breaker.record_success()
+                elapsed = time.monotonic() - started
+                metrics.observe_llm(elapsed, "ok")
+                self.latency_ewma = elapsed if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * elapsed
+                return result
+
+    async def _generate(self, prompt: str) -> str:
+        self._fail_fast()
+        deadline = self._deadline()
+        limiter = await self._acquire(deadline)
+        self.in_flight += 1
         try:
-            response = await self.model.generate_content_async(prompt)
-            return response.text
+            response = await self._call(lambda: self.model.generate_content_async(prompt), deadline)
+        finally:
+            self.in_flight -= 1
+            limiter.release()
+        return response.text
+
+    async def choose_tier(self, requested: str = "auto") -> str:
+        """
+        "local" or "gemini" for one assistant request. Forced tiers come from the
+        request or ASSISTANT_TIER. In auto mode the local engine serves the
+        request when Gemini is unavailable or unhealthy, when every generation
+        slot is taken (high volume), or when recent upstream latency exceeds
+        ASSISTANT_LATENCY_BUDGET_SECONDS.
+        """
+        tier = requested if requested != "auto" else settings.ASSISTANT_TIER
+        if tier == "local" or not await self.ensure_model():
+            return "local"
+        if tier == "gemini":
+            return "gemini"
+        if self.breaker.state != "closed":
+            return "local"
+        if self.in_flight >= settings.GEMINI_MAX_CONCURRENCY:
+            return "local"
+        if self.latency_ewma is not None and self.latency_ewma > settings.ASSISTANT_LATENCY_BUDGET_SECONDS:
+            return "local"
+        return "gemini"
+
+    def stats(self) -> dict:
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "rejected": self.breaker.rejected,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "in_flight": self.in_flight,
+            "max_concurrency": settings.GEMINI_MAX_CONCURRENCY,
+            "latency_ewma_seconds": self.latency_ewma,
+        }
+
+    async def _generate_cached(self, kind: str, prompt: str) -> str:
+        # Identical prompts within a UTC day are served from the response cache
+        return await gemini_response_cache.get_or_generate(
+            kind, self.model_name, prompt, lambda: self._generate(prompt)
+        )
+
+    async def _stream(self, kind: str, prompt: str, fallback: str) -> AsyncIterator[str]:
+        """
+        Yield the response in chunks as the model produces them, caching the
+        full text once the model finishes with a non-empty answer. Cached
+        responses, and models that can't stream, yield the whole text at once.
+        The stream holds a generation slot and shares one deadline; closing
+        the generator (client gone) stops reading from the model.
+        """
+        if not await self.ensure_model():
+            yield UNAVAILABLE_TEXT
+            return
+
+        cached = await gemini_response_cache.lookup(self.model_name, prompt)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        response = None
+        finished = False
+        deadline = self._deadline()
+        limiter = None
+        try:
+            self._fail_fast()
+            limiter = await self._acquire(deadline)
+            self.in_flight += 1
+            response = await self._call(lambda: self.model.generate_content_async(prompt, stream=True), deadline)
+            iterator = response.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(iterator.__anext__(), timeout=self._remaining(deadline))
+                except StopAsyncIteration:
+                    finished = True
+                    break
+                if chunk.text:
+                    chunks.append(chunk.text)
+                    yield chunk.text
+        except GeneratorExit:
+            # Client went away mid-stream: release the upstream response too
+            close = getattr(response, "aclose", None)
+            if close is not None:
+                await close()
+            raise
+        except RETRYABLE_ERRORS + (UpstreamUnavailable,) as e:
+            print(f"Gemini Stream Error: {e!r}")
+            if not chunks:
+                yield fallback
+            return
+        except Exception as e:
+            print(f"Gemini Stream Error: {e}")
+            if chunks:
+                # Part of the answer is already on the client; don't repeat it
+                return
+            # Probably a model without streaming support: try the one-shot call
+            try:
+                yield await self._generate_cached(kind, prompt)
+            except Exception as e:
+                print(f"Gemini Error: {e}")
+                yield fallback
+            return
+        finally:
+            if limiter is not None:
+                self.in_flight -= 1
+                limiter.release()
+        text = "".join(chunks)
+        # Only a complete, non-empty answer is worth serving again all day
+        if finished and text:
+            await gemini_response_cache.store(kind, self.model_name, prompt, text)
+
+    async def generate_daily_briefing(self, user_name: str, habits_summary: str, recent_logs: str, goals: str) -> str:
+        if not await self.ensure_model():
+            return UNAVAILABLE_TEXT
+
+        prompt = briefing_prompt(user_name, habits_summary, recent_logs, goals)
+        try:
+            # We explicitly try/except here to catch model 404s and fallback if needed
+            return await self._generate_cached("briefing", prompt)
+        except Exception as e:
+            print(f"Gemini Error: {e}")
+            # For now return error message gracefully
+            return BRIEFING_FALLBACK
+
+    def stream_daily_briefing(self, user_name: str, habits_summary: str, recent_logs: str, goals: str) -> AsyncIterator[str]:
+        prompt = briefing_prompt(user_name, habits_summary, recent_logs, goals)
+        return self._stream("briefing", prompt, BRIEFING_FALLBACK)
+
+    async def generate_action_plan(self, user_name: str, habits_summary: str, goals: str) -> str:
+        if not await self.ensure_model():
+            return UNAVAILABLE_TEXT
+
+        prompt = plan_prompt(user_name, habits_summary, goals)
+        try:
+            return await self._generate_cached("plan", prompt)
         except Exception as e:
             print(f"Gemini Plan Error: {e}")
-            return "Could not generate plan."
+            return PLAN_FALLBACK
+
+    def stream_action_plan(self, user_name: str, habits_summary: str, goals: str) -> AsyncIterator[str]:
+        return self._stream("plan", plan_prompt(user_name, habits_summary, goals), PLAN_FALLBACK)
 
 gemini_client = GeminiClient()
@@ -0,0 +1,46 @@
+import base64
+from datetime import date, timedelta
+from typing import Iterable, List, Tuple
+
+
+def encode_bitmap(days: Iterable[date], start: date, end: date) -> str:
+    """
+    One bit per day from start to end inclusive, bit i set when start + i days
+    has a completion (least significant bit first within each byte), base64 encoded.
+    """
+    n_days = (end - start).days + 1
+    bitmap = bytearray((n_days + 7) // 8)
+    for day in days:
+        i = (day - start).days
+        if 0 <= i < n_days:
+            bitmap[i // 8] |= 1 << (i % 8)
+    return base64.b64encode(bytes(bitmap)).decode("ascii")
+
+
+def decode_bitmap(encoded: str, start: date) -> List[date]:
+    bitmap = base64.b64decode(encoded)
+    return [
+        start + timedelta(days=i * 8 + bit)
+        for i, byte in enumerate(bitmap)
+        for bit in range(8)
+        if byte >> bit & 1
+    ]
+
+
+def encode_runs(days: Iterable[date]) -> List[Tuple[date, int]]:
+    """
+    Run-length encoding of completed days: (first day, length) per run of
+    consecutive days. Input must be sorted; duplicates are ignored.
+    """
+    runs = []
+    for day in days:
+        if runs:
+            first, length = runs[-1]
+            last = first + timedelta(days=length - 1)
+            if day == last:
+                continue
+            if day == last + timedelta(days=1):
+                runs[-1] = (first, length + 1)
+                continue
+        runs.append((day, 1))
+    return runs
@@ -1,7 +1,21 @@
 from datetime import datetime, timedelta
 
+RECOMMENDATIONS = {
+    "high": "Book a micro-version for tomorrow and add an accountability ping.",
+    "medium": "Schedule earlier in the day and reduce scope by 20%.",
+    "low": "Maintain the current cadence; protect time on calendar.",
+}
+
 
 def assess_failure_risk(habit, logs):
+    """
+    Risk scoring from a list of HabitLog rows. See assess_failure_risk_from_stats.
+    """
+    last_completed_at = max((log.completed_at for log in logs), default=None)
+    return assess_failure_risk_from_stats(habit, len(logs), last_completed_at)
+
+
+def assess_failure_risk_from_stats(habit, total_logs: int, last_completed_at=None, now=None):
     """
     Heuristic risk scoring for next-day failure risk. Returns dict with:
     - risk_score: 0-1 (higher = riskier)
@@ -14,15 +28,16 @@ def assess_failure_risk(habit, logs):
     - Streak momentum: longer streak lowers risk
     - Consistency: completions / days since creation
     - Difficulty: higher difficulty raises risk
+
+    Only the log count and the latest completion are needed, so callers can
+    pass per-habit aggregates instead of loading every log row.
     """
-    now = datetime.utcnow()
+    now = now or datetime.utcnow()
     days_since_creation = max((now - habit.created_at).days + 1, 1)
-    total_logs = len(logs)
 
     # Recency
-    if logs:
-        last_log = max(logs, key=lambda l: l.completed_at)
-        days_since_last = max((now - last_log.completed_at).days, 0)
+    if last_completed_at is not None:
+        days_since_last = max((now - last_completed_at).days, 0)
     else:
         days_since_last = days_since_creation
 
@@ -54,13 +69,11 @@ def assess_failure_risk(habit, logs):
 
     if risk_score >= 0.7:
         risk_level = "high"
-        recommendation = "Book a micro-version for tomorrow and add an accountability ping."
     elif risk_score >= 0.5:
         risk_level = "medium"
-        recommendation = "Schedule earlier in the day and reduce scope by 20%."
     else:
         risk_level = "low"
-        recommendation = "Maintain the current cadence; protect time on calendar."
+    recommendation = RECOMMENDATIONS[risk_level]
 
     return {
         "risk_score": risk_score,
@@ -70,6 +83,13 @@ def assess_failure_risk(habit, logs):
     }
 
 def calculate_success_probability(habit, logs) -> float:
+    """
+    Success probability from a list of HabitLog rows. See calculate_success_probability_from_stats.
+    """
+    return calculate_success_probability_from_stats(habit, len(logs))
+
+
+def calculate_success_probability_from_stats(habit, total_logs: int, now=None) -> float:
     """
     Calculates the probability that the user will complete the habit tomorrow.
     Based on:
@@ -83,8 +103,9 @@ def calculate_success_probability(habit, logs) -> float:
     streak_bonus = min(habit.current_streak * 0.05, 0.3)
     
     # 2. Consistency Factor
-    days_since_creation = (datetime.utcnow() - habit.created_at).days + 1
-    consistency = len(logs) / days_since_creation
+    now = now or datetime.utcnow()
+    days_since_creation = (now - habit.created_at).days + 1
+    consistency = total_logs / days_since_creation
     # Clamp to avoid over-penalizing brand new habits
     consistency_factor = max(-0.1, min((consistency - 0.5) * 0.4, 0.2))
     
@@ -95,13 +116,3 @@ def calculate_success_probability(habit, logs) -> float:
     
     # Clamp
     return max(0.1, min(0.95, prob))
-
-def update_streak(habit, new_log_date: datetime):
-    """
-    Updates the streak for a habit based on the new log.
-    Simple MVP Logic: If last log was yesterday, increment. If today, ignore. Else reset.
-    """
-    # This logic assumes we check this BEFORE adding the new log or check against previous logs
-    # For MVP, we'll request the LAST log before this one.
-    # But here, let's keep it simple: We just need to know if the streak continues.
-    pass # Implementation will be inside the API logic for better DB access
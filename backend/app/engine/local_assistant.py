@@ -0,0 +1,128 @@
+"""
+Template-based briefings and plans built from the risk heuristics. Output has
+the same Markdown shape as the Gemini prompts ask for, costs no remote call
+and is deterministic for a given set of habits and time.
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from app.engine.intelligence import assess_failure_risk_from_stats
+from app.models.habit import Habit, HabitStats
+
+QUOTES = (
+    "Small steps, every day.",
+    "Consistency beats intensity.",
+    "Show up, even for five minutes.",
+    "Progress, not perfection.",
+    "Don't break the chain.",
+    "You are what you repeatedly do.",
+    "Start before you feel ready.",
+)
+
+# Where each risk level lands in the plan: riskiest habits first thing
+PLAN_START_HOURS = {"high": 7, "medium": 10, "low": 17}
+DEFAULT_HOUR = 8
+
+
+class HabitOutlook:
+    """A habit with its risk assessment and completion aggregates."""
+
+    def __init__(self, habit: Habit, stats: Optional[HabitStats], now: datetime):
+        self.habit = habit
+        self.total_completions = stats.total_completions if stats is not None else 0
+        self.last_completed_at = stats.last_completed_at if stats is not None else None
+        self.risk = assess_failure_risk_from_stats(habit, self.total_completions, self.last_completed_at, now=now)
+
+    @property
+    def main_factor(self) -> dict:
+        return max(self.risk["factors"], key=lambda f: f["impact"])
+
+    @property
+    def minutes(self) -> int:
+        # Harder habits get longer blocks; high risk gets a micro-version instead
+        if self.risk["risk_level"] == "high":
+            return 10
+        return 10 + 5 * (self.habit.difficulty or 1)
+
+
+def assess_habits(rows: Iterable[Tuple[Habit, Optional[HabitStats]]], now: Optional[datetime] = None) -> List[HabitOutlook]:
+    """Outlooks ordered riskiest first (ties by habit id)."""
+    now = now or datetime.utcnow()
+    outlooks = [HabitOutlook(habit, stats, now) for habit, stats in rows]
+    return sorted(outlooks, key=lambda o: (-o.risk["risk_score"], o.habit.id))
+
+
+def streak_at_risk(outlooks: List[HabitOutlook], now: datetime) -> Optional[HabitOutlook]:
+    """
+    The longest running streak that ends today unless the habit is completed:
+    last extended yesterday. Streaks whose last day is older are already broken.
+    """
+    yesterday = now.date() - timedelta(days=1)
+    pending = [
+        o for o in outlooks
+        if o.habit.current_streak and o.last_completed_at is not None and o.last_completed_at.date() == yesterday
+    ]
+    return max(pending, key=lambda o: (o.habit.current_streak, -o.habit.id), default=None)
+
+
+def _clock(hour: int, minute: int = 0) -> str:
+    return datetime(2000, 1, 1, hour, minute).strftime("%I:%M %p")
+
+
+def time_block(outlook: HabitOutlook) -> str:
+    """
+    The habit's usual completion hour, two hours earlier when it is at high
+    risk; a morning slot when it has never been completed.
+    """
+    hour = outlook.last_completed_at.hour if outlook.last_completed_at is not None else DEFAULT_HOUR
+    if outlook.risk["risk_level"] == "high":
+        hour -= 2
+    hour = max(6, min(hour, 21))
+    start = datetime(2000, 1, 1, hour)
+    end = start + timedelta(minutes=outlook.minutes)
+    return f"{_clock(start.hour, start.minute)} - {_clock(end.hour, end.minute)}"
+
+
+def local_briefing(
+    user_name: str, rows: Iterable[Tuple[Habit, Optional[HabitStats]]], recent_completions: int,
+    now: Optional[datetime] = None,
+) -> str:
+    now = now or datetime.utcnow()
+    outlooks = assess_habits(rows, now)
+    weakest = outlooks[0]
+    lines = [
+        f"**{user_name}**, you logged {recent_completions} completions across "
+        f"{len(outlooks)} habits in the last 3 days.",
+        "",
+        f"**Focus today:** {weakest.habit.title} is your weakest habit "
+        f"({weakest.risk['risk_level']} risk, {weakest.main_factor['note']}). {weakest.risk['recommendation']}",
+    ]
+    at_risk = streak_at_risk(outlooks, now)
+    if at_risk is not None:
+        lines += ["", f"**Streak at risk:** {at_risk.habit.title} - keep your "
+                      f"{at_risk.habit.current_streak}-day streak alive today."]
+    lines += [
+        "",
+        f"**Time block:** {time_block(weakest)} for {weakest.habit.title}.",
+        "",
+        f"> {QUOTES[now.toordinal() % len(QUOTES)]}",
+    ]
+    return "\n".join(lines)
+
+
+def local_plan(rows: Iterable[Tuple[Habit, Optional[HabitStats]]], now: Optional[datetime] = None) -> str:
+    """
+    A Markdown list of time blocks: high-risk habits in the early morning,
+    medium before noon, low-risk ones in the evening.
+    """
+    outlooks = assess_habits(rows, now)
+    next_slot = {level: datetime(2000, 1, 1, hour) for level, hour in PLAN_START_HOURS.items()}
+    blocks = []
+    for outlook in outlooks:
+        level = outlook.risk["risk_level"]
+        start = next_slot[level]
+        next_slot[level] = start + timedelta(minutes=outlook.minutes + 15)
+        blocks.append((start, f"- **{_clock(start.hour, start.minute)}**: {outlook.habit.title} "
+                              f"({outlook.minutes} min, {level} risk)"))
+    blocks.append((datetime(2000, 1, 1, 12, 30), f"- **{_clock(12, 30)}**: Lunch break"))
+    return "\n".join(line for _, line in sorted(blocks, key=lambda b: b[0]))
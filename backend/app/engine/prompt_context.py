@@ -0,0 +1,100 @@
+"""
+Habit context for the Gemini prompts under a token budget. Habits are ranked
+riskiest first by assess_failure_risk_from_stats and summarized one line each,
+with a strip of the last 7 days of completions, until the budget is spent; the
+rest collapse into a one-line tally by risk level. Scores and strips are taken
+at the start of the UTC day, so the same habits and logs give the same prompt
+(and a response cache hit) all day.
+"""
+from collections import Counter, defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from app.engine.local_assistant import HabitOutlook, assess_habits
+from app.models.habit import Habit, HabitStats
+
+ACTIVITY_DAYS = 7
+TITLE_MAX_CHARS = 40
+# Rough average for English prose; the budget is an estimate, not a tokenizer count
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def activity_since(today: date) -> datetime:
+    """Start of the activity window: completions from here on are summarized."""
+    return datetime.combine(today - timedelta(days=ACTIVITY_DAYS - 1), time.min)
+
+
+def activity_strip(days: Set[date], today: date) -> str:
+    """Last 7 days oldest first: x when completed, - when not."""
+    return "".join(
+        "x" if today - timedelta(days=offset) in days else "-" for offset in range(ACTIVITY_DAYS - 1, -1, -1)
+    )
+
+
+def _title(habit: Habit) -> str:
+    title = " ".join((habit.title or "").split())
+    return title if len(title) <= TITLE_MAX_CHARS else title[:TITLE_MAX_CHARS - 3] + "..."
+
+
+def habit_line(outlook: HabitOutlook, days: Set[date], today: date) -> str:
+    habit, risk = outlook.habit, outlook.risk
+    line = (
+        f"- {_title(habit)} ({habit.frequency}, difficulty {habit.difficulty}/5): "
+        f"{risk['risk_level']} risk {risk['risk_score']:.2f}, streak {habit.current_streak or 0} "
+        f"(best {habit.longest_streak or 0}), 7d {activity_strip(days, today)}"
+    )
+    # The biggest risk driver, unless it is the difficulty already shown
+    if outlook.main_factor["factor"] != "difficulty":
+        line += f", {outlook.main_factor['note']}"
+    return line
+
+
+def _rest_line(levels: Counter) -> str:
+    tally = ", ".join(f"{levels[level]} {level}" for level in ("high", "medium", "low") if levels[level])
+    return f"- and {sum(levels.values())} lower-risk habits ({tally} risk)"
+
+
+def build_habit_context(
+    rows: Iterable[Tuple[Habit, Optional[HabitStats]]],
+    completions: Iterable[Tuple[int, datetime]],
+    today: date,
+    budget_tokens: int,
+) -> Dict[str, str]:
+    """
+    `habits_summary` and `recent_logs` for the prompt templates from the user's
+    (habit, stats) rows and their (habit_id, completed_at) pairs since
+    activity_since(today). Together they stay within `budget_tokens`, except
+    that the riskiest habit is always listed.
+    """
+    days = defaultdict(set)
+    for habit_id, completed_at in completions:
+        days[habit_id].add(completed_at.date())
+    per_day = Counter(day for habit_days in days.values() for day in habit_days)
+    daily = [per_day[today - timedelta(days=offset)] for offset in range(ACTIVITY_DAYS - 1, -1, -1)]
+    recent_logs = (
+        f"{sum(daily)} completions in the last {ACTIVITY_DAYS} days, {sum(daily[-3:])} in the last 3; "
+        f"per day, oldest first: {' '.join(map(str, daily))}"
+    )
+
+    outlooks = assess_habits(rows, datetime.combine(today, time.min))
+    # Risk levels of the habits not listed yet
+    remaining = Counter(outlook.risk["risk_level"] for outlook in outlooks)
+    spent = estimate_tokens(recent_logs)
+    lines = []
+    for outlook in outlooks:
+        line = habit_line(outlook, days[outlook.habit.id], today)
+        level = outlook.risk["risk_level"]
+        # Room for this line, the newlines and the tally of whatever is left after it
+        rest = remaining - Counter({level: 1})
+        needed = estimate_tokens(line) + 1 + (estimate_tokens(_rest_line(rest)) + 1 if rest else 0)
+        if lines and spent + needed > budget_tokens:
+            lines.append(_rest_line(remaining))
+            break
+        lines.append(line)
+        remaining = rest
+        spent += estimate_tokens(line) + 1
+    return {"habits_summary": "\n".join(lines), "recent_logs": recent_logs}
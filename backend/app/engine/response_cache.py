@@ -0,0 +1,134 @@
+import asyncio
+import hashlib
+from datetime import datetime, time, timedelta
+from typing import Awaitable, Callable, Dict
+
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.models.assistant import GeminiResponse
+
+
+def fingerprint(model_name: str, prompt: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{prompt}".encode()).hexdigest()
+
+
+def _end_of_day(now: datetime) -> datetime:
+    return datetime.combine(now.date() + timedelta(days=1), time.min)
+
+
+class GeminiResponseCache:
+    """
+    Persistent cache of Gemini generations in the gemini_responses table.
+    Entries are keyed on the exact prompt plus model name and expire at the
+    end of the UTC day. Concurrent requests for the same key share a single
+    upstream call (single-flight, per process).
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+    async def get_or_generate(
+        self, kind: str, model_name: str, prompt: str, generate: Callable[[], Awaitable[str]]
+    ) -> str:
+        """
+        Cached response for the prompt, or the result of generate(), stored on
+        success. Exceptions from generate() propagate to every waiting caller
+        and nothing is cached.
+        """
+        if not self.enabled:
+            return await generate()
+
+        key = fingerprint(model_name, prompt)
+        task = self._in_flight.get(key)
+        if task is None:
+            # The lookup/generation runs as its own task, so a caller that
+            # disconnects doesn't cancel it for the others
+            task = asyncio.ensure_future(self._load_or_generate(key, kind, model_name, generate))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Task):
+        del self._in_flight[key]
+        if not task.cancelled():
+            # Retrieve the exception so one nobody awaited isn't logged as unhandled
+            task.exception()
+
+    async def _load_or_generate(self, key: str, kind: str, model_name: str, generate) -> str:
+        response = await self._load(key)
+        if response is not None:
+            self.hits += 1
+            return response
+        self.misses += 1
+        response = await generate()
+        await self._store(key, kind, model_name, response)
+        return response
+
+    async def lookup(self, model_name: str, prompt: str):
+        """
+        Cached response for the prompt, or None. An identical generation already
+        in flight is awaited instead of starting another.
+        """
+        if not self.enabled:
+            return None
+        key = fingerprint(model_name, prompt)
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(task)
+            except Exception:
+                return None
+        response = await self._load(key)
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+    async def store(self, kind: str, model_name: str, prompt: str, response: str):
+        if self.enabled:
+            await self._store(fingerprint(model_name, prompt), kind, model_name, response)
+
+    async def _load(self, key: str):
+        from app.db.session import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(
+                select(GeminiResponse.response).where(
+                    GeminiResponse.key == key,
+                    GeminiResponse.expires_at > datetime.utcnow(),
+                )
+            )
+
+    async def _store(self, key: str, kind: str, model_name: str, response: str):
+        from app.db.session import AsyncWriteSessionLocal
+
+        now = datetime.utcnow()
+        async with AsyncWriteSessionLocal() as db:
+            # Expired rows are pruned on write; there are at most a few per day
+            await db.execute(delete(GeminiResponse).where(GeminiResponse.expires_at <= now))
+            await db.merge(GeminiResponse(
+                key=key, kind=kind, model_name=model_name, response=response,
+                created_at=now, expires_at=_end_of_day(now),
+            ))
+            await db.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+gemini_response_cache = GeminiResponseCache(enabled=settings.GEMINI_CACHE_ENABLED)
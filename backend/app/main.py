@@ -1,16 +1,41 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.api.api_v1.api import api_router
-from app.db.base import Base
+from app.core.cache import score_cache
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, metrics
+from app.crud.prediction import prediction_writer
+from app.crud.scoring import scoring_scheduler
+from app.db.migrations import run_migrations
 from app.db.session import engine
+from app.engine.gemini import gemini_client
+from app.engine.response_cache import gemini_response_cache
+
+# Create Tables, columns and indexes missing from older databases
+run_migrations(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    prediction_writer.start()
+    # Rescore every habit into daily snapshots after each UTC midnight
+    scoring_scheduler.start()
+    # Select the Gemini model in the background; requests never wait on startup probes
+    gemini_client.warm_up()
+    yield
+    await scoring_scheduler.stop()
+    # Flush buffered predictions before shutting down
+    await prediction_writer.stop()
 
-# Create Tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="HabitOS API",
     description="The Operating System for Human Discipline",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # CORS - Allow frontend
@@ -20,10 +45,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
+# Outermost, so latency covers CORS handling too
+metrics.enabled = settings.METRICS_ENABLED
+app.add_middleware(MetricsMiddleware, server_timing=settings.METRICS_SERVER_TIMING)
+
 app.include_router(api_router, prefix="/api/v1")
 
 @app.get("/")
 def read_root():
     return {"system": "HabitOS", "status": "online", "message": "Discipline is freedom."}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    """
+    Prometheus scrape endpoint (this worker's view): request, query and LLM
+    histograms plus the cache and upstream counters.
+    """
+    return metrics.render({
+        "score_cache": score_cache.stats(),
+        "gemini_response_cache": gemini_response_cache.stats(),
+        "gemini_upstream": gemini_client.stats(),
+    })
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, DateTime, Text
+from datetime import datetime
+from app.models.base import Base
+
+class GeminiResponse(Base):
+    """
+    Cached Gemini generations, keyed on a hash of the exact prompt and model name.
+    """
+    __tablename__ = "gemini_responses"
+
+    key = Column(String, primary_key=True)  # sha256 hex
+    kind = Column(String, nullable=False)  # "briefing" | "plan"
+    model_name = Column(String, nullable=False)
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Float, Text
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Date, DateTime, Float, Text, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.models.base import Base
 
 class Habit(Base):
     __tablename__ = "habits"
+    __table_args__ = (
+        # Every read is scoped to one user; lists are ordered by id
+        Index("ix_habits_user_id_id", "user_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -22,13 +26,22 @@ class Habit(Base):
     success_probability = Column(Float, default=0.5)
 
     logs = relationship("HabitLog", back_populates="habit")
+    stats = relationship("HabitStats", back_populates="habit", uselist=False)
 
 class HabitLog(Base):
     __tablename__ = "habit_logs"
+    __table_args__ = (
+        # Per-habit lookups always filter or order by completion time
+        Index("ix_habit_logs_habit_id_completed_at", "habit_id", "completed_at"),
+        # Per-user windows (e.g. the assistant's recent completions) without joining habits
+        Index("ix_habit_logs_user_id_completed_at", "user_id", "completed_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     habit_id = Column(Integer, ForeignKey("habits.id"))
-    completed_at = Column(DateTime, default=datetime.utcnow)
+    # Denormalized from habits.user_id; set on insert, backfilled by run_migrations
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    completed_at = Column(DateTime, default=datetime.utcnow, index=True)
     
     # Metadata for AI
     mood_score = Column(Integer, nullable=True) # User reported mood
@@ -39,6 +52,10 @@ class HabitLog(Base):
 
 class PredictionLog(Base):
     __tablename__ = "prediction_logs"
+    __table_args__ = (
+        # One prediction per habit per day; predicted_for is truncated to midnight UTC
+        Index("uq_prediction_logs_habit_id_predicted_for", "habit_id", "predicted_for", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     habit_id = Column(Integer, ForeignKey("habits.id"), nullable=False)
@@ -50,3 +67,93 @@ class PredictionLog(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     habit = relationship("Habit", backref="predictions")
+
+
+class PredictionDailyAggregate(Base):
+    """
+    Compacted predictions: old PredictionLog rows rolled up per habit per day.
+    """
+    __tablename__ = "prediction_daily_aggregates"
+
+    habit_id = Column(Integer, ForeignKey("habits.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    predictions = Column(Integer, nullable=False)
+    avg_score = Column(Float, nullable=False)
+    min_score = Column(Float, nullable=False)
+    max_score = Column(Float, nullable=False)
+    last_risk_level = Column(String, nullable=False)
+
+
+class HabitStats(Base):
+    """
+    Materialized per-habit log aggregates, kept in step with every HabitLog insert
+    so scoring never has to rescan a habit's history.
+    """
+    __tablename__ = "habit_stats"
+
+    habit_id = Column(Integer, ForeignKey("habits.id"), primary_key=True)
+    total_completions = Column(Integer, default=0, nullable=False)
+    first_completed_at = Column(DateTime, nullable=True)
+    last_completed_at = Column(DateTime, nullable=True)
+
+    # Rolling counts cover the 7/30 days ending at window_date (the latest completion day)
+    window_date = Column(Date, nullable=True)
+    completions_7d = Column(Integer, default=0, nullable=False)
+    completions_30d = Column(Integer, default=0, nullable=False)
+
+    mood_score_sum = Column(Integer, default=0, nullable=False)
+    mood_score_count = Column(Integer, default=0, nullable=False)
+    difficulty_rating_sum = Column(Integer, default=0, nullable=False)
+    difficulty_rating_count = Column(Integer, default=0, nullable=False)
+
+    # Completed days as a DayBitmap: bit i set when bitmap_start + i days was completed
+    bitmap_start = Column(Date, nullable=True)
+    completion_bitmap = Column(LargeBinary, nullable=True)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    habit = relationship("Habit", back_populates="stats")
+
+
+class HabitScoreSnapshot(Base):
+    """
+    Scores from the nightly scoring job, one row per habit per UTC day. Writes
+    to a habit drop its snapshot for the day, so reads fall back to live scoring.
+    """
+    __tablename__ = "habit_score_snapshots"
+    __table_args__ = (
+        # Retention deletes whole days
+        Index("ix_habit_score_snapshots_day", "day"),
+    )
+
+    habit_id = Column(Integer, ForeignKey("habits.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    success_probability = Column(Float, nullable=False)
+    risk_score = Column(Float, nullable=False)
+    risk_level = Column(String, nullable=False)
+
+    # Factor impacts, and the inputs quoted in their notes
+    difficulty_impact = Column(Float, nullable=False)
+    inactivity_impact = Column(Float, nullable=False)
+    consistency_impact = Column(Float, nullable=False)
+    streak_impact = Column(Float, nullable=False)
+    difficulty = Column(Integer, nullable=False)
+    current_streak = Column(Integer, nullable=False)
+    total_completions = Column(Integer, nullable=False)
+    days_since_last = Column(Integer, nullable=False)
+    days_since_creation = Column(Integer, nullable=False)
+
+    scored_at = Column(DateTime, nullable=False)
+
+
+class ScoringRun(Base):
+    """
+    Progress of the nightly scoring job for one day; a restarted job resumes after last_habit_id.
+    """
+    __tablename__ = "scoring_runs"
+
+    day = Column(Date, primary_key=True)
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    last_habit_id = Column(Integer, default=0, nullable=False)
+    habits_scored = Column(Integer, default=0, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
 from app.models.base import Base
 
 class User(Base):
@@ -10,3 +10,15 @@ class User(Base):
     full_name = Column(String, index=True)
     is_active = Column(Boolean, default=True)
     goals = Column(String, nullable=True) # JSON or text description of user goals
+
+
+class UserDataVersion(Base):
+    """
+    Counter bumped in the same transaction as every write that changes what a
+    user's habit listings, insights or dashboard return; their ETags embed it.
+    A user without a row is at version 0.
+    """
+    __tablename__ = "user_data_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
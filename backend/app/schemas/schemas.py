@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List
 from pydantic import BaseModel
 
@@ -51,6 +51,45 @@ class HabitLog(HabitLogCreate):
         from_attributes = True
 
 
+class HabitLogBulkItem(BaseModel):
+    habit_id: int
+    completed_at: datetime
+    mood_score: Optional[int] = None
+    difficulty_rating: Optional[int] = None
+
+
+class HabitLogBulkCreate(BaseModel):
+    logs: List[HabitLogBulkItem]
+
+
+class HabitLogBulkResult(BaseModel):
+    inserted: int
+    duplicates: int
+    habits: List[Habit]
+
+
+class HistoryRun(BaseModel):
+    start: date
+    days: int
+
+
+class HabitHistory(BaseModel):
+    """
+    Completions of one habit in [start_date, end_date], in one encoding:
+    - timestamps: `completions`, paginated with `next_cursor`
+    - bitmap: `bitmap`, base64, bit i (LSB first) set when start_date + i days was completed
+    - rle: `runs` of consecutive completed days
+    """
+    habit_id: int
+    encoding: str
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    completions: Optional[List[datetime]] = None
+    next_cursor: Optional[str] = None
+    bitmap: Optional[str] = None
+    runs: Optional[List[HistoryRun]] = None
+
+
 # --- Intelligence Schemas ---
 class RiskFactor(BaseModel):
     factor: str
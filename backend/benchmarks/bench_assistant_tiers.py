@@ -0,0 +1,72 @@
+"""
+Assistant tier benchmark: latency and throughput of the local template engine
+vs. Gemini (simulated 1.5s upstream, response cache bypassed) for daily
+briefings through the API.
+
+Run from the backend directory:
+    python -m benchmarks.bench_assistant_tiers
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+os.environ["GEMINI_API_KEY"] = ""
+
+import httpx
+
+from app.core.config import settings
+from app.engine.gemini import gemini_client
+from app.engine.response_cache import gemini_response_cache
+from app.main import app
+
+UPSTREAM_SECONDS = 1.5
+HABITS = 50
+REQUESTS = 40
+
+
+class SlowModel:
+    async def generate_content_async(self, prompt, stream=False):
+        await asyncio.sleep(UPSTREAM_SECONDS)
+        return type("Response", (), {"text": "Stay consistent today."})()
+
+
+async def run(client, tier, concurrency):
+    latencies = []
+
+    async def one():
+        start = time.perf_counter()
+        res = await client.get("/api/v1/assistant/daily-briefing", params={"tier": tier})
+        assert res.headers["X-Assistant-Tier"] == tier, res.headers
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(0, REQUESTS, concurrency):
+        await asyncio.gather(*(one() for _ in range(min(concurrency, REQUESTS - i))))
+    return latencies, time.perf_counter() - start
+
+
+async def main():
+    gemini_response_cache.enabled = False
+    gemini_client.model, gemini_client.model_name = SlowModel(), "models/simulated-flash"
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        for i in range(HABITS):
+            await client.post("/api/v1/habits/", json={"title": f"habit-{i}", "difficulty": i % 5 + 1})
+
+        print(f"{'tier':>7} {'conc':>5} | {'p50 ms':>8} {'p95 ms':>8} | {'req/s':>8}")
+        for tier in ("local", "gemini"):
+            for concurrency in (1, settings.GEMINI_MAX_CONCURRENCY):
+                latencies, elapsed = await run(client, tier, concurrency)
+                latencies.sort()
+                print(
+                    f"{tier:>7} {concurrency:>5} | {statistics.median(latencies) * 1000:>8.1f} "
+                    f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:>8.1f} | {REQUESTS / elapsed:>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
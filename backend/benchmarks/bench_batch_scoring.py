@@ -0,0 +1,66 @@
+"""
+Scalar vs. vectorized scoring micro-benchmark.
+
+Run from the backend directory:
+    python -m benchmarks.bench_batch_scoring
+"""
+import time
+from datetime import datetime
+
+import numpy as np
+
+from app.engine.batch_scoring import score_batch
+from app.engine.intelligence import (
+    calculate_success_probability_from_stats,
+    assess_failure_risk_from_stats,
+)
+from app.models.habit import Habit
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def make_columns(n, seed=42):
+    rng = np.random.default_rng(seed)
+    now = np.datetime64(datetime.utcnow(), "us")
+    age_days = rng.integers(0, 1500, n)
+    created_at = now - age_days.astype("timedelta64[D]") - rng.integers(0, 86_400_000_000, n).astype("timedelta64[us]")
+    total_logs = (age_days * rng.random(n)).astype(np.int64)
+    last_completed_at = now - rng.integers(0, 30, n).astype("timedelta64[D]")
+    last_completed_at[total_logs == 0] = np.datetime64("NaT")
+    return {
+        "difficulty": rng.integers(1, 6, n),
+        "current_streak": rng.integers(0, 60, n),
+        "created_at": created_at,
+        "total_logs": total_logs,
+        "last_completed_at": last_completed_at,
+    }
+
+
+def scalar_loop(cols, now):
+    habits = [
+        Habit(difficulty=d, current_streak=s, created_at=c)
+        for d, s, c in zip(cols["difficulty"].tolist(), cols["current_streak"].tolist(), cols["created_at"].tolist())
+    ]
+    lasts = cols["last_completed_at"].tolist()
+    totals = cols["total_logs"].tolist()
+    start = time.perf_counter()
+    for habit, total, last in zip(habits, totals, lasts):
+        calculate_success_probability_from_stats(habit, total, now=now)
+        assess_failure_risk_from_stats(habit, total, last, now=now)
+    return time.perf_counter() - start
+
+
+def main():
+    now = datetime.utcnow()
+    print(f"{'habits':>10} | {'scalar s':>9} {'batch s':>9} | {'batch habits/s':>15} | speedup")
+    for n in SIZES:
+        cols = make_columns(n)
+        scalar_t = scalar_loop(cols, now)
+        start = time.perf_counter()
+        score_batch(now=now, **cols)
+        batch_t = time.perf_counter() - start
+        print(f"{n:>10} | {scalar_t:>9.3f} {batch_t:>9.3f} | {n / batch_t:>15,.0f} | {scalar_t / batch_t:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Bulk log ingestion benchmark: one /habits/logs/bulk request with 100k backdated
+records vs. per-record inserts with a per-record streak/probability update.
+
+Run from the backend directory:
+    python -m benchmarks.bench_bulk_log
+"""
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.api_v1.endpoints.habits import bulk_log_habits
+from app.db.base import Base
+from app.engine.intelligence import calculate_success_probability
+from app.models.habit import Habit, HabitLog
+from app.schemas import schemas
+
+N_HABITS = 500
+N_RECORDS = 100_000
+BASELINE_RECORDS = 2_000  # per-record path is extrapolated from a smaller sample
+
+
+def make_db():
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    now = datetime.utcnow()
+    db.add_all(Habit(id=i, user_id=1, title=f"habit-{i}", created_at=now - timedelta(days=400)) for i in range(1, N_HABITS + 1))
+    db.commit()
+    return path, db
+
+
+async def bulk(path, records):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+        start = time.perf_counter()
+        result = await bulk_log_habits(schemas.HabitLogBulkCreate(logs=records), db=db)
+        elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return result, elapsed
+
+
+def make_records(n, seed=42):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    return [
+        schemas.HabitLogBulkItem(
+            habit_id=rng.randint(1, N_HABITS),
+            completed_at=now - timedelta(days=rng.randint(1, 365), minutes=rng.randint(0, 600)),
+            mood_score=rng.randint(1, 5),
+        )
+        for _ in range(n)
+    ]
+
+
+def per_record(db, records):
+    """Naive path: one insert, full-history rescan and commit per record."""
+    for record in records:
+        habit = db.get(Habit, record.habit_id)
+        db.add(HabitLog(**record.model_dump()))
+        logs = db.query(HabitLog).filter(HabitLog.habit_id == habit.id).all()
+        habit.success_probability = calculate_success_probability(habit, logs)
+        db.commit()
+
+
+def main():
+    records = make_records(N_RECORDS)
+
+    path, db = make_db()
+    db.close()
+    result, bulk_t = asyncio.run(bulk(path, records))
+
+    _, db = make_db()
+    start = time.perf_counter()
+    per_record(db, records[:BASELINE_RECORDS])
+    baseline_t = (time.perf_counter() - start) * N_RECORDS / BASELINE_RECORDS
+    db.close()
+
+    print(f"records: {N_RECORDS:,}  habits: {N_HABITS}  inserted: {result.inserted:,}  duplicates: {result.duplicates:,}")
+    print(f"bulk endpoint:     {bulk_t:8.2f}s  ({N_RECORDS / bulk_t:,.0f} records/s)")
+    print(f"per-record (est.): {baseline_t:8.2f}s  ({N_RECORDS / baseline_t:,.0f} records/s)")
+    print(f"speedup: {baseline_t / bulk_t:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Load test for the async API: concurrent briefing and log requests against a stubbed
+Gemini model (fixed upstream latency). If DB access blocked the event loop, the
+concurrent run would take about as long as the serial one.
+
+Run from the backend directory:
+    python -m benchmarks.bench_concurrency
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+os.environ["GEMINI_API_KEY"] = ""
+
+import httpx
+
+from app.engine.gemini import gemini_client
+from app.main import app
+
+N_HABITS = 50
+N_BRIEFINGS = 50
+N_LOGS = 200
+LLM_LATENCY = 0.2
+
+
+class StubModel:
+    class Response:
+        text = "Stay consistent today."
+
+    async def generate_content_async(self, prompt, **kwargs):
+        await asyncio.sleep(LLM_LATENCY)
+        return self.Response()
+
+
+async def timed(client, method, url, **kwargs):
+    start = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+def requests_for(habit_ids):
+    calls = [("GET", "/api/v1/assistant/daily-briefing", {}) for _ in range(N_BRIEFINGS)]
+    for i in range(N_LOGS):
+        habit_id = habit_ids[i % len(habit_ids)]
+        calls.append(("POST", f"/api/v1/habits/{habit_id}/log", {"json": {"habit_id": habit_id}}))
+    return calls
+
+
+def report(label, latencies, wall):
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{label:<12} wall {wall:7.2f}s  {len(latencies) / wall:8.1f} req/s  "
+          f"p50 {statistics.median(latencies) * 1000:7.1f}ms  p99 {p99 * 1000:7.1f}ms")
+
+
+async def main():
+    gemini_client.model = StubModel()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        habit_ids = []
+        for i in range(N_HABITS):
+            response = await client.post("/api/v1/habits/", json={"title": f"habit-{i}"})
+            habit_ids.append(response.json()["id"])
+
+        calls = requests_for(habit_ids)
+
+        start = time.perf_counter()
+        serial = [await timed(client, method, url, **kw) for method, url, kw in calls]
+        serial_wall = time.perf_counter() - start
+
+        start = time.perf_counter()
+        concurrent = await asyncio.gather(*(timed(client, method, url, **kw) for method, url, kw in calls))
+        concurrent_wall = time.perf_counter() - start
+
+    print(f"{N_BRIEFINGS} briefings ({LLM_LATENCY * 1000:.0f}ms stubbed LLM) + {N_LOGS} log requests")
+    report("serial", serial, serial_wall)
+    report("concurrent", concurrent, concurrent_wall)
+    print(f"overlap: {sum(concurrent) / concurrent_wall:.1f} requests in flight on average")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""
+Dashboard summary benchmark: per-habit log queries vs. one grouped aggregate query.
+
+Run from the backend directory:
+    python -m benchmarks.bench_dashboard
+"""
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.api_v1.endpoints.habits import dashboard_summary
+from app.db.base import Base
+from app.engine.intelligence import calculate_success_probability, assess_failure_risk
+from app.models.habit import Habit, HabitLog
+
+SCALES = [(100, 30), (1_000, 30), (1_000, 365), (2_000, 365)]  # (habits, logs per habit)
+
+
+def legacy_dashboard_summary(db):
+    """The previous N+1 implementation, kept here as the baseline."""
+    habits = db.query(Habit).all()
+    total_prob = 0.0
+    for habit in habits:
+        logs = db.query(HabitLog).filter(HabitLog.habit_id == habit.id).all()
+        total_prob += calculate_success_probability(habit, logs)
+        assess_failure_risk(habit, logs)
+    return total_prob
+
+
+def endpoint_args(path: str) -> dict:
+    """The request and response arguments of a GET endpoint called directly, without If-None-Match."""
+    response = Response()
+    del response.headers["content-length"]
+    scope = {"type": "http", "method": "GET", "scheme": "http", "server": ("bench", 80),
+             "path": path, "query_string": b"", "headers": []}
+    return {"request": Request(scope), "response": response}
+
+
+def build_db(path, n_habits, logs_per_habit, seed=42):
+    rng = random.Random(seed)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+
+    with engine.begin() as conn:
+        conn.execute(Habit.__table__.insert(), [
+            {
+                "id": i,
+                "user_id": 1,
+                "title": f"habit-{i}",
+                "difficulty": rng.randint(1, 5),
+                "current_streak": rng.randint(0, 30),
+                "longest_streak": 30,
+                "success_probability": 0.5,
+                "created_at": now - timedelta(days=logs_per_habit + rng.randint(0, 60)),
+            }
+            for i in range(1, n_habits + 1)
+        ])
+        conn.execute(HabitLog.__table__.insert(), [
+            {"habit_id": i, "completed_at": now - timedelta(days=d, minutes=rng.randint(0, 600))}
+            for i in range(1, n_habits + 1)
+            for d in range(logs_per_habit)
+        ])
+    return engine
+
+
+def measure(engine, fn):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    db = sessionmaker(bind=engine)()
+    try:
+        start = time.perf_counter()
+        fn(db)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", listener)
+    return len(statements), elapsed
+
+
+async def measure_async(path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+        start = time.perf_counter()
+        await dashboard_summary(**endpoint_args("/api/v1/habits/dashboard/summary"), user_id=1, db=db)
+        elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return len(statements), elapsed
+
+
+def main():
+    print(f"{'habits':>8} {'logs':>10} | {'legacy q':>9} {'legacy ms':>10} | {'grouped q':>9} {'grouped ms':>10} | speedup")
+    for n_habits, logs_per_habit in SCALES:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        engine = build_db(path, n_habits, logs_per_habit)
+        legacy_q, legacy_t = measure(engine, legacy_dashboard_summary)
+        # Warm-up run backfills the stats table
+        asyncio.run(measure_async(path))
+        grouped_q, grouped_t = asyncio.run(measure_async(path))
+        print(
+            f"{n_habits:>8} {n_habits * logs_per_habit:>10} | "
+            f"{legacy_q:>9} {legacy_t * 1000:>10.1f} | "
+            f"{grouped_q:>9} {grouped_t * 1000:>10.1f} | "
+            f"{legacy_t / grouped_t:.1f}x"
+        )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
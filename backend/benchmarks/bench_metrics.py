@@ -0,0 +1,70 @@
+"""
+Metrics overhead benchmark: per-request latency of common endpoints with
+request metrics off, on, and on with the Server-Timing header, interleaved
+in rounds so drift affects every mode equally.
+
+Run from the backend directory:
+    python -m benchmarks.bench_metrics
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+os.environ["GEMINI_API_KEY"] = ""
+os.environ["SCORING_SCHEDULER_ENABLED"] = "false"
+
+import httpx
+
+from app.core.metrics import MetricsMiddleware, metrics
+from app.main import app
+
+HABITS = 50
+ROUNDS = 5
+REQUESTS = 200
+
+
+def set_mode(mode):
+    metrics.enabled = mode != "off"
+    middleware = next(m for m in app.user_middleware if m.cls is MetricsMiddleware)
+    middleware.kwargs["server_timing"] = mode == "server-timing"
+    app.middleware_stack = None
+
+
+async def time_requests(client, path):
+    latencies = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        res = await client.get(path)
+        latencies.append(time.perf_counter() - start)
+        assert res.status_code == 200, res.text
+    return latencies
+
+
+async def main():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(HABITS):
+            habit_id = (await client.post("/api/v1/habits/", json={"title": f"habit-{i}"})).json()["id"]
+            await client.post(f"/api/v1/habits/{habit_id}/log", json={"habit_id": habit_id})
+
+        paths = ["/", "/api/v1/habits/", "/api/v1/habits/1/insights", "/api/v1/habits/dashboard/summary"]
+        modes = ["off", "on", "server-timing"]
+        results = {(path, mode): [] for path in paths for mode in modes}
+        for _ in range(ROUNDS):
+            for path in paths:
+                for mode in modes:
+                    set_mode(mode)
+                    results[path, mode] += await time_requests(client, path)
+
+    print(f"{'endpoint':<34} | " + " ".join(f"{mode + ' p50 us':>19}" for mode in modes) + f" | {'overhead':>8}")
+    for path in paths:
+        p50 = {mode: statistics.median(results[path, mode]) * 1e6 for mode in modes}
+        overhead = (p50["on"] - p50["off"]) / p50["off"] * 100
+        print(f"{path:<34} | " + " ".join(f"{p50[mode]:>19.0f}" for mode in modes) + f" | {overhead:>7.1f}%")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
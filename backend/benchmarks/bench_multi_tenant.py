@@ -0,0 +1,127 @@
+"""
+Multi-tenant benchmark: per-request latency of user-scoped endpoints as the
+number of tenants grows (each with the same 4 habits and 8 recent logs per
+habit), next to one pass of the old unscoped reads (every habit plus a global
+3-day log count) on the same data. Scoped latency should stay flat.
+
+Run from the backend directory:
+    python -m benchmarks.bench_multi_tenant [tenant counts, e.g. 10,1000,100000]
+"""
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.api_v1.endpoints.assistant import _briefing_context
+from app.api.api_v1.endpoints.habits import dashboard_summary, habits_insights, read_habits
+from app.core.cache import score_cache
+from app.db.base import Base
+from app.models.habit import Habit, HabitLog, HabitStats
+from benchmarks.bench_dashboard import endpoint_args
+
+TENANTS = [10, 100, 1_000, 10_000, 100_000]
+HABITS_PER_TENANT = 4
+LOGS_PER_HABIT = 8
+SAMPLES = 50
+BATCH_TENANTS = 5_000
+
+
+def build_db(path, tenants, seed=42):
+    rng = random.Random(seed)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    today = now.date()
+
+    with engine.begin() as conn:
+        for first in range(1, tenants + 1, BATCH_TENANTS):
+            habits, logs, stats = [], [], []
+            for user_id in range(first, min(first + BATCH_TENANTS, tenants + 1)):
+                for n in range(HABITS_PER_TENANT):
+                    habit_id = (user_id - 1) * HABITS_PER_TENANT + n + 1
+                    habits.append({
+                        "id": habit_id, "user_id": user_id, "title": f"habit-{habit_id}", "frequency": "daily",
+                        "difficulty": rng.randint(1, 5), "current_streak": rng.randint(0, 5), "longest_streak": 5,
+                        "success_probability": 0.5, "created_at": now - timedelta(days=40),
+                    })
+                    days = sorted(rng.sample(range(30), LOGS_PER_HABIT), reverse=True)
+                    completed = [now - timedelta(days=d, hours=1) for d in days]
+                    logs += [{"habit_id": habit_id, "user_id": user_id, "completed_at": c} for c in completed]
+                    stats.append({
+                        "habit_id": habit_id, "total_completions": LOGS_PER_HABIT,
+                        "first_completed_at": completed[0], "last_completed_at": completed[-1],
+                        "window_date": completed[-1].date(),
+                        "completions_7d": sum((today - c.date()).days < 7 for c in completed),
+                        "completions_30d": LOGS_PER_HABIT,
+                    })
+            conn.execute(Habit.__table__.insert(), habits)
+            conn.execute(HabitLog.__table__.insert(), logs)
+            conn.execute(HabitStats.__table__.insert(), stats)
+    engine.dispose()
+
+
+async def timed(Session, call, tenants, rng):
+    latencies = []
+    for _ in range(SAMPLES):
+        user_id = rng.randint(1, tenants)
+        score_cache.clear()
+        async with Session() as db:
+            start = time.perf_counter()
+            await call(db, user_id)
+            latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000
+
+
+async def legacy_unscoped(db, user_id):
+    rows = (await db.execute(select(Habit, HabitStats).outerjoin(HabitStats, HabitStats.habit_id == Habit.id))).all()
+    await db.scalar(select(func.count(HabitLog.id)).where(HabitLog.completed_at >= datetime.utcnow() - timedelta(days=3)))
+    return rows
+
+
+CALLS = {
+    "list": lambda db, u: read_habits(
+        **endpoint_args("/api/v1/habits/"), cursor=None, skip=0, limit=100, user_id=u, db=db
+    ),
+    "insights": lambda db, u: habits_insights(
+        **endpoint_args("/api/v1/habits/insights"),
+        ids=None, include_history=False, history_limit=None, user_id=u, db=db,
+    ),
+    "dashboard": lambda db, u: dashboard_summary(**endpoint_args("/api/v1/habits/dashboard/summary"), user_id=u, db=db),
+    "briefing": lambda db, u: _briefing_context(db, u, "local"),
+}
+
+
+async def measure(path, tenants):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    rng = random.Random(7)
+    results = {name: await timed(Session, call, tenants, rng) for name, call in CALLS.items()}
+    async with Session() as db:
+        start = time.perf_counter()
+        await legacy_unscoped(db, None)
+        results["unscoped"] = (time.perf_counter() - start) * 1000
+    await engine.dispose()
+    return results
+
+
+def main():
+    tenants_list = [int(n) for n in sys.argv[1].split(",")] if len(sys.argv) > 1 else TENANTS
+    header = " ".join(f"{name + ' ms':>13}" for name in [*CALLS, "unscoped"])
+    print(f"{'tenants':>8} {'logs':>10} | {header}")
+    for tenants in tenants_list:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        build_db(path, tenants)
+        results = asyncio.run(measure(path, tenants))
+        row = " ".join(f"{results[name]:>13.2f}" for name in [*CALLS, "unscoped"])
+        print(f"{tenants:>8,} {tenants * HABITS_PER_TENANT * LOGS_PER_HABIT:>10,} | {row}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Nightly scoring job benchmark: time to rescore N habits (default 1,000,000)
+into daily snapshots, by chunk size.
+
+Run from the backend directory:
+    python -m benchmarks.bench_nightly_scoring [n_habits]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.scoring import run_scoring_job
+from app.db.base import Base
+from app.models.habit import Habit, HabitStats
+
+CHUNK_SIZES = [5_000, 20_000, 50_000]
+
+
+def build_db(path, n_habits, seed=42):
+    rng = random.Random(seed)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+
+    with engine.begin() as conn:
+        for start in range(1, n_habits + 1, 100_000):
+            ids = range(start, min(start + 100_000, n_habits + 1))
+            conn.execute(Habit.__table__.insert(), [
+                {
+                    "id": i,
+                    "user_id": 1,
+                    "title": f"habit-{i}",
+                    "difficulty": rng.randint(1, 5),
+                    "current_streak": rng.randint(0, 30),
+                    "longest_streak": 30,
+                    "success_probability": 0.5,
+                    "created_at": now - timedelta(days=rng.randint(30, 400)),
+                }
+                for i in ids
+            ])
+            conn.execute(HabitStats.__table__.insert(), [
+                {
+                    "habit_id": i,
+                    "total_completions": rng.randint(0, 300),
+                    "last_completed_at": now - timedelta(days=rng.randint(0, 20), hours=rng.randint(0, 23)),
+                }
+                for i in ids
+            ])
+    return engine
+
+
+def main():
+    n_habits = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    start = time.perf_counter()
+    engine = build_db(path, n_habits)
+    print(f"Seeded {n_habits:,} habits in {time.perf_counter() - start:.1f}s")
+
+    print(f"{'chunk':>8} | {'seconds':>8} {'habits/s':>10}")
+    for chunk_size in CHUNK_SIZES:
+        db = sessionmaker(bind=engine)()
+        try:
+            result = run_scoring_job(db, chunk_size=chunk_size, force=True, report=lambda message: None)
+        finally:
+            db.close()
+        print(f"{chunk_size:>8} | {result['seconds']:>8.1f} {result['habits_per_second']:>10,.0f}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
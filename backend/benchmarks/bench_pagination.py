@@ -0,0 +1,87 @@
+"""
+Listing benchmark: /habits/ pages at increasing depth with offset (skip)
+vs keyset (cursor) paging, and full responses vs 304 revalidations of the
+listing and the dashboard summary.
+
+Run from the backend directory:
+    python -m benchmarks.bench_pagination [n_habits]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+os.environ["GEMINI_API_KEY"] = ""
+os.environ["SCORING_SCHEDULER_ENABLED"] = "false"
+
+import httpx
+
+from app.api.api_v1.endpoints.habits import _encode_habit_cursor
+from app.core.cache import score_cache
+from app.db.session import engine
+from app.main import app
+from app.models.habit import Habit, HabitStats
+
+PAGE = 100
+SAMPLES = 20
+DASHBOARD_HABITS = 1_000
+
+
+def seed(n_habits):
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        # User 1 owns the long listing, user 2 a dashboard-sized set
+        rows = [{"id": i, "user_id": 1, "title": f"habit-{i}", "difficulty": i % 5 + 1, "current_streak": 0,
+                 "longest_streak": 0, "success_probability": 0.5, "created_at": now - timedelta(days=30)}
+                for i in range(1, n_habits + 1)]
+        rows += [{**row, "id": n_habits + i, "user_id": 2} for i, row in enumerate(rows[:DASHBOARD_HABITS], 1)]
+        conn.execute(Habit.__table__.insert(), rows)
+        conn.execute(HabitStats.__table__.insert(), [
+            {"habit_id": row["id"], "total_completions": 10, "last_completed_at": now - timedelta(days=row["id"] % 4)}
+            for row in rows
+        ])
+
+
+async def p50(client, path, params=None, headers=None, status=200, clear_cache=False):
+    latencies = []
+    for _ in range(SAMPLES):
+        if clear_cache:
+            score_cache.clear()
+        start = time.perf_counter()
+        res = await client.get(path, params=params, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        assert res.status_code == status, res.text
+    return statistics.median(latencies) * 1000
+
+
+async def main():
+    n_habits = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    seed(n_habits)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{n_habits:,} habits, pages of {PAGE}")
+        print(f"{'depth':>9} | {'skip ms':>9} {'cursor ms':>10}")
+        for depth in (0, n_habits // 100, n_habits // 10, n_habits // 2, n_habits - PAGE):
+            offset = await p50(client, "/api/v1/habits/", {"limit": PAGE, "skip": depth})
+            params = {"limit": PAGE, "cursor": _encode_habit_cursor(depth)} if depth else {"limit": PAGE}
+            keyset = await p50(client, "/api/v1/habits/", params)
+            print(f"{depth:>9,} | {offset:>9.2f} {keyset:>10.2f}")
+
+        print(f"\n{'endpoint':<22} | {'200 ms':>8} {'304 ms':>8}")
+        for name, path, headers, clear_cache in (
+            ("listing (1 page)", "/api/v1/habits/", {"X-User-Id": "2"}, False),
+            ("dashboard (uncached)", "/api/v1/habits/dashboard/summary", {"X-User-Id": "2"}, True),
+        ):
+            etag = (await client.get(path, headers=headers)).headers["ETag"]
+            full = await p50(client, path, headers=headers, clear_cache=clear_cache)
+            revalidated = await p50(client, path, headers={**headers, "If-None-Match": etag}, status=304,
+                                    clear_cache=clear_cache)
+            print(f"{name:<22} | {full:>8.2f} {revalidated:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+"""
+Parallel rescoring benchmark: the scoring job with 1..N worker processes
+(N = CPU count) over the same habits, with speedup relative to the serial
+path and a check that every run wrote exactly the serial snapshots.
+
+Run from the backend directory:
+    python -m benchmarks.bench_parallel_scoring [n_habits]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.scoring import run_scoring_job
+from app.models.habit import Habit, HabitScoreSnapshot
+from benchmarks.bench_nightly_scoring import build_db
+
+CHUNK_SIZE = 20_000
+
+
+def worker_counts():
+    cpus = os.cpu_count() or 1
+    counts = {1, cpus}
+    n = 2
+    while n < cpus:
+        counts.add(n)
+        n *= 2
+    # Always exercise the process pool, even on a single core
+    counts.add(2)
+    return sorted(counts)
+
+
+def snapshot_digest(db, day):
+    rows = db.execute(
+        select(HabitScoreSnapshot.__table__).where(HabitScoreSnapshot.day == day).order_by(HabitScoreSnapshot.habit_id)
+    )
+    return hash(tuple(tuple(v for k, v in row._mapping.items() if k != "day") for row in rows))
+
+
+def main():
+    n_habits = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = build_db(path, n_habits)
+    Session = sessionmaker(bind=engine)
+    now = datetime.utcnow()
+    day = now.date()
+
+    print(f"{n_habits:,} habits, {os.cpu_count()} CPUs, chunk {CHUNK_SIZE:,}")
+    print(f"{'workers':>8} | {'seconds':>8} {'habits/s':>10} {'speedup':>8} | matches serial")
+    baseline = expected = None
+    for workers in worker_counts():
+        with Session() as db:
+            # Every run refreshes the same probabilities
+            db.execute(update(Habit).values(success_probability=0.5))
+            db.commit()
+            start = time.perf_counter()
+            run_scoring_job(db, day=day, now=now, chunk_size=CHUNK_SIZE, workers=workers, force=True,
+                            report=lambda message: None)
+            elapsed = time.perf_counter() - start
+            digest = snapshot_digest(db, day)
+        if baseline is None:
+            baseline, expected = elapsed, digest
+        print(f"{workers:>8} | {elapsed:>8.1f} {n_habits / elapsed:>10,.0f} {baseline / elapsed:>7.2f}x | {digest == expected}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
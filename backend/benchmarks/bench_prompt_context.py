@@ -0,0 +1,144 @@
+"""
+Prompt context benchmark: size of the Gemini briefing prompt with the old
+one-line-per-habit context vs the token-budgeted one, as users have more
+habits, and end-to-end /daily-briefing latency against a stub model whose
+latency grows with the prompt (a fixed cost plus a per-token prefill cost;
+response cache bypassed).
+
+Run from the backend directory:
+    python -m benchmarks.bench_prompt_context
+"""
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+os.environ["GEMINI_API_KEY"] = ""
+os.environ["SCORING_SCHEDULER_ENABLED"] = "false"
+
+import httpx
+from sqlalchemy import func, select
+
+from app.api.api_v1.endpoints import assistant
+from app.core.config import settings
+from app.crud.habit import rebuild_all_habit_stats
+from app.db.session import AsyncSessionLocal, SessionLocal, engine
+from app.engine.gemini import briefing_prompt, gemini_client
+from app.engine.prompt_context import build_habit_context, estimate_tokens
+from app.engine.response_cache import gemini_response_cache
+from app.main import app
+from app.models.habit import Habit, HabitLog
+from app.models.user import User
+
+HABIT_COUNTS = [5, 20, 100, 500, 2_000]
+E2E_HABIT_COUNTS = [20, 100, 500]
+SAMPLES = 5
+UPSTREAM_BASE_SECONDS = 0.2
+UPSTREAM_SECONDS_PER_TOKEN = 0.0002
+
+
+class PrefillModel:
+    """Stand-in for genai.GenerativeModel whose latency grows with the prompt."""
+
+    async def generate_content_async(self, prompt, stream=False):
+        await asyncio.sleep(UPSTREAM_BASE_SECONDS + UPSTREAM_SECONDS_PER_TOKEN * estimate_tokens(prompt))
+        return type("Response", (), {"text": "Stay consistent today."})()
+
+
+async def legacy_briefing_context(db, user_id, tier):
+    """The previous context: every habit, one line each, and a bare 3-day log count."""
+    rows = await assistant._habit_rows(db, user_id)
+    user = await db.get(User, user_id)
+    recent_logs = await db.scalar(
+        select(func.count(HabitLog.id))
+        .where(HabitLog.user_id == user_id, HabitLog.completed_at >= datetime.utcnow() - timedelta(days=3))
+    )
+    await db.close()
+    return dict(
+        user_name=user.full_name if user else "Champion",
+        habits_summary="\n".join([f"- {h.title} ({h.frequency}, Streak: {h.current_streak})" for h, _ in rows]),
+        recent_logs=f"Total completions in last 3 days: {recent_logs}",
+        goals=user.goals if user and user.goals else "Be productive and consistent.",
+    )
+
+
+def seed(seed=42):
+    """One user per habit count (user id = count), each habit with up to 30 days of logs."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    habits, logs = [], []
+    for user_id in HABIT_COUNTS:
+        for n in range(user_id):
+            habit_id = len(habits) + 1
+            habits.append({
+                "id": habit_id, "user_id": user_id, "title": f"{rng.choice(['Read', 'Run', 'Stretch', 'Journal'])} {n}",
+                "frequency": "daily", "difficulty": rng.randint(1, 5), "current_streak": 0, "longest_streak": 0,
+                "success_probability": 0.5, "created_at": now - timedelta(days=40),
+            })
+            adherence = rng.uniform(0.1, 0.9)
+            logs += [
+                {"habit_id": habit_id, "user_id": user_id, "completed_at": now - timedelta(days=d, hours=rng.randint(1, 12))}
+                for d in range(30) if rng.random() < adherence
+            ]
+    with engine.begin() as conn:
+        conn.execute(Habit.__table__.insert(), habits)
+        conn.execute(HabitLog.__table__.insert(), logs)
+    with SessionLocal() as db:
+        rebuild_all_habit_stats(db)
+
+
+async def prompt_tokens(user_id, context_builder):
+    async with AsyncSessionLocal() as db:
+        context = await context_builder(db, user_id, "gemini")
+    return estimate_tokens(briefing_prompt(**context))
+
+
+async def p50(client, user_id):
+    latencies = []
+    for _ in range(SAMPLES):
+        start = time.perf_counter()
+        res = await client.get("/api/v1/assistant/daily-briefing", params={"tier": "gemini"},
+                               headers={"X-User-Id": str(user_id)})
+        latencies.append(time.perf_counter() - start)
+        assert res.headers["X-Assistant-Tier"] == "gemini", res.headers
+    return statistics.median(latencies) * 1000
+
+
+async def main():
+    seed()
+    budgeted_context = assistant._briefing_context
+    print(f"budget {settings.ASSISTANT_PROMPT_TOKEN_BUDGET} tokens (estimated at 4 chars per token)")
+    print(f"{'habits':>7} | {'legacy tok':>10} {'budgeted tok':>12} | {'build ms':>8}")
+    for n in HABIT_COUNTS:
+        legacy = await prompt_tokens(n, legacy_briefing_context)
+        budgeted = await prompt_tokens(n, budgeted_context)
+        async with AsyncSessionLocal() as db:
+            rows = await assistant._habit_rows(db, n)
+            completions = await assistant._recent_completions(db, n, datetime.utcnow())
+        build_times = []
+        for _ in range(SAMPLES):
+            start = time.perf_counter()
+            build_habit_context(rows, completions, datetime.utcnow().date(), settings.ASSISTANT_PROMPT_TOKEN_BUDGET)
+            build_times.append(time.perf_counter() - start)
+        build_ms = min(build_times) * 1000
+        print(f"{n:>7,} | {legacy:>10,} {budgeted:>12,} | {build_ms:>8.2f}")
+
+    gemini_response_cache.enabled = False
+    gemini_client.model, gemini_client.model_name = PrefillModel(), "models/stub-flash"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        print(f"\n{'habits':>7} | {'legacy ms':>10} {'budgeted ms':>12}")
+        for n in E2E_HABIT_COUNTS:
+            assistant._briefing_context = legacy_briefing_context
+            legacy = await p50(client, n)
+            assistant._briefing_context = budgeted_context
+            budgeted = await p50(client, n)
+            print(f"{n:>7,} | {legacy:>10.1f} {budgeted:>12.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+"""
+Gemini response cache benchmark: a cold briefing (simulated 2s upstream
+generation), warm cached briefings, and a burst of concurrent identical
+requests coalesced into one upstream call.
+
+Run from the backend directory:
+    python -m benchmarks.bench_response_cache
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+os.environ["GEMINI_API_KEY"] = ""
+
+import httpx
+
+from app.engine.gemini import gemini_client
+from app.engine.response_cache import gemini_response_cache
+from app.main import app
+
+UPSTREAM_SECONDS = 2.0
+BURST = 20
+
+
+class SlowModel:
+    calls = 0
+
+    async def generate_content_async(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(UPSTREAM_SECONDS)
+        return type("Response", (), {"text": "Stay consistent today."})()
+
+
+async def main():
+    model = SlowModel()
+    gemini_client.model, gemini_client.model_name = model, "models/simulated-flash"
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/api/v1/habits/", json={"title": "Read"})
+
+        start = time.perf_counter()
+        await client.get("/api/v1/assistant/daily-briefing")
+        cold = time.perf_counter() - start
+
+        warm = []
+        for _ in range(50):
+            start = time.perf_counter()
+            await client.get("/api/v1/assistant/daily-briefing")
+            warm.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client.get("/api/v1/assistant/plan") for _ in range(BURST)))
+        burst = time.perf_counter() - start
+
+    print(f"cold briefing:          {cold * 1000:8.1f} ms")
+    print(f"warm briefing (median): {statistics.median(warm) * 1000:8.1f} ms")
+    print(f"{BURST} concurrent plans:    {burst * 1000:8.1f} ms")
+    print(f"upstream calls: {model.calls}, cache: {gemini_response_cache.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
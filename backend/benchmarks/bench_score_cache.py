@@ -0,0 +1,79 @@
+"""
+Scored insights cache benchmark: dashboard summary and batched insights with a
+cold cache (everything scored) vs. a warm one (scores served from the cache).
+
+Run from the backend directory:
+    python -m benchmarks.bench_score_cache
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.api_v1.endpoints.habits import dashboard_summary, habit_insights, habits_insights
+from app.core.cache import score_cache
+from app.crud.habit import rebuild_all_habit_stats
+from benchmarks.bench_dashboard import build_db, endpoint_args
+
+SCALES = [(100, 30), (1_000, 90), (5_000, 90)]  # (habits, logs per habit)
+RUNS = 5
+
+
+async def single_insights(db, n=200):
+    """The per-card path: one /habits/{id}/insights call for each of n habits."""
+    for habit_id in range(1, n + 1):
+        await habit_insights(
+            **endpoint_args(f"/api/v1/habits/{habit_id}/insights"),
+            habit_id=habit_id, include_history=False, history_limit=None, user_id=1, db=db,
+        )
+
+
+async def timed(path, endpoint, **kwargs):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+        start = time.perf_counter()
+        await endpoint(db=db, **kwargs)
+        elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return elapsed
+
+
+def best_of(path, endpoint, cold, **kwargs):
+    times = []
+    for _ in range(RUNS):
+        if cold:
+            score_cache.clear()
+        times.append(asyncio.run(timed(path, endpoint, **kwargs)))
+    return min(times)
+
+
+def main():
+    score_cache.backend.max_entries = 100_000
+    print(f"{'habits':>8} {'endpoint':>10} | {'cold ms':>9} {'warm ms':>9} | speedup")
+    for n_habits, logs_per_habit in SCALES:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        engine = build_db(path, n_habits, logs_per_habit)
+        db = sessionmaker(bind=engine)()
+        rebuild_all_habit_stats(db)
+        db.close()
+
+        for name, endpoint, kwargs in [
+            ("dashboard", dashboard_summary, {**endpoint_args("/api/v1/habits/dashboard/summary"), "user_id": 1}),
+            ("insights", habits_insights, {
+                **endpoint_args("/api/v1/habits/insights"),
+                "ids": None, "include_history": False, "history_limit": None, "user_id": 1,
+            }),
+            ("per-habit", single_insights, {"n": min(200, n_habits)}),
+        ]:
+            cold = best_of(path, endpoint, cold=True, **kwargs)
+            warm = best_of(path, endpoint, cold=False, **kwargs)
+            print(f"{n_habits:>8} {name:>10} | {cold * 1000:>9.1f} {warm * 1000:>9.1f} | {cold / warm:.1f}x")
+        engine.dispose()
+    print(score_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Serialization benchmark: the habit listing, batched insights with embedded
+history and the dashboard summary, encoded the response_model way (schemas
+built by the handler, validated again and dumped by Pydantic) vs the fast path
+(plain dicts encoded by orjson). First the encoding step alone over a range
+of payload sizes, then full requests with FAST_JSON_ENABLED off and on.
+
+Run from the backend directory:
+    python -m benchmarks.bench_serialization
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+os.environ["GEMINI_API_KEY"] = ""
+os.environ["SCORING_SCHEDULER_ENABLED"] = "false"
+
+import httpx
+import orjson
+from pydantic import TypeAdapter
+
+from app.api.api_v1.endpoints.habits import _habit_dict, _insight_response
+from app.core.config import settings
+from app.crud.habit import rebuild_all_habit_stats
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.models.habit import Habit, HabitLog
+from app.schemas import schemas
+
+SAMPLES = 20
+RISK = {
+    "risk_score": 0.55,
+    "risk_level": "medium",
+    "factors": [
+        {"factor": "difficulty", "impact": 0.18, "note": "difficulty 4/5"},
+        {"factor": "inactivity", "impact": 0.16, "note": "2 days since last completion"},
+        {"factor": "consistency", "impact": -0.1375, "note": "33 logs / 60 days"},
+        {"factor": "streak", "impact": -0.1, "note": "streak 2"},
+    ],
+    "recommendation": "Try a smaller version of this habit today.",
+}
+
+
+def best_ms(fn):
+    times = []
+    for _ in range(SAMPLES):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def habits(n, now):
+    return [
+        Habit(id=i, user_id=1, title=f"habit-{i}", description="Ten minutes, no phone" if i % 2 else None,
+              frequency="daily", difficulty=i % 5 + 1, current_streak=i % 9, longest_streak=i % 20,
+              success_probability=0.3 + (i % 60) / 100, created_at=now - timedelta(days=i % 300, seconds=i))
+        for i in range(1, n + 1)
+    ]
+
+
+def encoding_cases(now):
+    """(name, response_model way, fast way) over listing, insights and dashboard payloads."""
+    cases = []
+    listing = TypeAdapter(List[schemas.Habit])
+    for n in (100, 1_000, 10_000):
+        rows = habits(n, now)
+        cases.append((
+            f"listing {n:,}",
+            lambda rows=rows: listing.dump_json(listing.validate_python(rows)),
+            lambda rows=rows: orjson.dumps([_habit_dict(habit) for habit in rows]),
+        ))
+
+    insights = TypeAdapter(List[schemas.HabitInsight])
+    scores = {"success_probability": 0.61, "risk": RISK}
+    for n, days in ((100, 0), (100, 30), (100, 365), (1_000, 30)):
+        history = [now - timedelta(days=d, minutes=d, microseconds=d) for d in range(days, 0, -1)]
+
+        def models(n=n, history=history):
+            return insights.dump_json(insights.validate_python([
+                schemas.HabitInsight(
+                    habit_id=i, success_probability=scores["success_probability"],
+                    risk_score=RISK["risk_score"], risk_level=RISK["risk_level"],
+                    factors=[schemas.RiskFactor(**f) for f in RISK["factors"]],
+                    recommendation=RISK["recommendation"], as_of=now, history=history,
+                )
+                for i in range(n)
+            ]))
+
+        cases.append((
+            f"insights {n:,} x {days}d",
+            models,
+            lambda n=n, history=history: orjson.dumps([_insight_response(i, scores, history) for i in range(n)]),
+        ))
+
+    summary = TypeAdapter(schemas.DashboardSummary)
+    at_risk = [{"id": i, "title": f"habit-{i}", "success_probability": 0.2 + i / 100, "risk_level": "high",
+                "recommendation": RISK["recommendation"]} for i in range(5)]
+    body = {"total_habits": 1_000, "avg_success_probability": 0.5731, "active_streaks": 412, "at_risk": at_risk}
+    cases.append((
+        "dashboard",
+        lambda: summary.dump_json(summary.validate_python(
+            schemas.DashboardSummary(**{**body, "at_risk": [schemas.HabitHealth(**h) for h in at_risk]})
+        )),
+        lambda: orjson.dumps(body),
+    ))
+    return cases
+
+
+def seed(now, n_habits=1_000, history_habits=100, days=365):
+    with engine.begin() as conn:
+        conn.execute(Habit.__table__.insert(), [
+            {"title": h.title, "description": h.description, "frequency": h.frequency, "difficulty": h.difficulty,
+             "current_streak": h.current_streak, "longest_streak": h.longest_streak,
+             "success_probability": h.success_probability, "created_at": h.created_at, "id": h.id,
+             "user_id": 1 if h.id <= n_habits else 2}
+            for h in habits(n_habits + history_habits, now)
+        ])
+        conn.execute(HabitLog.__table__.insert(), [
+            {"habit_id": habit_id, "user_id": 2, "completed_at": now - timedelta(days=d, hours=2)}
+            for habit_id in range(n_habits + 1, n_habits + history_habits + 1) for d in range(1, days + 1)
+        ])
+    with SessionLocal() as db:
+        rebuild_all_habit_stats(db)
+
+
+async def p50(client, path, headers):
+    latencies = []
+    for _ in range(SAMPLES):
+        start = time.perf_counter()
+        res = await client.get(path, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        assert res.status_code == 200, res.text
+    return statistics.median(latencies) * 1000, len(res.content)
+
+
+async def requests():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"\n{'request':<34} {'KiB':>7} | {'validated ms':>12} {'fast ms':>8} | speedup")
+        for name, path, user in (
+            ("listing, 1,000 habits", "/api/v1/habits/?limit=1000", "1"),
+            ("insights, 1,000 habits", "/api/v1/habits/insights", "1"),
+            ("insights, 100 habits x 365d", "/api/v1/habits/insights?include_history=true", "2"),
+            ("dashboard, 1,000 habits", "/api/v1/habits/dashboard/summary", "1"),
+        ):
+            headers = {"X-User-Id": user}
+            await client.get(path, headers=headers)  # warm the score cache
+            settings.FAST_JSON_ENABLED = False
+            validated, size = await p50(client, path, headers)
+            settings.FAST_JSON_ENABLED = True
+            fast, _ = await p50(client, path, headers)
+            print(f"{name:<34} {size / 1024:>7.0f} | {validated:>12.2f} {fast:>8.2f} | {validated / fast:.1f}x")
+
+
+def main():
+    now = datetime.utcnow()
+    print(f"{'payload':<24} {'KiB':>7} | {'validated ms':>12} {'fast ms':>8} | speedup")
+    for name, validated, fast in encoding_cases(now):
+        slow_ms, fast_ms = best_ms(validated), best_ms(fast)
+        print(f"{name:<24} {len(fast()) / 1024:>7.0f} | {slow_ms:>12.2f} {fast_ms:>8.2f} | {slow_ms / fast_ms:.1f}x")
+
+    seed(now)
+    asyncio.run(requests())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+SQLite concurrency stress test: several worker processes (like uvicorn workers), each
+running many concurrent log / insights / dashboard requests against one database file.
+Reports p50/p99 latency and "database is locked" errors with the default settings and
+with SQLITE_PRODUCTION_PROFILE enabled.
+
+Run from the backend directory:
+    python -m benchmarks.bench_sqlite_profile
+"""
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+WORKERS = 4
+CONCURRENCY = 16
+ITERATIONS = 20
+N_HABITS = 40
+
+
+async def worker_main(seed):
+    import httpx
+    from app.main import app
+
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+
+    async def one_client():
+        nonlocal errors
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for _ in range(ITERATIONS):
+                habit_id = rng.randint(1, N_HABITS)
+                method, url, kwargs = rng.choice([
+                    ("POST", "/api/v1/habits/logs/bulk", {"json": {"logs": [{
+                        "habit_id": habit_id,
+                        "completed_at": f"2024-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T08:00:00",
+                    }]}}),
+                    ("POST", f"/api/v1/habits/{habit_id}/log", {"json": {"habit_id": habit_id}}),
+                    ("GET", f"/api/v1/habits/{habit_id}/insights", {}),
+                    ("GET", "/api/v1/habits/dashboard/summary", {}),
+                ])
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, url, **kwargs)
+                    if response.status_code >= 500:
+                        errors += 1
+                except Exception as e:
+                    if "locked" not in str(e):
+                        raise
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one_client() for _ in range(CONCURRENCY)))
+    print(json.dumps({"latencies": latencies, "errors": errors}))
+
+
+def run(profile: bool):
+    db_path = os.path.join(tempfile.mkdtemp(), "stress.db")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", GEMINI_API_KEY="",
+               SQLITE_PRODUCTION_PROFILE="1" if profile else "0")
+
+    seed = (
+        "from app.main import app\n"
+        "from app.db.session import SessionLocal\n"
+        "from app.crud.habit import new_habit_stats\n"
+        "from app.models.habit import Habit\n"
+        "db = SessionLocal()\n"
+        f"db.add_all(Habit(user_id=1, title=f'h{{i}}', stats=new_habit_stats()) for i in range({N_HABITS}))\n"
+        "db.commit()\n"
+    )
+    subprocess.run([sys.executable, "-c", seed], env=env, check=True, capture_output=True)
+
+    start = time.perf_counter()
+    procs = [
+        subprocess.Popen([sys.executable, "-m", "benchmarks.bench_sqlite_profile", "--worker", str(i)],
+                         env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        for i in range(WORKERS)
+    ]
+    latencies, errors = [], 0
+    for proc in procs:
+        out, _ = proc.communicate()
+        result = json.loads(out.strip().splitlines()[-1])
+        latencies += result["latencies"]
+        errors += result["errors"]
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    label = "profile" if profile else "default"
+    print(f"{label:<8} {len(latencies):>6} req  {len(latencies) / wall:7.1f} req/s  "
+          f"p50 {p50:8.1f}ms  p99 {p99:8.1f}ms  lock errors {errors}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--worker":
+        asyncio.run(worker_main(int(sys.argv[2])))
+    else:
+        print(f"{WORKERS} processes x {CONCURRENCY} concurrent clients x {ITERATIONS} requests")
+        run(profile=False)
+        run(profile=True)
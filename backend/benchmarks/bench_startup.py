@@ -0,0 +1,133 @@
+"""
+Cold-start benchmark of app.main against a fake google.generativeai stub with
+simulated network latency: the previous eager, sequential model probing vs.
+lazy selection with concurrent probes, with and without the model cache file.
+Each scenario runs in a fresh interpreter.
+
+Run from the backend directory:
+    python -m benchmarks.bench_startup
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+LIST_DELAY = 0.5
+PROBE_DELAY = 0.8
+RUNS = 3
+
+FAKE_GENAI = textwrap.dedent(f'''
+    """Fake google.generativeai: list_models and probes sleep like network calls."""
+    import asyncio
+    import time
+    from types import SimpleNamespace
+
+    # Quota errors on the preferred models, like a free-tier key
+    FAILING = {{"models/gemini-1.5-flash", "models/gemini-1.5-flash-8b", "models/gemini-2.0-flash"}}
+    NAMES = sorted(FAILING) + ["models/gemini-1.5-pro", "models/gemini-pro", "models/gemini-ultra"]
+
+    def configure(api_key):
+        pass
+
+    def list_models():
+        time.sleep({LIST_DELAY})
+        return [SimpleNamespace(name=n, supported_generation_methods=["generateContent"]) for n in NAMES]
+
+    class GenerativeModel:
+        def __init__(self, name):
+            self.name = name
+
+        def _result(self):
+            if self.name in FAILING:
+                raise RuntimeError("429 quota exceeded")
+            return SimpleNamespace(text="Hi")
+
+        def generate_content(self, prompt, generation_config=None):
+            time.sleep({PROBE_DELAY})
+            return self._result()
+
+        async def generate_content_async(self, prompt, generation_config=None):
+            await asyncio.sleep({PROBE_DELAY})
+            return self._result()
+''')
+
+# The pre-lazy GeminiClient._init_model, run eagerly at import time
+LEGACY = textwrap.dedent('''
+    import google.generativeai as genai
+    import app.main
+    models = [m for m in genai.list_models() if "generateContent" in m.supported_generation_methods]
+    for m in models:
+        try:
+            if genai.GenerativeModel(m.name).generate_content("Hi", generation_config={"max_output_tokens": 1}).text:
+                break
+        except Exception:
+            continue
+''')
+
+LAZY_IMPORT = "import app.main"
+
+LAZY_READY = textwrap.dedent('''
+    import asyncio
+    import app.main
+    from app.engine.gemini import gemini_client
+    assert asyncio.run(gemini_client.ensure_model()) is not None
+''')
+
+TIMER = textwrap.dedent('''
+    import time
+    start = time.perf_counter()
+    exec(compile(open({path!r}).read(), "scenario", "exec"))
+    print(time.perf_counter() - start)
+''')
+
+
+def run(code, env, workdir):
+    path = os.path.join(workdir, "scenario.py")
+    with open(path, "w") as f:
+        f.write(code)
+    result = subprocess.run(
+        [sys.executable, "-c", TIMER.format(path=path)],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    stub_dir = os.path.join(workdir, "stubs", "google", "generativeai")
+    os.makedirs(stub_dir)
+    with open(os.path.join(stub_dir, "__init__.py"), "w") as f:
+        f.write(FAKE_GENAI)
+
+    model_cache = os.path.join(workdir, "model.json")
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join([os.path.join(workdir, "stubs"), os.getcwd()]),
+        "DATABASE_URL": f"sqlite:///{workdir}/bench.db",
+        "GEMINI_API_KEY": "fake-key",
+        "GEMINI_MODEL_CACHE_PATH": model_cache,
+        "PYTHONWARNINGS": "ignore",
+    }
+
+    def best(code, keep_cache):
+        times = []
+        for _ in range(RUNS):
+            if not keep_cache and os.path.exists(model_cache):
+                os.remove(model_cache)
+            times.append(run(code, env, workdir))
+        return min(times)
+
+    # Warm the database schema so every scenario measures the same import work
+    run(LAZY_IMPORT, env, workdir)
+
+    print(f"list_models {LIST_DELAY}s, {PROBE_DELAY}s per probe, first 3 candidates fail")
+    print(f"{'scenario':<44} {'seconds':>8}")
+    print(f"{'eager sequential probing (previous)':<44} {best(LEGACY, False):>8.2f}")
+    print(f"{'lazy: import app.main':<44} {best(LAZY_IMPORT, False):>8.2f}")
+    print(f"{'lazy: import + model ready, no cache file':<44} {best(LAZY_READY, False):>8.2f}")
+    print(f"{'lazy: import + model ready, cached model':<44} {best(LAZY_READY, True):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Streak repair benchmark: rescanning every log row vs. recomputing from the
+per-habit day bitmaps stored in habit_stats.
+
+Run from the backend directory:
+    python -m benchmarks.bench_streaks
+"""
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from itertools import groupby
+
+from sqlalchemy import create_engine, func, update
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.habit import rebuild_all_habit_stats, recompute_all_streaks
+from app.db.base import Base
+from app.models.habit import Habit, HabitLog, HabitStats
+
+SCALES = [(1_000, 365), (10_000, 365), (10_000, 1_095)]  # (habits, days of history)
+COMPLETION_RATE = 0.8
+
+
+def build_db(n_habits, n_days, seed=42):
+    rng = random.Random(seed)
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(Habit.__table__.insert(), [
+            {"id": i, "user_id": 1, "title": f"habit-{i}", "current_streak": 0, "longest_streak": 0,
+             "created_at": now - timedelta(days=n_days)}
+            for i in range(1, n_habits + 1)
+        ])
+        conn.execute(HabitLog.__table__.insert(), [
+            {"habit_id": i, "completed_at": now - timedelta(days=d, minutes=rng.randint(0, 600))}
+            for i in range(1, n_habits + 1)
+            for d in range(n_days)
+            if rng.random() < COMPLETION_RATE
+        ])
+    db = sessionmaker(bind=engine)()
+    rebuild_all_habit_stats(db)
+    return engine, db
+
+
+def rescan_streaks(db):
+    """Repair streaks the old way: read every log, ordered, and walk the days."""
+    rows = db.query(HabitLog.habit_id, HabitLog.completed_at).order_by(HabitLog.habit_id, HabitLog.completed_at)
+    updates = []
+    for habit_id, habit_rows in groupby(rows, key=lambda r: r.habit_id):
+        current = longest = 0
+        previous = None
+        for day in sorted({completed_at.date() for _, completed_at in habit_rows}):
+            current = current + 1 if previous is not None and (day - previous).days == 1 else 1
+            longest = max(longest, current)
+            previous = day
+        updates.append({"id": habit_id, "current_streak": current, "longest_streak": longest})
+    db.execute(update(Habit), updates)
+    db.commit()
+
+
+def main():
+    print(f"{'habits':>8} {'logs':>10} | {'rescan s':>9} | {'bitmap s':>9} | {'bytes/habit':>11} | speedup")
+    for n_habits, n_days in SCALES:
+        engine, db = build_db(n_habits, n_days)
+        n_logs = db.query(func.count(HabitLog.id)).scalar()
+        bitmap_bytes = db.query(func.avg(func.length(HabitStats.completion_bitmap))).scalar()
+
+        start = time.perf_counter()
+        rescan_streaks(db)
+        rescan = time.perf_counter() - start
+
+        # Drift every habit so the bitmap path writes as many rows as the rescan
+        db.execute(update(Habit).values(current_streak=-1, longest_streak=-1))
+        db.commit()
+        start = time.perf_counter()
+        changed = recompute_all_streaks(db)
+        bitmap = time.perf_counter() - start
+        assert changed == n_habits
+
+        print(f"{n_habits:>8} {n_logs:>10} | {rescan:>9.2f} | {bitmap:>9.2f} | {bitmap_bytes:>11.0f} | {rescan / bitmap:.1f}x")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
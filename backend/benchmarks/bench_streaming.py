@@ -0,0 +1,68 @@
+"""
+Assistant streaming benchmark: time to first text and total time for a
+briefing generated in one shot vs. streamed, against a simulated upstream
+that produces 20 chunks over 2 seconds.
+
+Run from the backend directory:
+    python -m benchmarks.bench_streaming
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+os.environ["GEMINI_API_KEY"] = ""
+
+from app.db.base import Base
+from app.db.session import engine
+from app.engine.gemini import gemini_client
+
+CHUNKS = 20
+UPSTREAM_SECONDS = 2.0
+
+
+class ChunkedModel:
+    async def generate_content_async(self, prompt, stream=False):
+        if stream:
+            return self._chunks()
+        await asyncio.sleep(UPSTREAM_SECONDS)
+        return type("Response", (), {"text": "word " * CHUNKS})()
+
+    async def _chunks(self):
+        for _ in range(CHUNKS):
+            await asyncio.sleep(UPSTREAM_SECONDS / CHUNKS)
+            yield type("Chunk", (), {"text": "word "})()
+
+
+async def one_shot(goals):
+    start = time.perf_counter()
+    await gemini_client.generate_daily_briefing("Champion", "- Read", "3 completions", goals)
+    total = time.perf_counter() - start
+    return total, total
+
+
+async def streamed(goals):
+    start = time.perf_counter()
+    first = None
+    async for _ in gemini_client.stream_daily_briefing("Champion", "- Read", "3 completions", goals):
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+async def main():
+    Base.metadata.create_all(bind=engine)
+    gemini_client.model, gemini_client.model_name = ChunkedModel(), "models/simulated-flash"
+
+    print(f"{'mode':>10} | {'first text ms':>13} {'total ms':>9}")
+    # Distinct goals per run so neither mode is served from the response cache
+    for mode, run in (("one-shot", one_shot), ("streamed", streamed)):
+        first, total = await run(f"bench {mode}")
+        print(f"{mode:>10} | {first * 1000:>13.1f} {total * 1000:>9.1f}")
+    first, total = await streamed("bench one-shot")
+    print(f"{'cached':>10} | {first * 1000:>13.1f} {total * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
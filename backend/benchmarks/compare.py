@@ -0,0 +1,84 @@
+"""
+Compare two benchmark suite result files. A benchmark regressed when its p50
+grew by more than the threshold ratio and by more than a minimum absolute
+delta (so sub-microsecond jitter on tiny functions never fails a run).
+
+Run from the backend directory:
+    python -m benchmarks.compare baseline.json current.json [--threshold 0.2]
+Exits with status 1 when any benchmark regressed.
+"""
+import argparse
+import json
+import sys
+from typing import List
+
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_MIN_DELTA_MS = 0.05
+
+
+def compare(
+    baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD, min_delta_ms: float = DEFAULT_MIN_DELTA_MS
+) -> List[dict]:
+    """
+    One row per benchmark in either run: name, baseline/current p50, relative
+    change and a status of "regression", "improvement", "ok", "new" or "missing".
+    """
+    before, after = baseline["results"], current["results"]
+    rows = []
+    for name in sorted(before.keys() | after.keys()):
+        if name not in before or name not in after:
+            rows.append({
+                "name": name,
+                "baseline": before.get(name, {}).get("p50"),
+                "current": after.get(name, {}).get("p50"),
+                "change": None,
+                "status": "new" if name not in before else "missing",
+            })
+            continue
+        old, new = before[name]["p50"], after[name]["p50"]
+        change = (new - old) / old if old else 0.0
+        status = "ok"
+        if abs(new - old) >= min_delta_ms:
+            if change > threshold:
+                status = "regression"
+            elif change < -threshold:
+                status = "improvement"
+        rows.append({"name": name, "baseline": old, "current": new, "change": change, "status": status})
+    return rows
+
+
+def print_report(rows: List[dict]):
+    def ms(value):
+        return f"{value:>10.3f}" if value is not None else f"{'-':>10}"
+
+    print(f"{'benchmark':<40} | {'base p50':>10} {'new p50':>10} {'change':>8} | status")
+    for row in rows:
+        change = f"{row['change'] * 100:>+7.1f}%" if row["change"] is not None else f"{'-':>8}"
+        print(f"{row['name']:<40} | {ms(row['baseline'])} {ms(row['current'])} {change} | {row['status']}")
+    regressions = sum(row["status"] == "regression" for row in rows)
+    print(f"{regressions} regression(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark suite result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS)
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    if baseline["meta"].get("dataset") != current["meta"].get("dataset"):
+        print("Warning: the runs used different datasets; timings may not be comparable")
+
+    rows = compare(baseline, current, args.threshold, args.min_delta_ms)
+    print_report(rows)
+    if any(row["status"] == "regression" for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
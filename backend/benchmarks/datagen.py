@@ -0,0 +1,164 @@
+"""
+Seeded synthetic data for benchmarks: users, habits and years of completion
+and prediction history, at any scale from a thousand to ten million logs.
+The same seed and sizes always produce the same rows. HabitStats and streaks
+are derived from the generated logs with the same code the app uses, so
+every read path sees consistent data.
+
+Run from the backend directory:
+    python -m benchmarks.datagen --logs 1000000 --out /tmp/habitos-1m.db
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.crud.habit import rebuild_all_habit_stats, recompute_all_streaks
+from app.db.base import Base
+from app.engine.intelligence import RECOMMENDATIONS
+from app.models.habit import Habit, HabitLog, PredictionLog
+from app.models.user import User
+
+# Average share of days a generated habit is completed on
+MEAN_ADHERENCE = 0.6
+INSERT_BATCH = 50_000
+
+
+def _midnight(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _insert(conn, table, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == INSERT_BATCH:
+            conn.execute(table.insert(), batch)
+            batch = []
+    if batch:
+        conn.execute(table.insert(), batch)
+
+
+def generate(
+    engine: Engine,
+    logs: int,
+    habits_per_user: int = 5,
+    years: float = 2.0,
+    prediction_days: int = 90,
+    seed: int = 42,
+    now: Optional[datetime] = None,
+) -> dict:
+    """
+    Fill an empty database with exactly `logs` HabitLog rows spread over
+    enough habits that each covers at most `years` of history, and one
+    PredictionLog per habit per day for the last `prediction_days` days.
+    Returns the row counts and the reference time the history ends at.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+    window = max(int(years * 365), 1)
+    n_habits = max(1, round(logs / (window * MEAN_ADHERENCE)))
+    n_users = max(1, -(-n_habits // habits_per_user))
+
+    Base.metadata.create_all(bind=engine)
+
+    # Per habit: adherence, log count and a history span long enough to hold them
+    habits = []
+    for habit_id in range(1, n_habits + 1):
+        target = logs // n_habits + (1 if habit_id <= logs % n_habits else 0)
+        adherence = rng.uniform(0.2, 1.0)
+        span = min(window, max(target, int(target / adherence)))
+        # A habit with more logs than days in the window gets a longer history
+        span = max(span, target)
+        habits.append({
+            "id": habit_id,
+            "user_id": (habit_id - 1) // habits_per_user + 1,
+            "title": f"habit-{habit_id}",
+            "frequency": "daily",
+            "difficulty": rng.randint(1, 5),
+            "current_streak": 0,
+            "longest_streak": 0,
+            "success_probability": 0.5,
+            "created_at": _midnight(now) - timedelta(days=span - 1, hours=rng.randint(0, 12)),
+            "_target": target,
+            "_span": span,
+        })
+
+    def habit_logs():
+        for habit in habits:
+            for days_ago in sorted(rng.sample(range(habit["_span"]), habit["_target"]), reverse=True):
+                yield {
+                    "habit_id": habit["id"],
+                    "user_id": habit["user_id"],
+                    "completed_at": _midnight(now) - timedelta(days=days_ago) + timedelta(minutes=rng.randint(360, 1380)),
+                    "mood_score": rng.randint(1, 5) if rng.random() < 0.3 else None,
+                    "difficulty_rating": rng.randint(1, 5) if rng.random() < 0.2 else None,
+                }
+
+    def predictions():
+        for habit in habits:
+            for days_ago in range(min(prediction_days, habit["_span"]), 0, -1):
+                score = round(rng.uniform(0.1, 0.95), 4)
+                risk_level = "low" if score >= 0.66 else "medium" if score >= 0.33 else "high"
+                predicted_for = _midnight(now) - timedelta(days=days_ago)
+                yield {
+                    "habit_id": habit["id"],
+                    "predicted_for": predicted_for,
+                    "score": score,
+                    "risk_level": risk_level,
+                    "explanation": RECOMMENDATIONS[risk_level],
+                    "model_version": "heuristic-v1",
+                    "created_at": predicted_for + timedelta(hours=8),
+                }
+
+    with engine.begin() as conn:
+        _insert(conn, User.__table__, (
+            {"id": user_id, "email": f"user{user_id}@bench.habitos", "full_name": f"User {user_id}", "is_active": True}
+            for user_id in range(1, n_users + 1)
+        ))
+        _insert(conn, Habit.__table__, (
+            {k: v for k, v in habit.items() if not k.startswith("_")} for habit in habits
+        ))
+        _insert(conn, HabitLog.__table__, habit_logs())
+        _insert(conn, PredictionLog.__table__, predictions())
+
+    with Session(engine) as db:
+        rebuild_all_habit_stats(db)
+        recompute_all_streaks(db)
+
+    return {
+        "users": n_users,
+        "habits": n_habits,
+        "logs": logs,
+        "predictions": sum(min(prediction_days, habit["_span"]) for habit in habits),
+        "now": now.isoformat(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a seeded HabitOS benchmark database.")
+    parser.add_argument("--logs", type=int, default=100_000, help="HabitLog rows to generate")
+    parser.add_argument("--habits-per-user", type=int, default=5)
+    parser.add_argument("--years", type=float, default=2.0, help="Longest history per habit")
+    parser.add_argument("--prediction-days", type=int, default=90, help="Daily predictions per habit")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", required=True, help="SQLite file to create")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    engine = create_engine(f"sqlite:///{args.out}")
+    counts = generate(engine, args.logs, args.habits_per_user, args.years, args.prediction_days, args.seed)
+    engine.dispose()
+    print(
+        f"{counts['users']:,} users, {counts['habits']:,} habits, {counts['logs']:,} logs, "
+        f"{counts['predictions']:,} predictions in {time.perf_counter() - start:.1f}s -> {args.out}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Benchmark suite: seeds a database with benchmarks.datagen, then times the
+intelligence functions (micro) and the log, insights, dashboard and assistant
+endpoints through the TestClient with a stubbed Gemini model (e2e). Results
+are written as JSON. Pass --baseline to compare them with an earlier run;
+the exit status is 1 when any benchmark's p50 regressed beyond --threshold.
+
+Run from the backend directory:
+    python -m benchmarks.suite --logs 100000 --out bench-results.json
+    python -m benchmarks.suite --logs 100000 --out new.json --baseline bench-results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# The app reads its settings at import: point it at the benchmark database first
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='habitos-bench-')}/bench.db"
+os.environ["GEMINI_API_KEY"] = ""
+os.environ["SCORING_SCHEDULER_ENABLED"] = "false"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.core.cache import score_cache
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.engine.batch_scoring import score_batch
+from app.engine.day_bitmap import DayBitmap
+from app.engine.gemini import gemini_client
+from app.engine.intelligence import (
+    assess_failure_risk,
+    assess_failure_risk_from_stats,
+    calculate_success_probability,
+    calculate_success_probability_from_stats,
+)
+from app.engine.local_assistant import local_briefing, local_plan
+from app.engine.prompt_context import activity_since, build_habit_context
+from app.engine.response_cache import gemini_response_cache
+from app.main import app
+from app.models.habit import Habit, HabitLog, HabitStats
+from benchmarks.compare import DEFAULT_MIN_DELTA_MS, DEFAULT_THRESHOLD, compare, print_report
+from benchmarks.datagen import generate
+
+
+class StubModel:
+    """Instant stand-in for genai.GenerativeModel, so e2e runs measure the app, not the network."""
+
+    async def generate_content_async(self, prompt, stream=False):
+        return type("Response", (), {"text": "Stay consistent today."})()
+
+
+def summarize(times_ms) -> dict:
+    ordered = sorted(times_ms)
+    return {
+        "unit": "ms",
+        "n": len(ordered),
+        "p50": statistics.median(ordered),
+        "p95": ordered[max(int(len(ordered) * 0.95) - 1, 0)],
+        "mean": statistics.fmean(ordered),
+        "min": ordered[0],
+    }
+
+
+def measure(fn, samples: int, per: int = 1) -> dict:
+    """Time fn() `samples` times; each sample is divided by `per` (calls made inside fn)."""
+    fn()
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000 / per)
+    return summarize(times)
+
+
+def micro_benchmarks(samples: int) -> dict:
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        rows = db.execute(select(Habit, HabitStats).join(HabitStats, HabitStats.habit_id == Habit.id)).all()
+        busiest = db.scalar(
+            select(HabitLog.habit_id).group_by(HabitLog.habit_id).order_by(func.count().desc()).limit(1)
+        )
+        habit = db.get(Habit, busiest)
+        logs = db.scalars(select(HabitLog).where(HabitLog.habit_id == busiest).order_by(HabitLog.completed_at)).all()
+        user_rows = [(h, s) for h, s in rows if h.user_id == 1]
+        user_completions = db.execute(
+            select(HabitLog.habit_id, HabitLog.completed_at)
+            .where(HabitLog.user_id == 1, HabitLog.completed_at >= activity_since(now.date()))
+        ).all()
+        db.expunge_all()
+
+    days = sorted({log.completed_at.date() for log in logs})
+    columns = {
+        "difficulty": [h.difficulty for h, _ in rows],
+        "current_streak": [h.current_streak for h, _ in rows],
+        "created_at": [h.created_at for h, _ in rows],
+        "total_logs": [s.total_completions for _, s in rows],
+        "last_completed_at": [s.last_completed_at for _, s in rows],
+    }
+
+    def each_habit(score):
+        return lambda: [score(h, s) for h, s in rows]
+
+    def bitmap_streaks():
+        bitmap = DayBitmap.from_days(days)
+        return bitmap.current_streak(), bitmap.longest_streak()
+
+    # Per-call time: the *_from_stats functions run once per habit, the rest once per sample
+    return {
+        "micro.success_probability_from_stats": measure(
+            each_habit(lambda h, s: calculate_success_probability_from_stats(h, s.total_completions, now=now)),
+            samples, per=len(rows),
+        ),
+        "micro.failure_risk_from_stats": measure(
+            each_habit(lambda h, s: assess_failure_risk_from_stats(h, s.total_completions, s.last_completed_at, now=now)),
+            samples, per=len(rows),
+        ),
+        "micro.success_probability_from_logs": measure(lambda: calculate_success_probability(habit, logs), samples),
+        "micro.failure_risk_from_logs": measure(lambda: assess_failure_risk(habit, logs), samples),
+        "micro.bitmap_streaks": measure(bitmap_streaks, samples),
+        "micro.score_batch_all_habits": measure(lambda: score_batch(**columns, now=now), samples),
+        "micro.local_briefing": measure(lambda: local_briefing("Bench", user_rows, 10, now=now), samples),
+        "micro.local_plan": measure(lambda: local_plan(user_rows, now=now), samples),
+        "micro.prompt_context": measure(
+            lambda: build_habit_context(user_rows, user_completions, now.date(), settings.ASSISTANT_PROMPT_TOKEN_BUDGET),
+            samples,
+        ),
+    }
+
+
+def e2e_benchmarks(samples: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    gemini_response_cache.enabled = False
+    gemini_client.model, gemini_client.model_name = StubModel(), "models/stub-flash"
+
+    with SessionLocal() as db:
+        owners = db.execute(select(Habit.id, Habit.user_id).order_by(Habit.id)).all()
+        user_habit_ids = db.scalars(select(Habit.id).where(Habit.user_id == 1).order_by(Habit.id)).all()
+
+    def get(client, path, **params):
+        def call():
+            res = client.get(path, params=params)
+            assert res.status_code == 200, res.text
+            assert res.headers.get("X-Assistant-Tier") == params.get("tier"), res.headers
+        return call
+
+    def log(client):
+        def call():
+            habit_id, user_id = rng.choice(owners)
+            res = client.post(
+                f"/api/v1/habits/{habit_id}/log", json={"habit_id": habit_id}, headers={"X-User-Id": str(user_id)}
+            )
+            assert res.status_code == 200, res.text
+        return call
+
+    def cold(call):
+        def uncached():
+            score_cache.clear()
+            call()
+        return uncached
+
+    insight = f"/api/v1/habits/{user_habit_ids[0]}/insights"
+    with TestClient(app) as client:
+        return {
+            "e2e.log": measure(log(client), samples),
+            "e2e.insights_cold": measure(cold(get(client, insight)), samples),
+            "e2e.insights_cached": measure(get(client, insight), samples),
+            "e2e.insights_batch": measure(
+                cold(get(client, "/api/v1/habits/insights", ids=user_habit_ids)), samples
+            ),
+            "e2e.dashboard_summary": measure(cold(get(client, "/api/v1/habits/dashboard/summary")), samples),
+            "e2e.assistant_briefing_gemini": measure(
+                get(client, "/api/v1/assistant/daily-briefing", tier="gemini"), samples
+            ),
+            "e2e.assistant_briefing_local": measure(
+                get(client, "/api/v1/assistant/daily-briefing", tier="local"), samples
+            ),
+            "e2e.assistant_plan_gemini": measure(get(client, "/api/v1/assistant/plan", tier="gemini"), samples),
+        }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the HabitOS benchmark suite.")
+    parser.add_argument("--logs", type=int, default=10_000, help="HabitLog rows to generate")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--samples", type=int, default=50, help="Timed samples per benchmark")
+    parser.add_argument("--only", choices=["micro", "e2e"], help="Run one group only")
+    parser.add_argument("--out", default="bench-results.json")
+    parser.add_argument("--baseline", help="Earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed relative p50 slowdown, e.g. 0.2 = 20%%")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help="Ignore slowdowns smaller than this, whatever the ratio")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    dataset = generate(engine, args.logs, seed=args.seed)
+    print(f"Seeded {dataset['habits']:,} habits / {dataset['logs']:,} logs in {time.perf_counter() - start:.1f}s")
+
+    results = {}
+    if args.only in (None, "micro"):
+        results.update(micro_benchmarks(args.samples))
+    if args.only in (None, "e2e"):
+        results.update(e2e_benchmarks(args.samples, args.seed))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "samples": args.samples,
+            "dataset": {k: v for k, v in dataset.items() if k != "now"},
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    print(f"{'benchmark':<40} | {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9}")
+    for name, result in results.items():
+        print(f"{name:<40} | {result['p50']:>9.3f} {result['p95']:>9.3f} {result['mean']:>9.3f}")
+    print(f"Wrote {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(baseline, report, args.threshold, args.min_delta_ms)
+        print_report(rows)
+        if any(row["status"] == "regression" for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import sys
+
+from app.core.config import settings
+from app.crud.prediction import compact_predictions
+from app.db.migrations import run_migrations
+from app.db.session import SessionLocal, engine
+
+# Roll prediction_logs rows older than the retention window into
+# prediction_daily_aggregates. The API also does this once a day in the background.
+# Usage: python compact_predictions.py [retain_days]
+
+
+def main():
+    retain_days = int(sys.argv[1]) if len(sys.argv) > 1 else settings.PREDICTION_RETENTION_DAYS
+    run_migrations(engine)
+
+    db = SessionLocal()
+    try:
+        compacted = compact_predictions(db, retain_days)
+        db.commit()
+        print(f"Compacted {compacted} predictions older than {retain_days} days.")
+    except Exception as e:
+        db.rollback()
+        print(f"Compaction failed: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
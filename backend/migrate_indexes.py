@@ -0,0 +1,23 @@
+from app.db.migrations import run_migrations
+from app.db.session import engine
+
+# Repeatable schema migration: creates missing tables, columns and indexes
+# (e.g. the habit_logs (habit_id, completed_at) index) on an existing database.
+
+
+def main():
+    print(f"Targeting Database at: {engine.url}")
+
+    try:
+        changes = run_migrations(engine)
+        if changes:
+            for change in changes:
+                print(f"Migration successful: Added {change}.")
+        else:
+            print("Database is already up to date.")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import time
+
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.crud.habit import rebuild_all_habit_stats
+
+# Backfill the habit_stats table from existing habit logs.
+# Safe to re-run: every row is recomputed from scratch.
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        processed = rebuild_all_habit_stats(db)
+        print(f"Rebuilt stats for {processed} habits in {time.perf_counter() - start:.2f}s.")
+    except Exception as e:
+        db.rollback()
+        print(f"Rebuild failed: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import sys
+import time
+
+from app.crud.habit import rebuild_all_habit_stats, recompute_all_streaks
+from app.db.migrations import run_migrations
+from app.db.session import SessionLocal, engine
+
+# Repair Habit.current_streak / longest_streak from the per-habit day bitmaps.
+# Pass --rebuild to first rebuild the bitmaps (and all stats) from the raw logs.
+
+
+def main():
+    run_migrations(engine)
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        if "--rebuild" in sys.argv:
+            processed = rebuild_all_habit_stats(db)
+            print(f"Rebuilt stats for {processed} habits in {time.perf_counter() - start:.2f}s.")
+        changed = recompute_all_streaks(db)
+        print(f"Recomputed streaks in {time.perf_counter() - start:.2f}s, {changed} habits corrected.")
+    except Exception as e:
+        db.rollback()
+        print(f"Recompute failed: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
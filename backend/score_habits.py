@@ -0,0 +1,42 @@
+import argparse
+from datetime import date
+
+from app.crud.scoring import run_scoring_job
+from app.db.migrations import run_migrations
+from app.db.session import SessionLocal, engine
+
+# Rescore every habit into the day's habit_score_snapshots (and refresh
+# Habit.success_probability). The API runs this after each UTC midnight; an
+# interrupted run resumes where it stopped.
+# Usage: python score_habits.py [--day YYYY-MM-DD] [--chunk-size N] [--workers N] [--force]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nightly habit scoring job")
+    parser.add_argument("--day", type=date.fromisoformat, default=None, help="snapshot day (default: today, UTC)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="habits per committed chunk")
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes (default SCORING_WORKERS)")
+    parser.add_argument("--force", action="store_true", help="rescore a day that already finished")
+    args = parser.parse_args()
+
+    run_migrations(engine)
+
+    db = SessionLocal()
+    try:
+        result = run_scoring_job(db, day=args.day, chunk_size=args.chunk_size,
+                                 workers=args.workers, force=args.force)
+        if result["skipped"]:
+            print(f"Scoring for {result['day']} already finished ({result['habits']} habits); use --force to rerun.")
+        else:
+            print(f"Scored {result['habits']} habits for {result['day']} in {result['seconds']:.2f}s "
+                  f"({result['habits_per_second']:,.0f} habits/s).")
+    except Exception as e:
+        db.rollback()
+        print(f"Scoring failed: {e}")
+    finally:
+        db.close()
+
+
+# Worker processes re-import this module; only the parent runs the job
+if __name__ == "__main__":
+    main()
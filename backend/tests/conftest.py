@@ -0,0 +1,36 @@
+import os
+import tempfile
+
+# Point the app at a throwaway database and keep Gemini offline before app modules are imported
+_db_dir = tempfile.mkdtemp(prefix="habitos-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/test.db"
+os.environ["GEMINI_API_KEY"] = ""
+# Tests run the scoring job explicitly
+os.environ["SCORING_SCHEDULER_ENABLED"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.cache import score_cache
+from app.db.base import Base
+from app.db.session import engine, SessionLocal
+from app.main import app
+
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    # Habit ids are reused across tests
+    score_cache.clear()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    with TestClient(app) as c:
+        yield c
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.crud.habit import rebuild_habit_stats
+from app.db.session import async_engine
+from app.models.habit import Habit, HabitLog
+
+
+def _seed(db, n_habits):
+    now = datetime.utcnow()
+    habits = [
+        Habit(user_id=1, title=f"habit-{i}", difficulty=1 + i % 5, created_at=now - timedelta(days=30))
+        for i in range(n_habits)
+    ]
+    db.add_all(habits)
+    db.flush()
+    for i, habit in enumerate(habits):
+        for d in range(i % 7):
+            db.add(HabitLog(habit_id=habit.id, completed_at=now - timedelta(days=d, hours=1)))
+    rebuild_habit_stats(db, [h.id for h in habits])
+    db.commit()
+    return habits
+
+
+def _count_statements(fn):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        result = fn()
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+    return result, len(statements)
+
+
+def test_batch_matches_single_insights(client, db):
+    habits = _seed(db, 6)
+    ids = [h.id for h in habits[:4]] + [9999]
+
+    response = client.get("/api/v1/habits/insights", params={"ids": ids})
+    assert response.status_code == 200
+    batch = response.json()
+    assert [i["habit_id"] for i in batch] == ids[:4]
+
+    ignore = {"as_of"}
+    for insight in batch:
+        single = client.get(f"/api/v1/habits/{insight['habit_id']}/insights").json()
+        assert {k: v for k, v in insight.items() if k not in ignore} == \
+            {k: v for k, v in single.items() if k not in ignore}
+
+    # Without ids every habit is returned
+    assert len(client.get("/api/v1/habits/insights").json()) == len(habits)
+
+
+def test_batch_insights_constant_queries(client, db):
+    small, large = _seed(db, 3), _seed(db, 40)
+    params = {"include_history": True}
+    _, small_count = _count_statements(
+        lambda: client.get("/api/v1/habits/insights", params={**params, "ids": [h.id for h in small]}))
+    response, large_count = _count_statements(
+        lambda: client.get("/api/v1/habits/insights", params={**params, "ids": [h.id for h in large]}))
+
+    assert len(response.json()) == 40
+    # Data version lookup, habits/stats join and one IN query for the history
+    assert small_count == large_count == 3
+
+    # History is not embedded by default, leaving the version lookup and the join
+    response, count = _count_statements(lambda: client.get("/api/v1/habits/insights"))
+    assert all(insight["history"] == [] for insight in response.json())
+    assert count == 2
+
+
+def test_history_limit_keeps_most_recent(client, db):
+    habit = _seed(db, 7)[6]
+    full = client.get(f"/api/v1/habits/{habit.id}/insights", params={"include_history": True}).json()["history"]
+    assert len(full) == 6
+    assert full == sorted(full)
+
+    capped = client.get("/api/v1/habits/insights", params={"ids": [habit.id], "include_history": True, "history_limit": 2}).json()
+    assert capped[0]["history"] == full[-2:]
+    assert client.get(f"/api/v1/habits/{habit.id}/insights", params={"include_history": True, "history_limit": 0}).json()["history"] == []
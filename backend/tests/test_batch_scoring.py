@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+from hypothesis import given, settings, strategies as st
+
+from app.engine.batch_scoring import FACTOR_NAMES, score_batch
+from app.engine.intelligence import (
+    calculate_success_probability_from_stats,
+    assess_failure_risk_from_stats,
+)
+from app.models.habit import Habit
+
+NOW = datetime(2025, 6, 15, 13, 45, 12, 345678)
+
+habit_rows = st.tuples(
+    st.integers(min_value=1, max_value=5),  # difficulty
+    st.integers(min_value=0, max_value=400),  # current_streak
+    st.timedeltas(min_value=timedelta(0), max_value=timedelta(days=2000)),  # age
+    st.integers(min_value=0, max_value=3000),  # total logs
+    st.one_of(st.none(), st.timedeltas(min_value=timedelta(days=-2), max_value=timedelta(days=2000))),  # since last
+)
+
+
+@settings(max_examples=300, deadline=None)
+@given(st.lists(habit_rows, min_size=1, max_size=50))
+def test_score_batch_matches_scalar(rows):
+    habits, totals, lasts = [], [], []
+    for difficulty, streak, age, total, since_last in rows:
+        habits.append(Habit(difficulty=difficulty, current_streak=streak, created_at=NOW - age))
+        totals.append(total)
+        lasts.append(None if since_last is None else NOW - since_last)
+
+    result = score_batch(
+        [h.difficulty for h in habits],
+        [h.current_streak for h in habits],
+        [h.created_at for h in habits],
+        totals,
+        lasts,
+        now=NOW,
+    )
+
+    for i, habit in enumerate(habits):
+        prob = calculate_success_probability_from_stats(habit, totals[i], now=NOW)
+        risk = assess_failure_risk_from_stats(habit, totals[i], lasts[i], now=NOW)
+
+        assert result["success_probability"][i] == prob
+        assert result["risk_score"][i] == risk["risk_score"]
+        assert result["risk_level"][i] == risk["risk_level"]
+        assert [f["factor"] for f in risk["factors"]] == list(FACTOR_NAMES)
+        assert list(result["factors"][i]) == [f["impact"] for f in risk["factors"]]
+
+
+def test_score_batch_empty():
+    result = score_batch([], [], [], [], [], now=NOW)
+    assert result["risk_score"].shape == (0,)
+    assert result["factors"].shape == (0, len(FACTOR_NAMES))
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from app.db.base import Base
+from app.db.session import engine
+from app.models.habit import Habit, HabitLog, HabitStats, PredictionLog
+from benchmarks.compare import compare
+from benchmarks.datagen import generate
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+
+def _logs(db):
+    return db.execute(select(HabitLog.habit_id, HabitLog.completed_at, HabitLog.mood_score).order_by(HabitLog.id)).all()
+
+
+def test_generator_is_exact_consistent_and_seeded(db):
+    counts = generate(engine, 2_000, habits_per_user=2, years=1, prediction_days=10, now=NOW)
+    assert db.scalar(select(func.count()).select_from(HabitLog)) == counts["logs"] == 2_000
+    assert db.scalar(select(func.count()).select_from(Habit)) == counts["habits"]
+    assert db.scalar(select(func.count()).select_from(PredictionLog)) == counts["predictions"]
+    assert counts["users"] == -(-counts["habits"] // 2)
+
+    # Stats and streaks are derived from the generated logs
+    assert db.scalar(select(func.sum(HabitStats.total_completions))) == 2_000
+    assert db.scalar(select(func.max(HabitLog.completed_at))) <= NOW.replace(hour=23, minute=59)
+    assert db.scalar(select(func.count()).select_from(Habit).where(Habit.longest_streak > 0)) == counts["habits"]
+
+    first = _logs(db)
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+    generate(engine, 2_000, habits_per_user=2, years=1, prediction_days=10, now=NOW)
+    assert _logs(db) == first
+
+
+def _run(**p50):
+    return {"results": {name: {"p50": value} for name, value in p50.items()}}
+
+
+def test_compare_flags_regressions_beyond_threshold_and_noise_floor():
+    rows = compare(
+        _run(slower=10.0, tiny=0.01, faster=10.0, steady=10.0, dropped=1.0),
+        _run(slower=13.0, tiny=0.03, faster=5.0, steady=11.0, added=1.0),
+        threshold=0.2, min_delta_ms=0.05,
+    )
+    assert {row["name"]: row["status"] for row in rows} == {
+        "slower": "regression",
+        "tiny": "ok",
+        "faster": "improvement",
+        "steady": "ok",
+        "dropped": "missing",
+        "added": "new",
+    }
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+from app.crud import habit as crud_habit
+from app.crud.habit import rebuild_habit_stats
+from app.models.habit import HabitLog, HabitStats
+
+
+def _record(habit_id, completed_at, **extra):
+    return {"habit_id": habit_id, "completed_at": completed_at.isoformat(), **extra}
+
+
+def test_bulk_log_dedupes_and_recomputes_streaks(client, db):
+    habit_id = client.post("/api/v1/habits/", json={"title": "Walk"}).json()["id"]
+    other_id = client.post("/api/v1/habits/", json={"title": "Read"}).json()["id"]
+    client.post(f"/api/v1/habits/{habit_id}/log", json={"habit_id": habit_id})
+
+    today = datetime.utcnow().replace(hour=6, minute=0, second=0, microsecond=0)
+    records = [
+        # 3 consecutive days ending yesterday, joining today's existing log into a 4-day run
+        _record(habit_id, today - timedelta(days=1), mood_score=3),
+        _record(habit_id, today - timedelta(days=2)),
+        _record(habit_id, today - timedelta(days=3)),
+        # Same day twice and the already-logged today
+        _record(habit_id, today - timedelta(days=3) + timedelta(hours=2)),
+        _record(habit_id, datetime.utcnow()),
+        # An older, separate 5-day run for the other habit
+        *[_record(other_id, today - timedelta(days=d)) for d in range(20, 15, -1)],
+    ]
+
+    response = client.post("/api/v1/habits/logs/bulk", json={"logs": records})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["inserted"] == 8
+    assert body["duplicates"] == 2
+
+    by_id = {h["id"]: h for h in body["habits"]}
+    assert by_id[habit_id]["current_streak"] == 4
+    assert by_id[habit_id]["longest_streak"] == 4
+    assert by_id[other_id]["current_streak"] == 5
+
+    db.expire_all()
+    assert db.query(HabitLog).filter(HabitLog.habit_id == habit_id).count() == 4
+    incremental = db.get(HabitStats, habit_id)
+    snapshot = {c.name: getattr(incremental, c.name) for c in HabitStats.__table__.columns if c.name != "updated_at"}
+    rebuilt = rebuild_habit_stats(db, [habit_id])[habit_id]
+    assert snapshot == {c.name: getattr(rebuilt, c.name) for c in HabitStats.__table__.columns if c.name != "updated_at"}
+
+    # Replaying the same batch is a no-op
+    replay = client.post("/api/v1/habits/logs/bulk", json={"logs": records}).json()
+    assert replay["inserted"] == 0
+
+
+def test_bulk_log_rejects_unknown_habits_and_future_dates(client, db):
+    habit_id = client.post("/api/v1/habits/", json={"title": "Walk"}).json()["id"]
+    now = datetime.utcnow()
+
+    response = client.post("/api/v1/habits/logs/bulk", json={"logs": [_record(habit_id + 99, now)]})
+    assert response.status_code == 404
+
+    response = client.post("/api/v1/habits/logs/bulk", json={"logs": [_record(habit_id, now + timedelta(days=2))]})
+    assert response.status_code == 422
+    assert db.query(HabitLog).count() == 0
+
+
+def test_bulk_log_batches_habit_ids(client, db, monkeypatch):
+    # Batches of 2 ids so 5 habits take several IN (...) lists per query
+    monkeypatch.setattr(crud_habit, "ID_BATCH", 2)
+    ids = [client.post("/api/v1/habits/", json={"title": f"habit-{i}"}).json()["id"] for i in range(5)]
+    today = datetime.utcnow().replace(hour=6, minute=0, second=0, microsecond=0)
+    records = [_record(habit_id, today - timedelta(days=d + 1)) for n, habit_id in enumerate(ids) for d in range(n + 1)]
+
+    response = client.post("/api/v1/habits/logs/bulk", json={"logs": records})
+    assert response.status_code == 200, response.text
+    assert response.json()["inserted"] == 15
+    assert [h["current_streak"] for h in response.json()["habits"]] == [1, 2, 3, 4, 5]
+    assert {s.habit_id: s.total_completions for s in db.query(HabitStats)} == dict(zip(ids, [1, 2, 3, 4, 5]))
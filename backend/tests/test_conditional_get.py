@@ -0,0 +1,112 @@
+from sqlalchemy import event, update
+
+from app.crud.habit import recompute_all_streaks
+from app.crud.prediction import prediction_writer
+from app.crud.scoring import get_snapshots, run_scoring_job
+from app.db.session import async_engine
+from app.models.habit import Habit
+
+BOB = {"X-User-Id": "2"}
+
+
+def _create(client, n, headers=None):
+    return [client.post("/api/v1/habits/", json={"title": f"h{i}"}, headers=headers).json()["id"] for i in range(n)]
+
+
+def test_keyset_pages_cover_every_habit_once(client):
+    ids = _create(client, 5)
+    _create(client, 2, BOB)
+
+    seen, params = [], {"limit": 2}
+    first_cursor = client.get("/api/v1/habits/", params=params).headers["X-Next-Cursor"]
+    while True:
+        response = client.get("/api/v1/habits/", params=params)
+        seen += [h["id"] for h in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params = {"limit": 2, "cursor": cursor}
+    assert seen == ids
+
+    # Offset paging still works for older clients
+    assert [h["id"] for h in client.get("/api/v1/habits/", params={"skip": 3}).json()] == ids[3:]
+    assert client.get("/api/v1/habits/", params={"cursor": "bm9wZQ=="}).status_code == 422
+    assert client.get("/api/v1/habits/", params={"cursor": first_cursor, "skip": 1}).status_code == 422
+
+
+def test_listing_revalidates_until_the_users_data_changes(client):
+    habit_id = _create(client, 1)[0]
+    first = client.get("/api/v1/habits/")
+    etag = first.headers["ETag"]
+    assert not etag.startswith("W/")
+
+    cached = client.get("/api/v1/habits/", headers={"If-None-Match": etag})
+    assert (cached.status_code, cached.content, cached.headers["ETag"]) == (304, b"", etag)
+    # Other query parameters are a different representation
+    assert client.get("/api/v1/habits/", params={"limit": 1}, headers={"If-None-Match": etag}).status_code == 200
+
+    # Another user's writes don't invalidate it; this user's writes do
+    _create(client, 1, BOB)
+    assert client.get("/api/v1/habits/", headers={"If-None-Match": etag}).status_code == 304
+    client.post(f"/api/v1/habits/{habit_id}/log", json={"habit_id": habit_id})
+    fresh = client.get("/api/v1/habits/", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.headers["ETag"] != etag
+    assert fresh.json()[0]["current_streak"] == 1
+
+
+def test_summary_and_insights_answer_304_without_scoring(client):
+    habit_id = _create(client, 2)[0]
+    paths = ["/api/v1/habits/dashboard/summary", "/api/v1/habits/insights", f"/api/v1/habits/{habit_id}/insights"]
+    etags = {path: client.get(path).headers["ETag"] for path in paths}
+    assert all(etag.startswith("W/") for etag in etags.values())
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        assert client.get(paths[0], headers={"If-None-Match": etags[paths[0]]}).status_code == 304
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+    # Just the data version lookup
+    assert len(statements) == 1
+
+    for path, etag in etags.items():
+        assert client.get(path, headers={"If-None-Match": f'"other", {etag}'}).status_code == 304
+    client.post(f"/api/v1/habits/{habit_id}/log", json={"habit_id": habit_id})
+    for path, etag in etags.items():
+        assert client.get(path, headers={"If-None-Match": etag}).status_code == 200, path
+
+
+def test_background_probability_updates_invalidate_the_listing(client, db):
+    habit_id = _create(client, 1)[0]
+    etag = client.get("/api/v1/habits/").headers["ETag"]
+
+    # Write-behind probability from reading insights replaces the initial guess
+    client.get(f"/api/v1/habits/{habit_id}/insights")
+    client.portal.call(prediction_writer.flush)
+    etag_after_flush = client.get("/api/v1/habits/").headers["ETag"]
+    assert etag_after_flush != etag
+
+    # Nightly rescoring that changes a probability
+    db.execute(update(Habit).values(success_probability=0.01))
+    db.commit()
+    run_scoring_job(db, report=lambda message: None)
+    assert client.get("/api/v1/habits/", headers={"If-None-Match": etag_after_flush}).status_code == 200
+
+
+def test_streak_repairs_invalidate_the_listing(client, db):
+    habit_id = _create(client, 1)[0]
+    client.post(f"/api/v1/habits/{habit_id}/log", json={"habit_id": habit_id})
+    # A drifted streak, as recompute_streaks.py exists to repair
+    db.execute(update(Habit).where(Habit.id == habit_id).values(current_streak=7))
+    db.commit()
+    run_scoring_job(db, report=lambda message: None)
+
+    stale = client.get("/api/v1/habits/")
+    assert stale.json()[0]["current_streak"] == 7
+    assert recompute_all_streaks(db) == 1
+
+    fresh = client.get("/api/v1/habits/", headers={"If-None-Match": stale.headers["ETag"]})
+    assert fresh.status_code == 200
+    assert fresh.json()[0]["current_streak"] == 1
+    assert get_snapshots(db, [habit_id]) == {}
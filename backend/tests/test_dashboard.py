@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func, select
+
+from app.core.cache import score_cache
+from app.db.migrations import run_migrations
+from app.db.session import async_engine, engine
+from app.engine.intelligence import calculate_success_probability, assess_failure_risk
+from app.models.habit import Habit, HabitLog, HabitStats
+
+
+def _seed(db):
+    now = datetime.utcnow()
+    habits = [
+        Habit(user_id=1, title="Read", difficulty=2, current_streak=3, created_at=now - timedelta(days=20)),
+        Habit(user_id=1, title="Run", difficulty=5, current_streak=0, created_at=now - timedelta(days=9)),
+        Habit(user_id=1, title="Fresh", difficulty=1, current_streak=0, created_at=now),
+    ]
+    db.add_all(habits)
+    db.flush()
+    for i in range(12):
+        db.add(HabitLog(habit_id=habits[0].id, completed_at=now - timedelta(days=i * 1.5)))
+    db.add(HabitLog(habit_id=habits[1].id, completed_at=now - timedelta(days=6)))
+    db.commit()
+    return habits
+
+
+def _legacy_summary(db):
+    habits = db.query(Habit).all()
+    at_risk = []
+    total_prob = 0.0
+    for habit in habits:
+        logs = db.query(HabitLog).filter(HabitLog.habit_id == habit.id).all()
+        success_prob = calculate_success_probability(habit, logs)
+        risk = assess_failure_risk(habit, logs)
+        total_prob += success_prob
+        if risk["risk_level"] != "low":
+            at_risk.append({
+                "id": habit.id,
+                "title": habit.title,
+                "success_probability": success_prob,
+                "risk_level": risk["risk_level"],
+                "recommendation": risk["recommendation"],
+            })
+    return {
+        "total_habits": len(habits),
+        "avg_success_probability": total_prob / len(habits) if habits else 0.0,
+        "active_streaks": sum(1 for h in habits if h.current_streak > 0),
+        "at_risk": sorted(at_risk, key=lambda h: h["success_probability"])[:5],
+    }
+
+
+def test_dashboard_summary_matches_per_habit_path(client, db):
+    _seed(db)
+    expected = _legacy_summary(db)
+
+    # Reads don't write: without stats rows the habits score as never completed
+    assert client.get("/api/v1/habits/dashboard/summary").json()["total_habits"] == 3
+    assert db.scalar(select(func.count()).select_from(HabitStats)) == 0
+
+    # The startup migration backfills them, before anything is cached
+    run_migrations(engine)
+    score_cache.clear()
+    assert client.get("/api/v1/habits/dashboard/summary").json() == expected
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        response = client.get("/api/v1/habits/dashboard/summary")
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+
+    assert response.status_code == 200
+    assert response.json() == expected
+    # The data version lookup and a single habits/stats join, independent of the habit and log counts
+    assert len(statements) == 2
@@ -0,0 +1,67 @@
+from datetime import date, datetime, timedelta
+
+from hypothesis import given, settings, strategies as st
+
+from app.crud.habit import get_habit_stats, recompute_all_streaks, rebuild_habit_stats
+from app.engine.day_bitmap import DayBitmap
+from app.models.habit import Habit, HabitLog
+
+ORIGIN = date(2024, 1, 1)
+day_sets = st.sets(st.integers(min_value=0, max_value=800), max_size=200).map(
+    lambda offsets: sorted(ORIGIN + timedelta(days=o) for o in offsets)
+)
+
+
+def walk_streaks(days):
+    """(current, longest) by walking sorted days: the run ending at the last one, the longest run."""
+    current = longest = 0
+    for i, day in enumerate(days):
+        current = current + 1 if i and (day - days[i - 1]).days == 1 else 1
+        longest = max(longest, current)
+    return current, longest
+
+
+@settings(max_examples=200, deadline=None)
+@given(day_sets, st.integers(min_value=0, max_value=900), st.integers(min_value=1, max_value=60))
+def test_bitmap_matches_day_list(days, end_offset, window):
+    # Built out of order to exercise re-basing on earlier days
+    bitmap = DayBitmap.from_days(reversed(days))
+    restored = DayBitmap.from_bytes(bitmap.start, bitmap.to_bytes())
+
+    assert list(restored) == days
+    assert len(restored) == len(days)
+    assert (restored.current_streak(), restored.longest_streak()) == walk_streaks(days)
+
+    end = ORIGIN + timedelta(days=end_offset)
+    assert restored.window_count(end, window) == sum(1 for d in days if 0 <= (end - d).days < window)
+
+    histogram = [0] * 7
+    for d in days:
+        histogram[d.weekday()] += 1
+    assert restored.weekday_histogram() == histogram
+
+
+def test_current_streak_breaks_after_a_missed_day():
+    bitmap = DayBitmap.from_days([ORIGIN, ORIGIN + timedelta(days=1)])
+    assert bitmap.current_streak(today=ORIGIN + timedelta(days=2)) == 2
+    assert bitmap.current_streak(today=ORIGIN + timedelta(days=3)) == 0
+    # A year of daily completions fits in 46 bytes
+    assert len(DayBitmap.from_days(ORIGIN + timedelta(days=i) for i in range(365)).to_bytes()) == 46
+
+
+def test_recompute_all_streaks_repairs_drift(db):
+    now = datetime.utcnow()
+    habit = Habit(user_id=1, title="Walk", current_streak=9, longest_streak=9, created_at=now - timedelta(days=30))
+    db.add(habit)
+    db.flush()
+    # A gap two days ago: current run is 2, the earlier run is 3
+    db.add_all(HabitLog(habit_id=habit.id, completed_at=now - timedelta(days=d)) for d in (0, 1, 3, 4, 5))
+    db.flush()
+    rebuild_habit_stats(db, [habit.id])
+    db.commit()
+
+    assert recompute_all_streaks(db, chunk_size=1) == 1
+    db.refresh(habit)
+    assert (habit.current_streak, habit.longest_streak) == (2, 3)
+    assert get_habit_stats(db, habit.id).completion_bitmap is not None
+    assert recompute_all_streaks(db) == 0
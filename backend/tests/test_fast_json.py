@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.api.api_v1.endpoints import habits as habits_endpoints
+from app.core.config import settings
+from app.schemas import schemas
+
+NOW = datetime.utcnow().replace(microsecond=123400)
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def utcnow(cls):
+        return NOW
+
+
+@pytest.fixture
+def seeded(client, monkeypatch):
+    # as_of is stamped per response; freeze it so both paths can be compared byte for byte
+    monkeypatch.setattr(habits_endpoints, "datetime", FrozenDatetime)
+    ids = [
+        client.post("/api/v1/habits/", json=body).json()["id"]
+        for body in [
+            {"title": "Méditer ☀", "difficulty": 4},
+            {"title": "Read", "description": 'Say "hi"\n', "frequency": "weekly"},
+            {"title": "Run"},
+        ]
+    ]
+    logs = [
+        {"habit_id": ids[0], "completed_at": (NOW - timedelta(days=d)).replace(microsecond=500 * d).isoformat()}
+        for d in range(1, 6)
+    ] + [{"habit_id": ids[1], "completed_at": (NOW - timedelta(days=12)).replace(microsecond=0).isoformat()}]
+    client.post("/api/v1/habits/logs/bulk", json={"logs": logs})
+    return ids
+
+
+def _paths(ids):
+    return [
+        "/api/v1/habits/",
+        "/api/v1/habits/?limit=2",
+        "/api/v1/habits/insights?include_history=true",
+        f"/api/v1/habits/{ids[0]}/insights?include_history=true&history_limit=3",
+        "/api/v1/habits/dashboard/summary",
+    ]
+
+
+def test_fast_path_is_byte_compatible_with_response_model_output(client, seeded, monkeypatch):
+    for path in _paths(seeded):
+        client.get(path)  # scores and caches once
+        fast = client.get(path)
+        monkeypatch.setattr(settings, "FAST_JSON_ENABLED", False)
+        validated = client.get(path)
+        monkeypatch.setattr(settings, "FAST_JSON_ENABLED", True)
+
+        assert fast.content == validated.content, path
+        assert fast.headers["content-type"] == validated.headers["content-type"] == "application/json"
+        for header in ["ETag", "Cache-Control", "X-Next-Cursor"]:
+            assert fast.headers.get(header) == validated.headers.get(header), (path, header)
+    assert "X-Next-Cursor" in client.get("/api/v1/habits/?limit=2").headers
+
+
+def test_fast_path_output_round_trips_through_the_schemas(client, seeded):
+    for path, schema in zip(_paths(seeded), [
+        List[schemas.Habit],
+        List[schemas.Habit],
+        List[schemas.HabitInsight],
+        schemas.HabitInsight,
+        schemas.DashboardSummary,
+    ]):
+        adapter = TypeAdapter(schema)
+        content = client.get(path).content
+        assert adapter.dump_json(adapter.validate_json(content)) == content, path
+
+    insights = client.get(_paths(seeded)[2]).json()
+    assert insights[0]["as_of"] == NOW.isoformat()
+    assert len(insights[0]["history"]) == 5
@@ -0,0 +1,93 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.engine import gemini
+from app.engine.gemini import GeminiClient
+
+
+class FakeGenAI:
+    """Stands in for google.generativeai: per-model probe latency and failures."""
+
+    def __init__(self, probes):
+        self.probes = probes  # model name -> (delay seconds, error or None)
+        self.list_calls = 0
+
+    def configure(self, api_key):
+        pass
+
+    def list_models(self):
+        self.list_calls += 1
+        return [SimpleNamespace(name=name, supported_generation_methods=["generateContent"]) for name in self.probes]
+
+    def GenerativeModel(self, name):
+        delay, error = self.probes[name]
+
+        async def generate_content_async(prompt, generation_config=None):
+            await asyncio.sleep(delay)
+            if error:
+                raise error
+            return SimpleNamespace(text="Hi")
+
+        return SimpleNamespace(name=name, generate_content_async=generate_content_async)
+
+
+@pytest.fixture
+def fake_genai(monkeypatch, tmp_path):
+    fake = FakeGenAI({
+        "models/gemini-1.5-flash": (0.3, RuntimeError("429 quota exceeded")),
+        "models/gemini-1.5-pro": (0.2, None),
+        "models/gemini-pro": (5.0, None),  # hangs past the probe timeout
+        "models/text-bison": (0.1, None),
+    })
+    monkeypatch.setattr(gemini, "genai", fake)
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "GEMINI_PROBE_TIMEOUT_SECONDS", 0.5)
+    monkeypatch.setattr(settings, "GEMINI_MODEL_CACHE_PATH", str(tmp_path / "model.json"))
+    return fake
+
+
+def test_probes_run_concurrently_and_pick_best_working_model(fake_genai):
+    client = GeminiClient()
+    assert client.model is None  # nothing happens at construction
+
+    async def select():
+        return await asyncio.gather(*(client.ensure_model() for _ in range(3)))
+
+    start = time.perf_counter()
+    models = asyncio.run(select())
+    elapsed = time.perf_counter() - start
+
+    assert client.model_name == "models/gemini-1.5-pro"
+    assert all(m is client.model for m in models)
+    assert fake_genai.list_calls == 1
+    # Bounded by the probe timeout, not the sum of the probe latencies
+    assert elapsed < 1.0
+
+
+def test_cached_model_selection_skips_probing(fake_genai, monkeypatch):
+    asyncio.run(GeminiClient().ensure_model())
+
+    restarted = GeminiClient()
+    asyncio.run(restarted.ensure_model())
+    assert restarted.model_name == "models/gemini-1.5-pro"
+    assert fake_genai.list_calls == 1
+
+    # An expired cache entry triggers a fresh selection
+    monkeypatch.setattr(settings, "GEMINI_MODEL_CACHE_TTL_SECONDS", 0)
+    asyncio.run(GeminiClient().ensure_model())
+    assert fake_genai.list_calls == 2
+
+
+def test_no_working_model_disables_ai(fake_genai):
+    for name in fake_genai.probes:
+        fake_genai.probes[name] = (0.0, RuntimeError("403"))
+    client = GeminiClient()
+
+    assert asyncio.run(client.ensure_model()) is None
+    assert asyncio.run(client.generate_action_plan("User", "- Walk", "Health")) == "AI unavailable (No working model found)."
+    # Failed selection is not retried on every request
+    assert fake_genai.list_calls == 1
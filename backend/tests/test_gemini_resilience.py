@@ -0,0 +1,162 @@
+import asyncio
+import time
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from app.core.config import settings
+from app.engine.gemini import CircuitBreaker, PLAN_FALLBACK, UpstreamUnavailable, gemini_client
+
+
+class FlakyModel:
+    """Fake genai.GenerativeModel with injectable latency and a queue of failures."""
+
+    def __init__(self, latency=0.0, failures=()):
+        self.latency = latency
+        self.failures = list(failures)
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+
+    async def generate_content_async(self, prompt, stream=False):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.failures:
+                raise self.failures.pop(0)
+        finally:
+            self.active -= 1
+        return type("Response", (), {"text": f"ok #{self.calls}"})()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(gemini_client, "breaker", CircuitBreaker(3, 30, clock=clock))
+    monkeypatch.setattr(gemini_client, "model_name", "models/fake-flash")
+    monkeypatch.setattr(settings, "GEMINI_RETRY_BASE_SECONDS", 0.01)
+    return clock
+
+
+def _use(monkeypatch, model):
+    monkeypatch.setattr(gemini_client, "model", model)
+    return model
+
+
+def test_concurrent_generations_are_capped(monkeypatch, clock):
+    monkeypatch.setattr(settings, "GEMINI_MAX_CONCURRENCY", 2)
+    model = _use(monkeypatch, FlakyModel(latency=0.02))
+
+    async def burst():
+        return await asyncio.gather(*(gemini_client._generate(f"prompt {i}") for i in range(6)))
+
+    assert len(asyncio.run(burst())) == 6
+    assert model.peak == 2
+    assert gemini_client.stats()["in_flight"] == 0
+
+
+def test_retryable_errors_are_retried(monkeypatch, clock):
+    model = _use(monkeypatch, FlakyModel(failures=[
+        google_exceptions.ServiceUnavailable("overloaded"),
+        google_exceptions.TooManyRequests("slow down"),
+    ]))
+
+    assert asyncio.run(gemini_client._generate("prompt")) == "ok #3"
+    assert model.calls == 3
+    assert gemini_client.breaker.state == "closed"
+
+
+def test_bad_requests_are_not_retried(monkeypatch, clock):
+    model = _use(monkeypatch, FlakyModel(failures=[google_exceptions.InvalidArgument("bad prompt")]))
+
+    with pytest.raises(google_exceptions.InvalidArgument):
+        asyncio.run(gemini_client._generate("prompt"))
+    assert model.calls == 1
+    assert gemini_client.breaker.failures == 0
+
+
+def test_deadline_covers_the_whole_call(db, monkeypatch, clock):
+    monkeypatch.setattr(settings, "GEMINI_DEADLINE_SECONDS", 0.1)
+    _use(monkeypatch, FlakyModel(latency=5))
+
+    start = time.perf_counter()
+    plan = asyncio.run(gemini_client.generate_action_plan("User", "- Walk", "Health"))
+    assert plan == PLAN_FALLBACK
+    assert time.perf_counter() - start < 1
+
+
+def test_open_breaker_serves_fallback_without_calling_upstream(db, monkeypatch, clock):
+    monkeypatch.setattr(settings, "GEMINI_MAX_RETRIES", 0)
+    model = _use(monkeypatch, FlakyModel(failures=[google_exceptions.ServiceUnavailable("down")] * 3))
+
+    for i in range(3):
+        with pytest.raises(google_exceptions.ServiceUnavailable):
+            asyncio.run(gemini_client._generate(f"prompt {i}"))
+    assert gemini_client.breaker.state == "open"
+
+    with pytest.raises(UpstreamUnavailable):
+        asyncio.run(gemini_client._generate("prompt"))
+
+    async def stream():
+        return [text async for text in gemini_client.stream_action_plan("User", "- Walk", "Health")]
+
+    assert asyncio.run(gemini_client.generate_action_plan("User", "- Walk", "Health")) == PLAN_FALLBACK
+    assert asyncio.run(stream()) == [PLAN_FALLBACK]
+    assert model.calls == 3
+
+    # After the reset window one trial call goes through and closes the breaker
+    clock.now += 30
+    assert asyncio.run(gemini_client._generate("prompt")) == "ok #4"
+    assert gemini_client.breaker.state == "closed"
+
+
+def test_open_breaker_fails_fast_while_slots_are_busy(db, monkeypatch, clock):
+    monkeypatch.setattr(settings, "GEMINI_MAX_CONCURRENCY", 1)
+    model = _use(monkeypatch, FlakyModel(latency=0.5))
+
+    async def behind_a_slow_call():
+        slow = asyncio.create_task(gemini_client._generate("slow"))
+        await asyncio.sleep(0.05)
+        # The breaker opens while the only slot is taken
+        for _ in range(3):
+            gemini_client.breaker.record_failure()
+        start = time.perf_counter()
+        with pytest.raises(UpstreamUnavailable):
+            await gemini_client._generate("prompt")
+        stream = [text async for text in gemini_client.stream_action_plan("User", "- Walk", "Health")]
+        waited = time.perf_counter() - start
+        slow.cancel()
+        return stream, waited
+
+    stream, waited = asyncio.run(behind_a_slow_call())
+    assert stream == [PLAN_FALLBACK]
+    # Neither call queued for the slot
+    assert waited < 0.1
+    assert model.calls == 1
+
+
+def test_failed_trial_reopens_the_breaker():
+    clock = Clock()
+    breaker = CircuitBreaker(2, 10, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    # Only one trial at a time
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.rejected == 2
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from app.crud.habit import get_habit_stats, rebuild_habit_stats, record_log
+from app.models.habit import Habit, HabitLog, HabitStats
+
+
+def _columns(stats):
+    return {c.name: getattr(stats, c.name) for c in HabitStats.__table__.columns if c.name != "updated_at"}
+
+
+def test_record_log_matches_rebuild(db):
+    now = datetime.utcnow()
+    habit = Habit(user_id=1, title="Stretch", created_at=now - timedelta(days=60))
+    db.add(habit)
+    db.commit()
+
+    stats = get_habit_stats(db, habit.id)
+    # Chronological inserts, plus one backfilled completion inside the 30-day window
+    offsets = [45, 20, 9, 6, 3, 1, 0, 12]
+    for i, days_ago in enumerate(offsets):
+        log = HabitLog(
+            habit_id=habit.id,
+            completed_at=now - timedelta(days=days_ago),
+            mood_score=i % 5,
+            difficulty_rating=None if i % 2 else 3,
+        )
+        db.add(log)
+        record_log(db, stats, log)
+        db.commit()
+
+    incremental = _columns(stats)
+    assert incremental["total_completions"] == len(offsets)
+    assert incremental["completions_7d"] == 4
+    assert incremental["completions_30d"] == 7
+    assert incremental["mood_score_count"] == len(offsets)
+    assert incremental["difficulty_rating_count"] == 4
+
+    rebuilt = rebuild_habit_stats(db, [habit.id])[habit.id]
+    assert _columns(rebuilt) == incremental
+
+
+def test_log_endpoint_maintains_stats(client, db):
+    habit_id = client.post("/api/v1/habits/", json={"title": "Journal"}).json()["id"]
+    assert db.get(HabitStats, habit_id).total_completions == 0
+
+    response = client.post(f"/api/v1/habits/{habit_id}/log", json={"habit_id": habit_id, "mood_score": 4})
+    assert response.status_code == 200
+    # Second log on the same day is idempotent and must not double count
+    client.post(f"/api/v1/habits/{habit_id}/log", json={"habit_id": habit_id})
+
+    db.expire_all()
+    stats = db.get(HabitStats, habit_id)
+    assert stats.total_completions == 1
+    assert stats.completions_7d == 1
+    assert stats.mood_score_sum == 4
+    assert db.get(Habit, habit_id).current_streak == 1
@@ -0,0 +1,67 @@
+from datetime import date, datetime, timedelta
+
+from app.engine.history import decode_bitmap, encode_bitmap, encode_runs
+from app.models.habit import Habit, HabitLog
+
+
+def test_day_encodings_roundtrip():
+    start = date(2025, 1, 1)
+    days = [start, start + timedelta(days=1), start + timedelta(days=2), start + timedelta(days=9)]
+
+    assert decode_bitmap(encode_bitmap(days, start, start + timedelta(days=20)), start) == days
+    # Days outside the window are dropped
+    assert decode_bitmap(encode_bitmap(days, start + timedelta(days=5), start + timedelta(days=9)),
+                         start + timedelta(days=5)) == days[-1:]
+    assert encode_runs(days + days[-1:]) == [(start, 3), (start + timedelta(days=9), 1)]
+
+
+def _seed(db):
+    today = datetime.utcnow().replace(hour=6, minute=0, second=0, microsecond=0)
+    habit = Habit(user_id=1, title="Read", created_at=today - timedelta(days=100))
+    db.add(habit)
+    db.flush()
+    offsets = [0, 1, 2, 5, 5, 40, 90]
+    db.add_all(HabitLog(habit_id=habit.id, completed_at=today - timedelta(days=d, minutes=i))
+               for i, d in enumerate(offsets))
+    db.commit()
+    return habit, today.date()
+
+
+def test_keyset_pagination_walks_all_completions(client, db):
+    habit, _ = _seed(db)
+    url = f"/api/v1/habits/{habit.id}/history"
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = client.get(url, params=params).json()
+        seen += page["completions"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    expected = sorted(l.completed_at.isoformat() for l in db.query(HabitLog).filter(HabitLog.habit_id == habit.id))
+    assert seen == expected
+    assert client.get(url, params={"cursor": "not-a-cursor"}).status_code == 422
+
+
+def test_windowed_day_encodings(client, db):
+    habit, today = _seed(db)
+    start = today - timedelta(days=6)
+    params = {"from": start.isoformat(), "to": today.isoformat()}
+
+    rle = client.get(f"/api/v1/habits/{habit.id}/history", params={**params, "encoding": "rle"}).json()
+    assert rle["runs"] == [
+        {"start": (today - timedelta(days=5)).isoformat(), "days": 1},
+        {"start": (today - timedelta(days=2)).isoformat(), "days": 3},
+    ]
+
+    batch = client.get("/api/v1/habits/history", params={**params, "encoding": "bitmap", "ids": [habit.id]}).json()
+    assert decode_bitmap(batch[0]["bitmap"], start) == [today - timedelta(days=d) for d in (5, 2, 1, 0)]
+
+    # Default window is the last 30 days
+    default = client.get(f"/api/v1/habits/{habit.id}/history", params={"encoding": "rle"}).json()
+    assert default["start_date"] == (today - timedelta(days=29)).isoformat()
+
+    assert client.get(f"/api/v1/habits/{habit.id}/history",
+                      params={"from": today.isoformat(), "to": start.isoformat(), "encoding": "rle"}).status_code == 422
@@ -0,0 +1,105 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.engine.gemini import gemini_client
+from app.engine.local_assistant import local_briefing, local_plan
+from app.models.habit import Habit, HabitStats
+
+NOW = datetime(2026, 3, 10, 12, 0)
+
+
+def _row(habit_id, title, difficulty=1, streak=0, completions=0, last=None, age_days=30):
+    habit = Habit(id=habit_id, title=title, difficulty=difficulty, current_streak=streak,
+                  created_at=NOW - timedelta(days=age_days))
+    stats = HabitStats(habit_id=habit_id, total_completions=completions, last_completed_at=last)
+    return habit, stats
+
+
+ROWS = [
+    _row(1, "Read", streak=12, completions=28, last=NOW - timedelta(days=1, hours=3)),
+    _row(2, "Gym", difficulty=4, completions=3, last=NOW - timedelta(days=6)),
+    _row(3, "Journal", difficulty=2, streak=2, completions=15, last=NOW - timedelta(hours=2)),
+]
+
+
+def test_briefing_names_weakest_habit_streak_and_time_block():
+    briefing = local_briefing("Sam", ROWS, recent_completions=4, now=NOW)
+
+    assert "**Focus today:** Gym is your weakest habit (high risk" in briefing
+    # Read's 12-day streak was last extended yesterday; Journal is already done today
+    assert "**Streak at risk:** Read - keep your 12-day streak alive today." in briefing
+    # Gym was last done at noon and is high risk: two hours earlier, micro-version length
+    assert "**Time block:** 10:00 AM - 10:10 AM for Gym." in briefing
+    assert local_briefing("Sam", list(reversed(ROWS)), recent_completions=4, now=NOW) == briefing
+
+
+def test_broken_streak_is_not_at_risk():
+    # The stored streak is stale: the last completion was 10 days ago
+    rows = [_row(1, "Read", streak=5, completions=20, last=NOW - timedelta(days=10)), ROWS[2]]
+    assert "Streak at risk" not in local_briefing("Sam", rows, recent_completions=1, now=NOW)
+
+
+def test_plan_schedules_riskiest_habits_first():
+    assert local_plan(ROWS, now=NOW).splitlines() == [
+        "- **07:00 AM**: Gym (10 min, high risk)",
+        "- **12:30 PM**: Lunch break",
+        "- **05:00 PM**: Journal (20 min, low risk)",
+        "- **05:35 PM**: Read (15 min, low risk)",
+    ]
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, stream=False):
+        self.calls += 1
+        return type("Response", (), {"text": "from gemini"})()
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = CountingModel()
+    monkeypatch.setattr(gemini_client, "model", model)
+    monkeypatch.setattr(gemini_client, "model_name", "models/fake-flash")
+    monkeypatch.setattr(gemini_client, "latency_ewma", None)
+    monkeypatch.setattr(gemini_client, "in_flight", 0)
+    return model
+
+
+def test_no_model_serves_the_local_tier(client):
+    client.post("/api/v1/habits/", json={"title": "Read"})
+
+    res = client.get("/api/v1/assistant/daily-briefing")
+    assert res.headers["X-Assistant-Tier"] == "local"
+    assert "**Focus today:** Read" in res.json()["briefing"]
+
+
+def test_tier_policy(client, model, monkeypatch):
+    client.post("/api/v1/habits/", json={"title": "Read"})
+
+    res = client.get("/api/v1/assistant/plan")
+    assert (res.headers["X-Assistant-Tier"], res.json()["plan"]) == ("gemini", "from gemini")
+
+    # Cheap requests opt into the local engine explicitly
+    res = client.get("/api/v1/assistant/plan", params={"tier": "local"})
+    assert res.headers["X-Assistant-Tier"] == "local"
+    assert model.calls == 1
+
+    def choose():
+        return asyncio.run(gemini_client.choose_tier())
+
+    monkeypatch.setattr(gemini_client, "latency_ewma", settings.ASSISTANT_LATENCY_BUDGET_SECONDS + 1)
+    assert choose() == "local"
+    assert asyncio.run(gemini_client.choose_tier("gemini")) == "gemini"
+
+    monkeypatch.setattr(gemini_client, "latency_ewma", 0.1)
+    monkeypatch.setattr(gemini_client, "in_flight", settings.GEMINI_MAX_CONCURRENCY)
+    assert choose() == "local"
+
+    monkeypatch.setattr(gemini_client, "in_flight", 0)
+    monkeypatch.setattr(settings, "ASSISTANT_TIER", "local")
+    assert choose() == "local"
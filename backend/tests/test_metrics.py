@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, metrics
+from app.engine.gemini import CircuitBreaker, gemini_client
+from app.main import app
+from tests.test_gemini_resilience import FlakyModel
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.clear()
+    yield
+    metrics.clear()
+
+
+def _series(histogram):
+    return {labels: (total, count) for labels, (_, total, count) in histogram._series.items()}
+
+
+def test_requests_are_labelled_by_route_template(client):
+    ids = [client.post("/api/v1/habits/", json={"title": f"h{i}"}).json()["id"] for i in range(2)]
+    for habit_id in ids:
+        client.get(f"/api/v1/habits/{habit_id}/insights")
+    client.get("/api/v1/habits/999/insights")
+    client.get("/no/such/path")
+
+    latency = _series(metrics.request_latency)
+    assert latency[("GET", "/api/v1/habits/{habit_id}/insights", "200")][1] == 2
+    assert latency[("GET", "/api/v1/habits/{habit_id}/insights", "404")][1] == 1
+    assert latency[("GET", "unmatched", "404")][1] == 1
+
+
+def test_queries_and_rows_are_counted_per_request(client):
+    for i in range(3):
+        client.post("/api/v1/habits/", json={"title": f"h{i}"})
+    metrics.clear()
+
+    client.get("/api/v1/habits/")
+    queries, requests = _series(metrics.request_queries)[("/api/v1/habits/",)]
+    rows, _ = _series(metrics.request_rows)[("/api/v1/habits/",)]
+    assert requests == 1
+    assert queries >= 1
+    assert rows >= 3
+
+
+def test_server_timing_header(client, monkeypatch):
+    middleware = next(m for m in app.user_middleware if m.cls is MetricsMiddleware)
+    monkeypatch.setitem(middleware.kwargs, "server_timing", True)
+    monkeypatch.setattr(app, "middleware_stack", None)
+
+    header = client.get("/api/v1/habits/").headers["server-timing"]
+    assert header.startswith("app;dur=")
+    assert "db;dur=" in header and "llm;dur=" in header
+
+
+def test_disabled_metrics_record_nothing(client, monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", False)
+    client.get("/api/v1/habits/")
+    assert not metrics.request_latency._series
+
+
+def test_llm_latency_by_outcome(monkeypatch):
+    monkeypatch.setattr(gemini_client, "breaker", CircuitBreaker(3, 30))
+    monkeypatch.setattr(gemini_client, "model", FlakyModel(failures=[google_exceptions.ServiceUnavailable("down")]))
+    monkeypatch.setattr(settings, "GEMINI_RETRY_BASE_SECONDS", 0.01)
+
+    asyncio.run(gemini_client._generate("prompt"))
+    assert {labels: count for labels, (_, count) in _series(metrics.llm_latency).items()} == {
+        ("error",): 1, ("ok",): 1,
+    }
+
+
+def test_prometheus_exposition(client):
+    client.get("/")
+    text = client.get("/metrics").text
+
+    assert '# TYPE habitos_http_request_duration_seconds histogram' in text
+    assert 'habitos_http_request_duration_seconds_count{method="GET",route="/",status="200"} 1' in text
+    assert 'le="+Inf"' in text
+    assert "habitos_score_cache_hits " in text
+    assert 'habitos_gemini_upstream_state{value="closed"} 1' in text
@@ -0,0 +1,113 @@
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, func, select, text
+
+from app.crud import prediction
+from app.crud.prediction import compact_predictions, prediction_writer
+from app.db.base import Base
+from app.db.migrations import run_migrations
+from app.models.habit import Habit, PredictionDailyAggregate, PredictionLog
+
+
+def _create_habit(client):
+    return client.post("/api/v1/habits/", json={"title": "Read", "difficulty": 2}).json()["id"]
+
+
+def test_insights_get_does_not_write(client, db):
+    habit_id = _create_habit(client)
+    for _ in range(3):
+        assert client.get(f"/api/v1/habits/{habit_id}/insights").status_code == 200
+    assert db.scalar(select(func.count(PredictionLog.id))) == 0
+    assert prediction_writer.pending > 0
+
+
+def test_flush_keeps_one_prediction_per_habit_per_day(client, db):
+    habit_id = _create_habit(client)
+    client.get(f"/api/v1/habits/{habit_id}/insights")
+    assert client.portal.call(prediction_writer.flush) == 2
+
+    # Unchanged repeat reads are not written again
+    client.get(f"/api/v1/habits/{habit_id}/insights")
+    assert client.portal.call(prediction_writer.flush) == 0
+
+    # A changed prediction for the same day replaces the row
+    client.post(f"/api/v1/habits/{habit_id}/log", json={"habit_id": habit_id})
+    insight = client.get(f"/api/v1/habits/{habit_id}/insights").json()
+    client.portal.call(prediction_writer.flush)
+
+    rows = db.scalars(select(PredictionLog).where(PredictionLog.habit_id == habit_id)).all()
+    assert len(rows) == 1
+    assert rows[0].score == insight["risk_score"]
+    assert rows[0].predicted_for == datetime.combine(datetime.utcnow().date() + timedelta(days=1), datetime.min.time())
+    assert db.get(Habit, habit_id).success_probability == insight["success_probability"]
+
+
+def test_compaction_rolls_old_predictions_into_daily_aggregates(db):
+    now = datetime.utcnow()
+    habit = Habit(user_id=1, title="Run")
+    db.add(habit)
+    db.commit()
+    day = datetime.combine((now - timedelta(days=40)).date(), datetime.min.time())
+    db.add_all([
+        PredictionLog(habit_id=habit.id, predicted_for=day, score=0.4, risk_level="low", created_at=day),
+        PredictionLog(habit_id=habit.id, predicted_for=day + timedelta(days=1), score=0.6,
+                      risk_level="medium", created_at=day + timedelta(days=1)),
+        PredictionLog(habit_id=habit.id, predicted_for=now, score=0.8, risk_level="high", created_at=now),
+    ])
+    db.commit()
+    # An earlier compaction of the same day is merged, not overwritten
+    db.add(PredictionDailyAggregate(habit_id=habit.id, day=day.date(), predictions=1, avg_score=0.2,
+                                    min_score=0.2, max_score=0.2, last_risk_level="low"))
+    db.commit()
+
+    assert compact_predictions(db, retain_days=30) == 2
+    db.commit()
+
+    assert db.scalar(select(func.count(PredictionLog.id))) == 1
+    aggs = {a.day: a for a in db.scalars(select(PredictionDailyAggregate))}
+    assert aggs[day.date()].predictions == 2
+    assert abs(aggs[day.date()].avg_score - 0.3) < 1e-9
+    assert (aggs[day.date()].min_score, aggs[day.date()].max_score) == (0.2, 0.4)
+    assert aggs[(day + timedelta(days=1)).date()].last_risk_level == "medium"
+
+
+def test_failed_compaction_waits_for_the_next_day(db, monkeypatch):
+    def broken(db):
+        raise RuntimeError("disk I/O error")
+
+    monkeypatch.setattr(prediction, "compact_predictions", broken)
+    monkeypatch.setattr(prediction_writer, "_last_compaction", None)
+    with pytest.raises(RuntimeError):
+        asyncio.run(prediction_writer.compact())
+    # The flush loop only compacts when this isn't today
+    assert prediction_writer._last_compaction == datetime.utcnow().date()
+
+
+def test_migration_dedupes_more_predictions_than_sql_variables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(bind=engine)
+    day = datetime(2026, 3, 10)
+    with engine.begin() as conn:
+        # Before the unique index: several predictions per habit per day, at any time of day
+        conn.execute(text("DROP INDEX uq_prediction_logs_habit_id_predicted_for"))
+        conn.execute(PredictionLog.__table__.insert(), [
+            {"habit_id": habit_id, "predicted_for": day + timedelta(hours=hour), "score": hour / 10,
+             "risk_level": "low", "created_at": day}
+            for habit_id in range(1, 1_501) for hour in (8, 9, 20)
+        ])
+    engine.dispose()
+
+    @event.listens_for(engine, "connect")
+    def limit_variables(dbapi_connection, record):
+        # Well below the 3,000 duplicates, like builds with the old 999 default
+        dbapi_connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+
+    assert "prediction_logs dedupe (3000 duplicate rows removed)" in run_migrations(engine)
+    with engine.connect() as conn:
+        rows = conn.execute(select(PredictionLog.habit_id, PredictionLog.predicted_for, PredictionLog.score)).all()
+    # The newest row per habit per day is kept, truncated to midnight
+    assert sorted(rows) == [(habit_id, day, 2.0) for habit_id in range(1, 1_501)]
+    assert not any("dedupe" in change for change in run_migrations(engine))
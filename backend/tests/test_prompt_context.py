@@ -0,0 +1,89 @@
+import random
+from datetime import datetime, timedelta
+
+from app.engine.gemini import gemini_client
+from app.engine.prompt_context import build_habit_context, estimate_tokens
+from app.models.habit import Habit, HabitStats
+
+NOW = datetime(2026, 3, 10, 12, 0)
+TODAY = NOW.date()
+
+
+def _row(habit_id, title, difficulty=1, streak=0, completions=0, last=None):
+    habit = Habit(id=habit_id, title=title, frequency="daily", difficulty=difficulty, current_streak=streak,
+                  longest_streak=streak, created_at=NOW - timedelta(days=30))
+    return habit, HabitStats(habit_id=habit_id, total_completions=completions, last_completed_at=last)
+
+
+def test_lines_rank_riskiest_first_with_a_week_of_activity():
+    rows = [
+        _row(1, "Read", streak=2, completions=28, last=NOW - timedelta(hours=3)),
+        _row(2, "Gym", difficulty=4, completions=3, last=NOW - timedelta(days=6)),
+    ]
+    completions = [(1, NOW - timedelta(hours=3)), (1, NOW - timedelta(days=1)), (2, NOW - timedelta(days=6))]
+
+    context = build_habit_context(rows, completions, TODAY, budget_tokens=600)
+    assert context["habits_summary"].splitlines() == [
+        # Scored as of midnight, so the day count doesn't tick over during the day
+        "- Gym (daily, difficulty 4/5): high risk 0.93, streak 0 (best 0), 7d x------, "
+        "5 days since last completion",
+        "- Read (daily, difficulty 1/5): low risk 0.12, streak 2 (best 2), 7d -----xx",
+    ]
+    assert context["recent_logs"] == (
+        "3 completions in the last 7 days, 2 in the last 3; per day, oldest first: 1 0 0 0 0 1 1"
+    )
+
+
+def test_budget_keeps_the_riskiest_habits_and_tallies_the_rest():
+    rng = random.Random(3)
+    rows = [
+        _row(i, f"habit {i} " + "x" * rng.randint(0, 60), difficulty=rng.randint(1, 5), streak=rng.randint(0, 9),
+             completions=rng.randint(0, 30), last=NOW - timedelta(days=rng.randint(0, 9)))
+        for i in range(1, 201)
+    ]
+    completions = [(i, NOW - timedelta(days=d)) for i in range(1, 201) for d in range(7) if rng.random() < 0.5]
+
+    for budget in (100, 300, 600):
+        context = build_habit_context(rows, completions, TODAY, budget)
+        assert estimate_tokens(context["habits_summary"]) + estimate_tokens(context["recent_logs"]) <= budget
+        *lines, rest = context["habits_summary"].splitlines()
+        listed = [int(line.split()[2]) for line in lines]
+        assert rest.startswith(f"- and {200 - len(listed)} lower-risk habits")
+        ranked = build_habit_context(rows, completions, TODAY, 10 ** 6)["habits_summary"].splitlines()
+        assert lines == ranked[:len(lines)]
+
+    # The same inputs give the same prompt, whatever order they come in
+    shuffled = rows[:]
+    rng.shuffle(shuffled)
+    assert build_habit_context(shuffled, reversed(completions), TODAY, 300) == \
+        build_habit_context(rows, completions, TODAY, 300)
+    # Even a tiny budget names the riskiest habit
+    assert build_habit_context(rows, completions, TODAY, 1)["habits_summary"].splitlines()[0] == ranked[0]
+
+
+def test_gemini_prompts_stay_bounded_and_stable(client, monkeypatch):
+    prompts = []
+
+    class RecordingModel:
+        async def generate_content_async(self, prompt, stream=False):
+            prompts.append(prompt)
+            return type("Response", (), {"text": "from gemini"})()
+
+    monkeypatch.setattr(gemini_client, "model", RecordingModel())
+    monkeypatch.setattr(gemini_client, "model_name", "models/fake-flash")
+    monkeypatch.setattr(gemini_client, "latency_ewma", None)
+    monkeypatch.setattr(gemini_client, "in_flight", 0)
+
+    ids = [client.post("/api/v1/habits/", json={"title": f"habit-{i}", "difficulty": i % 5 + 1}).json()["id"]
+           for i in range(60)]
+    client.post(f"/api/v1/habits/{ids[0]}/log", json={"habit_id": ids[0]})
+
+    for path in ("/api/v1/assistant/daily-briefing", "/api/v1/assistant/plan"):
+        assert client.get(path, params={"tier": "gemini"}).status_code == 200
+        assert client.get(path, params={"tier": "gemini"}).status_code == 200
+    # The second request of each reused the cached response for the identical prompt
+    assert len(prompts) == 2
+    briefing, plan = prompts
+    assert "lower-risk habits" in briefing and "lower-risk habits" in plan
+    assert "1 completions in the last 7 days, 1 in the last 3" in briefing
+    assert "- habit-0 (daily" not in briefing  # just logged, so the least at risk
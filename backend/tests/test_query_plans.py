@@ -0,0 +1,86 @@
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+from app.db.session import async_engine, engine
+from app.models.habit import Habit, HabitLog
+
+# "SCAN <table>" walks the whole table (or a whole index); "SEARCH" is a bounded lookup
+FULL_SCAN = re.compile(r"^SCAN (\w+)")
+WHERE = re.compile(r"\bWHERE\b", re.IGNORECASE)
+
+
+@pytest.fixture
+def seeded(db):
+    now = datetime.utcnow()
+    habits = [Habit(user_id=1, title=f"h{i}", created_at=now - timedelta(days=40)) for i in range(5)]
+    db.add_all(habits)
+    db.flush()
+    db.add_all(
+        HabitLog(habit_id=h.id, user_id=1, completed_at=now - timedelta(days=d))
+        for h in habits for d in range(1, 30, 2)
+    )
+    db.commit()
+    return habits
+
+
+def _capture(client, calls):
+    statements = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        for method, url, kwargs in calls:
+            response = getattr(client, method)(url, **kwargs)
+            assert response.status_code == 200, (url, response.text)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+    return statements
+
+
+def _full_scans(statements):
+    scans = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            has_filter = WHERE.search(statement) is not None
+            for row in plan:
+                match = FULL_SCAN.match(row[-1])
+                # Unfiltered reads (list all habits) are scans by design
+                if match and has_filter:
+                    scans.append((match.group(1), statement))
+    return scans
+
+
+def test_endpoint_queries_use_indexes(client, seeded):
+    habit_id = seeded[0].id
+    calls = [
+        ("get", "/api/v1/habits/", {}),
+        ("get", f"/api/v1/habits/{habit_id}/insights", {}),
+        ("get", "/api/v1/habits/dashboard/summary", {}),
+        ("post", f"/api/v1/habits/{habit_id}/log", {"json": {"habit_id": habit_id}}),
+        ("post", f"/api/v1/habits/{habit_id}/log", {"json": {"habit_id": habit_id}}),
+        ("get", "/api/v1/assistant/daily-briefing", {}),
+        ("get", "/api/v1/assistant/plan", {}),
+    ]
+    statements = _capture(client, calls)
+    assert statements
+
+    assert _full_scans(statements) == []
+
+
+def test_declared_indexes_exist(db):
+    with engine.connect() as conn:
+        names = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))}
+    assert {
+        "ix_habits_user_id_id",
+        "ix_habit_logs_habit_id_completed_at",
+        "ix_habit_logs_user_id_completed_at",
+        "ix_habit_logs_completed_at",
+        "uq_prediction_logs_habit_id_predicted_for",
+    } <= names
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from app.engine.gemini import gemini_client
+from app.engine.response_cache import gemini_response_cache
+
+
+class FakeModel:
+    """Stands in for genai.GenerativeModel: slow, counts upstream calls."""
+
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    async def generate_content_async(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        return type("Response", (), {"text": f"response #{self.calls}"})()
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    model = FakeModel()
+    monkeypatch.setattr(gemini_client, "model", model)
+    monkeypatch.setattr(gemini_client, "model_name", "models/fake-flash")
+    return model
+
+
+def _create_habit(client, title="Read"):
+    client.post("/api/v1/habits/", json={"title": title})
+
+
+def test_briefing_served_from_cache_until_context_changes(client, fake_model):
+    _create_habit(client)
+    before = gemini_response_cache.stats()
+
+    first = client.get("/api/v1/assistant/daily-briefing").json()
+    assert client.get("/api/v1/assistant/daily-briefing").json() == first
+    assert fake_model.calls == 1
+
+    # Plans are keyed separately, and new context is a new prompt
+    client.get("/api/v1/assistant/plan")
+    _create_habit(client, "Run")
+    assert client.get("/api/v1/assistant/daily-briefing").json() != first
+    assert fake_model.calls == 3
+
+    stats = client.get("/api/v1/assistant/cache/stats").json()
+    assert stats["hits"] == before["hits"] + 1
+    assert stats["misses"] == before["misses"] + 3
+
+
+def test_concurrent_identical_requests_share_one_upstream_call(client, fake_model):
+    async def burst():
+        return await asyncio.gather(*(
+            gemini_client.generate_action_plan("User", "- Walk", "Health") for _ in range(5)
+        ))
+
+    assert len(set(client.portal.call(burst))) == 1
+    assert fake_model.calls == 1
+
+
+def test_failures_are_not_cached(client, monkeypatch):
+    model = FakeModel(fail=True)
+    monkeypatch.setattr(gemini_client, "model", model)
+    monkeypatch.setattr(gemini_client, "model_name", "models/fake-flash")
+    _create_habit(client)
+
+    assert client.get("/api/v1/assistant/plan").json() == {"plan": "Could not generate plan."}
+    client.get("/api/v1/assistant/plan")
+    assert model.calls == 2
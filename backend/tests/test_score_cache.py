@@ -0,0 +1,105 @@
+import asyncio
+import fnmatch
+
+from app.core.cache import MemoryBackend, RedisBackend, ScoreCache, score_cache
+
+
+class FakeRedis:
+    """The subset of the redis-py client RedisBackend uses, over a dict."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode()
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in list(self.data) if fnmatch.fnmatch(key, match)]
+
+
+def test_memory_backend_lru_and_ttl():
+    now = [0.0]
+    backend = MemoryBackend(max_entries=2, clock=lambda: now[0])
+    backend.set("a", 1, ttl=10)
+    backend.set("b", 2, ttl=10)
+    assert backend.get("a") == 1  # "b" is now least recently used
+    backend.set("c", 3, ttl=10)
+    assert backend.get("b") is None
+    assert (backend.get("a"), backend.get("c"), backend.evictions) == (1, 3, 1)
+
+    now[0] = 10
+    assert backend.get("a") is None
+    assert backend.expirations == 1
+
+
+def test_shared_backend_is_coherent_between_workers():
+    server = FakeRedis()
+    worker_a = ScoreCache(RedisBackend(server), ttl=60)
+    worker_b = ScoreCache(RedisBackend(server), ttl=60)
+
+    worker_a.set("insight", 1, {"success_probability": 0.5})
+    assert worker_b.get("insight", 1) == {"success_probability": 0.5}
+    worker_b.invalidate(1)
+    assert worker_a.get("insight", 1) is None
+    assert (worker_a.stats()["misses"], worker_b.stats()["hits"]) == (1, 1)
+
+
+def test_insights_cached_until_a_log_is_written(client):
+    habit_id = client.post("/api/v1/habits/", json={"title": "Read", "difficulty": 3}).json()["id"]
+    url = f"/api/v1/habits/{habit_id}/insights"
+
+    first = client.get(url).json()
+    before = score_cache.stats()
+    assert client.get(url).json()["risk_score"] == first["risk_score"]
+    client.get("/api/v1/habits/insights")
+    assert score_cache.stats()["hits"] == before["hits"] + 2
+
+    client.post(f"/api/v1/habits/{habit_id}/log", json={"habit_id": habit_id})
+    after_log = client.get(url).json()
+    assert after_log["success_probability"] > first["success_probability"]
+    assert score_cache.stats()["misses"] == before["misses"] + 1
+
+    stats = client.get("/api/v1/habits/cache/stats").json()
+    assert stats["backend"] == "MemoryBackend" and stats["entries"] >= 1
+
+
+
+class LoopCheckingRedis(FakeRedis):
+    """Fails any round trip made from the event loop thread."""
+
+    def _off_loop(self, name):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        raise AssertionError(f"redis {name}() called on the event loop")
+
+    def get(self, key):
+        self._off_loop("get")
+        return super().get(key)
+
+    def set(self, key, value, ex=None):
+        self._off_loop("set")
+        super().set(key, value, ex)
+
+    def delete(self, *keys):
+        self._off_loop("delete")
+        super().delete(*keys)
+
+
+def test_network_backend_calls_stay_off_the_event_loop(client, monkeypatch):
+    server = LoopCheckingRedis()
+    monkeypatch.setattr(score_cache, "backend", RedisBackend(server))
+    habit_id = client.post("/api/v1/habits/", json={"title": "Read"}).json()["id"]
+    assert client.post(f"/api/v1/habits/{habit_id}/log", json={"habit_id": habit_id}).status_code == 200
+
+    for path in (f"/api/v1/habits/{habit_id}/insights", "/api/v1/habits/insights", "/api/v1/habits/dashboard/summary"):
+        assert client.get(path).status_code == 200
+    assert server.data
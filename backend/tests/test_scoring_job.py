@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app.crud.parallel_scoring import shard_bounds
+from app.crud.scoring import (
+    get_snapshots,
+    load_scoring_inputs,
+    run_scoring_job,
+    score_inputs,
+    snapshot_day,
+    snapshot_scores,
+    write_scores,
+)
+from app.engine.intelligence import assess_failure_risk_from_stats, calculate_success_probability_from_stats
+from app.models.habit import Habit, HabitScoreSnapshot, HabitStats, ScoringRun
+
+
+def _create_habits(client, n):
+    ids = [client.post("/api/v1/habits/", json={"title": f"h{i}", "difficulty": i % 5 + 1}).json()["id"]
+           for i in range(n)]
+    client.post(f"/api/v1/habits/{ids[0]}/log", json={"habit_id": ids[0]})
+    return ids
+
+
+def _quiet(message):
+    pass
+
+
+def test_snapshots_match_live_scoring(client, db):
+    ids = _create_habits(client, 5)
+
+    result = run_scoring_job(db, chunk_size=2, report=_quiet)
+    assert (result["habits"], result["finished"]) == (5, True)
+    assert result["habits_per_second"] > 0
+
+    scored_at = db.get(ScoringRun, snapshot_day()).started_at
+    snapshots = get_snapshots(db, ids)
+    for habit_id in ids:
+        habit, stats = db.get(Habit, habit_id), db.get(HabitStats, habit_id)
+        db.refresh(habit)
+        expected = {
+            "success_probability": calculate_success_probability_from_stats(habit, stats.total_completions, now=scored_at),
+            "risk": assess_failure_risk_from_stats(habit, stats.total_completions, stats.last_completed_at, now=scored_at),
+        }
+        assert snapshot_scores(snapshots[habit_id]) == expected
+        assert habit.success_probability == expected["success_probability"]
+
+
+def test_job_resumes_after_interruption(client, db):
+    ids = _create_habits(client, 5)
+
+    chunks = []
+    first = run_scoring_job(db, chunk_size=2, report=chunks.append, should_stop=lambda: len(chunks) == 1)
+    assert (first["habits"], first["finished"]) == (2, False)
+    assert db.get(ScoringRun, snapshot_day()).last_habit_id == ids[1]
+
+    second = run_scoring_job(db, chunk_size=2, report=_quiet)
+    assert (second["habits"], second["finished"]) == (3, True)
+    assert db.scalar(select(func.count()).select_from(HabitScoreSnapshot)) == 5
+
+    assert run_scoring_job(db, report=_quiet)["skipped"]
+    assert run_scoring_job(db, force=True, report=_quiet)["habits"] == 5
+
+
+def test_old_snapshots_are_pruned(client, db):
+    _create_habits(client, 2)
+    run_scoring_job(db, day=snapshot_day() - timedelta(days=30), report=_quiet)
+    run_scoring_job(db, report=_quiet)
+
+    days = db.scalars(select(HabitScoreSnapshot.day).distinct()).all()
+    assert days == [snapshot_day()]
+
+
+def test_reads_use_snapshots_until_the_habit_is_written(client, db):
+    ids = _create_habits(client, 3)
+    run_scoring_job(db, report=_quiet)
+
+    # Mark the snapshot so reads from it are recognizable
+    snapshot = db.get(HabitScoreSnapshot, (ids[1], snapshot_day()))
+    snapshot.success_probability, snapshot.risk_level = 0.123, "high"
+    db.commit()
+
+    assert client.get(f"/api/v1/habits/{ids[1]}/insights").json()["success_probability"] == 0.123
+    batch = client.get("/api/v1/habits/insights", params={"ids": ids}).json()
+    assert batch[1]["success_probability"] == 0.123
+    summary = client.get("/api/v1/habits/dashboard/summary").json()
+    assert 0.123 in [h["success_probability"] for h in summary["at_risk"]]
+
+    # Logging the habit drops its snapshot; it is scored live again
+    client.post(f"/api/v1/habits/{ids[1]}/log", json={"habit_id": ids[1]})
+    db.expire_all()
+    assert db.get(HabitScoreSnapshot, (ids[1], snapshot_day())) is None
+    assert client.get(f"/api/v1/habits/{ids[1]}/insights").json()["success_probability"] != 0.123
+
+
+def test_scores_of_habits_logged_mid_run_are_not_written(client, db):
+    ids = _create_habits(client, 3)
+    # Scored a few days on, so every probability differs from the stored one
+    now = datetime.utcnow() + timedelta(days=3)
+    _, inputs = load_scoring_inputs(db, now, 0)
+    snapshots, changed = score_inputs(inputs, snapshot_day(), now)
+    assert len(changed) == 3
+
+    # A log commits between loading the inputs and writing the scores
+    client.post(f"/api/v1/habits/{ids[1]}/log", json={"habit_id": ids[1]})
+    db.expire_all()
+    logged = db.get(Habit, ids[1]).success_probability
+    write_scores(db, snapshots, changed)
+    db.commit()
+    db.expire_all()
+
+    assert sorted(get_snapshots(db, ids)) == [ids[0], ids[2]]
+    assert db.get(Habit, ids[1]).success_probability == logged
+    assert db.get(Habit, ids[0]).success_probability == changed[0]["b_p"]
+
+
+def test_parallel_scoring_matches_serial(client, db):
+    ids = _create_habits(client, 11)
+    now = datetime.utcnow()
+    today = snapshot_day(now)
+    yesterday = today - timedelta(days=1)
+
+    serial = run_scoring_job(db, day=yesterday, now=now, report=_quiet)
+    parallel = run_scoring_job(db, day=today, now=now, chunk_size=3, workers=2, report=_quiet)
+    assert serial["habits"] == parallel["habits"] == 11
+    assert db.get(ScoringRun, today).last_habit_id == ids[-1]
+
+    def snapshots(day):
+        return [
+            {k: v for k, v in row._mapping.items() if k != "day"}
+            for row in db.execute(
+                select(HabitScoreSnapshot.__table__).where(HabitScoreSnapshot.day == day).order_by(HabitScoreSnapshot.habit_id)
+            )
+        ]
+
+    assert snapshots(today) == snapshots(yesterday)
+
+
+def test_shard_bounds_cover_the_id_range():
+    assert shard_bounds(0, 10, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert shard_bounds(8, 10, 4) == [(8, 10)]
+    assert shard_bounds(10, 10, 4) == []
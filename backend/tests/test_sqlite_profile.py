@@ -0,0 +1,29 @@
+import sqlite3
+
+from sqlalchemy import create_engine, event, text
+
+from app.core.config import settings
+from app.db.session import _apply_sqlite_profile, _async_engine_options
+
+
+def test_profile_pragmas_applied_on_connect(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    event.listen(engine, "connect", _apply_sqlite_profile)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -settings.SQLITE_CACHE_SIZE_KB
+
+    # WAL is persistent: plain connections see it too
+    with sqlite3.connect(tmp_path / "tuned.db") as raw:
+        assert raw.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    engine.dispose()
+
+
+def test_writer_engine_has_a_single_connection():
+    options = _async_engine_options("sqlite+aiosqlite:///./habitos.db", writer=True)
+    assert options["pool_size"] == 1
+    assert options["max_overflow"] == 0
+    assert _async_engine_options("sqlite+aiosqlite://") == {}
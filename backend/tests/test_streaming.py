@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+import pytest
+
+from app.engine.gemini import gemini_client, PLAN_FALLBACK
+
+
+class StreamingModel:
+    """Stands in for genai.GenerativeModel with stream=True support."""
+
+    def __init__(self, chunks=("Good ", "morning, ", "Champion."), can_stream=True):
+        self.chunks = chunks
+        self.can_stream = can_stream
+        self.calls = 0
+        self.closed = False
+
+    async def generate_content_async(self, prompt, stream=False):
+        self.calls += 1
+        if stream:
+            if not self.can_stream:
+                raise TypeError("streaming not supported")
+            return self._chunks()
+        return type("Response", (), {"text": "".join(self.chunks)})()
+
+    async def _chunks(self):
+        try:
+            for text in self.chunks:
+                await asyncio.sleep(0.01)
+                yield type("Chunk", (), {"text": text})()
+        finally:
+            self.closed = True
+
+
+@pytest.fixture
+def streaming_model(monkeypatch):
+    model = StreamingModel()
+    monkeypatch.setattr(gemini_client, "model", model)
+    monkeypatch.setattr(gemini_client, "model_name", "models/fake-flash")
+    return model
+
+
+def _events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines.get("event", "message"), json.loads(lines["data"])))
+    return events
+
+
+def test_briefing_streams_chunks_then_done(client, streaming_model):
+    client.post("/api/v1/habits/", json={"title": "Read"})
+
+    res = client.get("/api/v1/assistant/daily-briefing/stream")
+    assert res.headers["content-type"].startswith("text/event-stream")
+    assert _events(res.text) == [
+        ("message", {"text": "Good "}),
+        ("message", {"text": "morning, "}),
+        ("message", {"text": "Champion."}),
+        ("done", {}),
+    ]
+
+    # The full text was cached: the next stream and the one-shot endpoint both reuse it
+    assert _events(client.get("/api/v1/assistant/daily-briefing/stream").text)[0] == \
+        ("message", {"text": "Good morning, Champion."})
+    assert client.get("/api/v1/assistant/daily-briefing").json() == {"briefing": "Good morning, Champion."}
+    assert streaming_model.calls == 1
+
+
+def test_empty_stream_is_not_cached(client, streaming_model):
+    client.post("/api/v1/habits/", json={"title": "Read"})
+    streaming_model.chunks = ("", "")
+    assert _events(client.get("/api/v1/assistant/plan/stream").text) == [("done", {})]
+
+    # The next request asks the model again instead of replaying the empty answer
+    streaming_model.chunks = ("Walk first.",)
+    assert _events(client.get("/api/v1/assistant/plan/stream").text)[0] == ("message", {"text": "Walk first."})
+    assert streaming_model.calls == 2
+
+
+def test_no_habits_is_a_single_event(client, streaming_model):
+    events = _events(client.get("/api/v1/assistant/plan/stream").text)
+    assert events == [("message", {"text": "Add some habits first!"}), ("done", {})]
+    assert streaming_model.calls == 0
+
+
+def test_model_without_streaming_falls_back_to_one_shot(client, monkeypatch):
+    model = StreamingModel(can_stream=False)
+    monkeypatch.setattr(gemini_client, "model", model)
+    monkeypatch.setattr(gemini_client, "model_name", "models/fake-flash")
+    client.post("/api/v1/habits/", json={"title": "Read"})
+
+    events = _events(client.get("/api/v1/assistant/plan/stream").text)
+    assert events == [("message", {"text": "Good morning, Champion."}), ("done", {})]
+
+
+def test_failure_yields_fallback_text(db, monkeypatch):
+    class BrokenModel:
+        async def generate_content_async(self, prompt, stream=False):
+            raise RuntimeError("quota exceeded")
+
+    monkeypatch.setattr(gemini_client, "model", BrokenModel())
+    monkeypatch.setattr(gemini_client, "model_name", "models/fake-flash")
+
+    async def collect():
+        return [text async for text in gemini_client.stream_action_plan("User", "- Walk", "Health")]
+
+    assert asyncio.run(collect()) == [PLAN_FALLBACK]
+
+
+def test_closing_the_stream_closes_the_upstream_response(db, streaming_model):
+    async def read_one_and_disconnect():
+        stream = gemini_client.stream_action_plan("User", "- Walk", "Health")
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    assert asyncio.run(read_one_and_disconnect()) == "Good "
+    assert streaming_model.closed
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.db.migrations import run_migrations
+from app.db.session import engine
+from app.models.habit import Habit, HabitLog
+
+ALICE = {"X-User-Id": "1"}
+BOB = {"X-User-Id": "2"}
+
+
+def _create(client, headers, title):
+    return client.post("/api/v1/habits/", json={"title": title}, headers=headers).json()["id"]
+
+
+def test_reads_only_see_the_current_users_habits(client):
+    alice = [_create(client, ALICE, f"a{i}") for i in range(2)]
+    bob = _create(client, BOB, "b0")
+
+    assert [h["id"] for h in client.get("/api/v1/habits/", headers=ALICE).json()] == alice
+    assert [h["id"] for h in client.get("/api/v1/habits/").json()] == alice  # defaults to user 1
+    assert [h["id"] for h in client.get("/api/v1/habits/", headers=BOB).json()] == [bob]
+
+    assert [i["habit_id"] for i in client.get("/api/v1/habits/insights", headers=BOB).json()] == [bob]
+    both = client.get("/api/v1/habits/insights", params={"ids": alice + [bob]}, headers=ALICE).json()
+    assert [i["habit_id"] for i in both] == alice
+    assert [h["habit_id"] for h in client.get("/api/v1/habits/history", headers=BOB).json()] == [bob]
+    assert client.get("/api/v1/habits/dashboard/summary", headers=BOB).json()["total_habits"] == 1
+
+
+def test_other_users_habits_are_not_found(client):
+    alice = _create(client, ALICE, "a0")
+
+    for method, path, kwargs in [
+        ("get", f"/api/v1/habits/{alice}/insights", {}),
+        ("get", f"/api/v1/habits/{alice}/history", {}),
+        ("post", f"/api/v1/habits/{alice}/log", {"json": {"habit_id": alice}}),
+        ("post", "/api/v1/habits/logs/bulk", {"json": {"logs": [{"habit_id": alice, "completed_at": "2024-01-01T08:00:00"}]}}),
+    ]:
+        assert getattr(client, method)(path, headers=BOB, **kwargs).status_code == 404, path
+    assert client.post(f"/api/v1/habits/{alice}/log", json={"habit_id": alice}, headers=ALICE).status_code == 200
+
+
+def test_assistant_counts_only_the_users_logs(client):
+    for headers, title in [(ALICE, "Read"), (BOB, "Run")]:
+        habit_id = _create(client, headers, title)
+        client.post(f"/api/v1/habits/{habit_id}/log", json={"habit_id": habit_id}, headers=headers)
+    _create(client, BOB, "Swim")
+
+    plan = client.get("/api/v1/assistant/plan", params={"tier": "local"}, headers=BOB).json()["plan"]
+    assert "Run" in plan and "Swim" in plan and "Read" not in plan
+    briefing = client.get("/api/v1/assistant/daily-briefing", params={"tier": "local"}, headers=ALICE).json()
+    assert "logged 1 completions" in briefing["briefing"]
+    assert client.get("/api/v1/assistant/plan", headers={"X-User-Id": "3"}).json()["plan"] == "Add some habits first!"
+
+
+def test_logs_carry_their_owner_and_old_rows_are_backfilled(client, db):
+    habit_id = _create(client, BOB, "b0")
+    client.post(f"/api/v1/habits/{habit_id}/log", json={"habit_id": habit_id}, headers=BOB)
+    assert db.scalars(select(HabitLog.user_id)).all() == [2]
+
+    # Rows written before the column existed
+    other = Habit(user_id=7, title="legacy", created_at=datetime.utcnow() - timedelta(days=5))
+    db.add(other)
+    db.flush()
+    db.add_all(HabitLog(habit_id=other.id, completed_at=datetime.utcnow() - timedelta(days=d)) for d in range(3))
+    db.commit()
+
+    assert "habit_logs.user_id for 3 logs" in run_migrations(engine)
+    db.expire_all()
+    assert sorted(db.scalars(select(HabitLog.user_id)).all()) == [2, 7, 7, 7]
+    assert not any("habit_logs.user_id" in change for change in run_migrations(engine))
@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react'
-import { getHabits, createHabit, getDashboardSummary } from './api'
+import { getHabits, createHabit, getDashboardSummary, getHabitInsights, getHabitsHistory, utcToday } from './api'
+import { startOfMonth, startOfWeek } from 'date-fns'
 import { HabitCard } from './components/HabitCard'
 import { AssistantCard } from './components/AssistantCard'
 import { useTheme, ThemeToggle } from './components/ThemeToggle'
@@ -10,17 +11,32 @@ function App() {
   const [showForm, setShowForm] = useState(false)
   const [newHabit, setNewHabit] = useState({ title: '', frequency: 'daily' })
   const [summary, setSummary] = useState(null)
+  const [insights, setInsights] = useState({})
+  const [insightsError, setInsightsError] = useState(false)
+  const [history, setHistory] = useState({})
 
   const { theme, toggleTheme } = useTheme();
 
   const refresh = async () => {
     try {
-      const [habitsData, summaryData] = await Promise.all([
+      // History window covers the current month's calendar grid, which includes this week
+      const today = utcToday()
+      const historyFrom = startOfWeek(startOfMonth(today), { weekStartsOn: 1 })
+      const [habitsData, summaryData, insightsData, historyData] = await Promise.all([
         getHabits(),
-        getDashboardSummary()
+        getDashboardSummary(),
+        // A failed insights batch must not hide the habits; cards show a fallback instead
+        getHabitInsights().catch(e => {
+          console.error("Failed to fetch insights:", e)
+          return null
+        }),
+        getHabitsHistory(historyFrom, today)
       ])
       setHabits(habitsData)
       setSummary(summaryData)
+      setInsightsError(insightsData === null)
+      setInsights(Object.fromEntries((insightsData || []).map(i => [i.habit_id, i])))
+      setHistory(historyData)
     } catch (e) {
       console.error("Failed to fetch data:", e)
     }
@@ -142,7 +158,7 @@ function App() {
 
           <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
             {habits.map(habit => (
-              <HabitCard key={habit.id} habit={habit} onUpdate={refresh} />
+              <HabitCard key={habit.id} habit={habit} insight={insights[habit.id]} insightError={insightsError} history={history[habit.id]} onUpdate={refresh} />
             ))}
 
             {habits.length === 0 && (
@@ -39,6 +39,55 @@ export async function getHabitInsight(habitId) {
     return res.json();
 }
 
+export async function getHabitInsights(habitIds = null) {
+    // All habits' insights in one request; omit habitIds to get every habit
+    const params = new URLSearchParams();
+    if (habitIds) habitIds.forEach(id => params.append("ids", id));
+    const res = await fetch(`${API_URL}/habits/insights?${params}`);
+    if (!res.ok) {
+        const err = await res.json();
+        throw new Error(err.detail || "Failed to load insights");
+    }
+    return res.json();
+}
+
+// --- Completion history: run-length encoded completed days per date window ---
+
+// The API buckets completions by UTC day. Windows are passed around as local-midnight
+// Dates labelled with that UTC day (as expandRuns returns), so date-fns grid math works.
+export function utcToday(now = new Date()) {
+    return new Date(now.getUTCFullYear(), now.getUTCMonth(), now.getUTCDate());
+}
+
+function toISODate(d) {
+    // d is a day label from utcToday() / expandRuns, not an instant
+    const pad = n => String(n).padStart(2, "0");
+    return `${d.getFullYear()}-${pad(d.getMonth() + 1)}-${pad(d.getDate())}`;
+}
+
+export function expandRuns(runs) {
+    // [{start: "2025-01-01", days: 3}] -> local-midnight Dates for each completed day
+    return runs.flatMap(({ start, days }) => {
+        const [y, m, d] = start.split("-").map(Number);
+        return Array.from({ length: days }, (_, i) => new Date(y, m - 1, d + i));
+    });
+}
+
+export async function getHabitsHistory(from, to) {
+    const params = new URLSearchParams({ from: toISODate(from), to: toISODate(to), encoding: "rle" });
+    const res = await fetch(`${API_URL}/habits/history?${params}`);
+    if (!res.ok) throw new Error("Failed to load history");
+    const data = await res.json();
+    return Object.fromEntries(data.map(h => [h.habit_id, expandRuns(h.runs)]));
+}
+
+export async function getHabitHistory(habitId, from, to) {
+    const params = new URLSearchParams({ from: toISODate(from), to: toISODate(to), encoding: "rle" });
+    const res = await fetch(`${API_URL}/habits/${habitId}/history?${params}`);
+    if (!res.ok) throw new Error("Failed to load history");
+    return expandRuns((await res.json()).runs);
+}
+
 export async function getDashboardSummary() {
     const res = await fetch(`${API_URL}/habits/dashboard/summary`);
     return res.json();
@@ -63,3 +112,43 @@ export async function getDayPlan() {
     if (!res.ok) throw new Error("Failed to generate plan");
     return res.json();
 }
+
+// Reads a text/event-stream response, calling onText with each `data: {"text": ...}` chunk.
+// If the stream fails before any text arrives, falls back to the one-shot endpoint.
+async function streamText(path, onText, fallback, signal) {
+    let received = false;
+    try {
+        const res = await fetch(`${API_URL}${path}`, { signal });
+        if (!res.ok || !res.body) throw new Error(`Stream failed: ${res.status}`);
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        for (;;) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            const events = buffer.split("\n\n");
+            buffer = events.pop();
+            for (const event of events) {
+                if (event.startsWith("event: done")) return;
+                const data = event.split("\n").find(line => line.startsWith("data: "));
+                if (!data) continue;
+                received = true;
+                onText(JSON.parse(data.slice(6)).text);
+            }
+        }
+    } catch (e) {
+        if (received || signal?.aborted) throw e;
+        onText(await fallback());
+    }
+}
+
+export function streamDailyBriefing(onText, signal) {
+    return streamText("/assistant/daily-briefing/stream", onText,
+        async () => (await getDailyBriefing()).briefing, signal);
+}
+
+export function streamDayPlan(onText, signal) {
+    return streamText("/assistant/plan/stream", onText,
+        async () => (await getDayPlan()).plan, signal);
+}
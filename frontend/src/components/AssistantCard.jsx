@@ -1,5 +1,5 @@
-import { useState, useEffect } from 'react';
-import { getDailyBriefing, updateUserGoals, getDayPlan } from '../api';
+import { useState, useEffect, useRef } from 'react';
+import { streamDailyBriefing, updateUserGoals, streamDayPlan } from '../api';
 import { Sparkles, Edit3, MessageSquare, Loader2, CalendarClock } from 'lucide-react';
 import ReactMarkdown from 'react-markdown';
 import remarkGfm from 'remark-gfm';
@@ -12,31 +12,50 @@ export function AssistantCard() {
     const [showGoals, setShowGoals] = useState(false);
     const [goals, setGoals] = useState("");
 
+    // One controller per stream; aborting it stops the server-side generation too
+    const briefingStream = useRef(null);
+    const planStream = useRef(null);
+
     useEffect(() => {
         loadBriefing();
+        return () => {
+            briefingStream.current?.abort();
+            planStream.current?.abort();
+        };
     }, []);
 
     const loadBriefing = async () => {
+        briefingStream.current?.abort();
+        const controller = new AbortController();
+        briefingStream.current = controller;
         try {
             setLoading(true);
-            const data = await getDailyBriefing();
-            setBriefing(data.briefing);
+            setBriefing("");
+            await streamDailyBriefing(text => {
+                setBriefing(prev => (prev || "") + text);
+                setLoading(false);
+            }, controller.signal);
         } catch (e) {
-            console.error(e);
+            if (!controller.signal.aborted) console.error(e);
         } finally {
-            setLoading(false);
+            if (!controller.signal.aborted) setLoading(false);
         }
     };
 
     const handleGeneratePlan = async () => {
+        planStream.current?.abort();
+        const controller = new AbortController();
+        planStream.current = controller;
         setGeneratingPlan(true);
         try {
-            const data = await getDayPlan();
-            setPlan(data.plan);
+            await streamDayPlan(text => {
+                setPlan(prev => (prev || "") + text);
+                setGeneratingPlan(false);
+            }, controller.signal);
         } catch (e) {
-            console.error(e);
+            if (!controller.signal.aborted) console.error(e);
         } finally {
-            setGeneratingPlan(false);
+            if (!controller.signal.aborted) setGeneratingPlan(false);
         }
     }
 
@@ -137,7 +156,10 @@ export function AssistantCard() {
                                                     <CalendarClock size={16} /> Suggested Schedule
                                                 </h3>
                                                 <button
-                                                    onClick={() => setPlan(null)}
+                                                    onClick={() => {
+                                                        planStream.current?.abort();
+                                                        setPlan(null);
+                                                    }}
                                                     className="text-xs text-sky-300 hover:text-white hover:underline"
                                                 >
                                                     Close
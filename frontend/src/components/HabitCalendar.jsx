@@ -15,9 +15,10 @@ import {
 } from 'date-fns';
 import { ChevronLeft, ChevronRight } from 'lucide-react';
 import { useState } from 'react';
+import { utcToday } from '../api';
 
-export function HabitCalendar({ logs, color }) {
-    const [currentDate, setCurrentDate] = useState(new Date());
+export function HabitCalendar({ logs, color, onMonthChange }) {
+    const [currentDate, setCurrentDate] = useState(utcToday);
 
     const monthStart = startOfMonth(currentDate);
     const monthEnd = endOfMonth(currentDate);
@@ -40,8 +41,16 @@ export function HabitCalendar({ logs, color }) {
     // Header Days (Mon, Tue...)
     const weekDays = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'];
 
-    const nextMonth = () => setCurrentDate(addMonths(currentDate, 1));
-    const prevMonth = () => setCurrentDate(subMonths(currentDate, 1));
+    const changeMonth = (date) => {
+        setCurrentDate(date);
+        // Let the parent fetch the completions of the newly visible grid
+        onMonthChange?.(
+            startOfWeek(startOfMonth(date), { weekStartsOn: 1 }),
+            endOfWeek(endOfMonth(date), { weekStartsOn: 1 })
+        );
+    };
+    const nextMonth = () => changeMonth(addMonths(currentDate, 1));
+    const prevMonth = () => changeMonth(subMonths(currentDate, 1));
 
     while (day <= endDate) {
         for (let i = 0; i < 7; i++) {
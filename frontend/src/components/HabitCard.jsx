@@ -1,38 +1,28 @@
-import React, { useEffect, useState } from 'react';
-import { logHabit, getHabitInsight } from '../api';
+import React, { useState } from 'react';
+import { logHabit, getHabitHistory } from '../api';
 import { CheckCircle, AlertTriangle, TrendingUp, Zap, Calendar as CalendarIcon, BarChart2 } from 'lucide-react';
 import { HabitCalendar } from './HabitCalendar';
 import { HabitWeekChart } from './HabitWeekChart';
 
-export function HabitCard({ habit, onUpdate }) {
-    const [insight, setInsight] = useState(null);
-    const [loadingInsight, setLoadingInsight] = useState(true);
+export function HabitCard({ habit, insight, insightError, history: recentHistory, onUpdate }) {
+    // Insights and this month's history for all cards are loaded in batch requests by the parent
+    const loadingInsight = !insight && !insightError;
     const [viewMode, setViewMode] = useState('week'); // 'week' | 'calendar'
+    const [olderHistory, setOlderHistory] = useState([]);
 
-    useEffect(() => {
-        let mounted = true;
-        const load = async () => {
-            try {
-                const data = await getHabitInsight(habit.id);
-                if (mounted) setInsight(data);
-            } catch (e) {
-                console.error(e);
-            } finally {
-                if (mounted) setLoadingInsight(false);
-            }
-        };
-        load();
-        return () => {
-            mounted = false;
-        };
-    }, [habit.id]);
+    const loadMonth = async (from, to) => {
+        try {
+            const days = await getHabitHistory(habit.id, from, to);
+            setOlderHistory(prev => [...prev, ...days]);
+        } catch (e) {
+            console.error(e);
+        }
+    };
 
     const handleLog = async () => {
         try {
             await logHabit(habit.id);
             // Quick optimistic UI update could go here, but for now we refresh
-            const updatedInsight = await getHabitInsight(habit.id);
-            setInsight(updatedInsight);
             onUpdate();
         } catch (e) {
             console.error(e);
@@ -53,7 +43,7 @@ export function HabitCard({ habit, onUpdate }) {
     }
 
     const currentProb = insight?.success_probability ?? habit.success_probability;
-    const history = insight?.history || [];
+    const history = [...(recentHistory || []), ...olderHistory];
 
     return (
         <div className="group relative bg-white dark:bg-slate-800 rounded-2xl p-6 shadow-sm border border-slate-200 dark:border-slate-700/50 hover:shadow-lg dark:hover:shadow-slate-900/50 transition-all duration-300">
@@ -84,7 +74,11 @@ export function HabitCard({ habit, onUpdate }) {
                 <div className="min-h-[24px] mb-4">
                     {loadingInsight ? (
                         <div className="h-4 w-3/4 bg-slate-100 dark:bg-slate-700 rounded animate-pulse" />
-                    ) : insight && (
+                    ) : !insight ? (
+                        <p className="text-sm text-slate-500 dark:text-slate-400 leading-snug font-medium">
+                            Insights are unavailable right now.
+                        </p>
+                    ) : (
                         <div className="flex items-start gap-2">
                             {insight.risk_level === 'high' ? (
                                 <AlertTriangle size={16} className="text-rose-500 mt-0.5 shrink-0" />
@@ -118,12 +112,12 @@ export function HabitCard({ habit, onUpdate }) {
                     </div>
 
                     <div className="min-h-[120px]">
-                        {!insight ? (
+                        {loadingInsight ? (
                             <div className="h-24 w-full bg-slate-200 dark:bg-slate-800 rounded animate-pulse" />
                         ) : viewMode === 'week' ? (
                             <HabitWeekChart logs={history} color={currentProb >= 0.8 ? '#10b981' : currentProb >= 0.5 ? '#f59e0b' : '#f43f5e'} />
                         ) : (
-                            <HabitCalendar logs={history} />
+                            <HabitCalendar logs={history} onMonthChange={loadMonth} />
                         )}
                     </div>
                 </div>